@@ -3,9 +3,12 @@
 Analyze which categories have garbled papers.
 """
 
+import argparse
 import csv
 import os
 
+from paper_store import PaperStore, add_store_argument
+
 def read_garbled_list(filename):
     """Read list of garbled papers from file."""
     with open(filename, 'r', encoding='utf-8') as f:
@@ -13,8 +16,17 @@ def read_garbled_list(filename):
         papers = [line.strip() for line in f if line.strip() and not line.startswith('#')]
     return papers
 
-def analyze_categories():
-    garbled_papers = read_garbled_list('garbled_papers.txt')
+def analyze_categories(store_path=None):
+    if store_path:
+        # Indexed query instead of re-reading the CSV and the garbled list
+        with PaperStore(store_path) as store:
+            categories = {}
+            for paper in store.papers(garbled=True):
+                categories.setdefault(paper['category'], []).append(paper['stem'])
+        print_categories(categories)
+        return
+
+    garbled_papers = set(read_garbled_list('garbled_papers.txt'))
 
     # Read CSV
     categories = {}
@@ -30,7 +42,10 @@ def analyze_categories():
                     categories[category] = []
                 categories[category].append(stem)
 
-    # Print results
+    print_categories(categories)
+
+def print_categories(categories):
+    """Print {category: [garbled stems]}."""
     print("Garbled papers by category:")
     for category, papers in sorted(categories.items()):
         print(f"\n{category}: {len(papers)} papers")
@@ -39,5 +54,11 @@ def analyze_categories():
         if len(papers) > 10:
             print(f"  ... and {len(papers) - 10} more")
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    add_store_argument(parser)
+    args = parser.parse_args()
+    analyze_categories(args.store)
+
 if __name__ == '__main__':
-    analyze_categories()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Author index over the inventory: clean author names and the papers of each
+author.
+
+The authors field of a paper holds whatever the front-matter heuristics
+found, e.g. 'CHRISTOPHER BAILEY, WENDY HALL, DAVID E. MILLARD, and; MARK
+J. WEAL; perspective. We also show ...'. split_authors turns it into
+personal names:
+
+- the field is split into lines on ';' and each line on ',', ':', '&' and
+  'and'; footnote marks, nicknames in quotes, 'by', 'et al.' and a
+  trailing 'Abstract' are dropped, and accents that pdftotext leaves as
+  separate characters ('Obrenovic´') are recombined
+- a piece with an institution word ('University', 'Department', ...)
+  starts an affiliation, and the rest of its line (the address) is
+  skipped, as are pieces that are or start with a country and
+  'City, Country' lines
+- a name is two to five words, each capitalised, an initial or a particle
+  (van, de, ...) that neither starts nor ends it; emails, digits,
+  brackets, repeated words, function words and the title words of this
+  corpus listed in author_title_words.txt reject a piece
+- four or six plain capitalised words in mixed case, without initials,
+  are taken as two or three names that a two-column layout ran together
+- all-capitals words are title-cased
+
+Variants of one person (case, initials, diacritics) are grouped within
+blocks keyed by the folded surname and the first initial, so names are
+compared only with the few others sharing their block and the work grows
+with the number of names, not its square. Two names match when each given
+name equals or abbreviates the other's (a missing middle name is fine);
+an initial-only variant that fits several people is kept apart. Each
+group is shown by its most complete variant. OCR misspellings of a surname
+('Bultennan') land in another block and stay separate.
+
+generate_bibliography.py --authors uses the index for the citations'
+author lists and writes an author -> papers listing. To query it:
+    python author_index.py [NAME ...] [--list] [--min-papers N] [--inventory paper_inventory.csv] [--store [PATH]]
+"""
+
+import argparse
+import csv
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+
+from paper_store import PaperStore, add_store_argument
+
+INVENTORY_CSV = 'paper_inventory.csv'
+MIN_NAME_WORDS = 2
+MAX_NAME_WORDS = 5
+
+_SPLIT_RE = re.compile(r'[,:&]|\band\b', re.IGNORECASE)  # within a line; lines are joined with ';'
+_FOOTNOTE_RE = re.compile(r'[*∗†‡§¶$#^]|(?<=[^\W\d])\d+\b')
+_NICKNAME_RE = re.compile(r'[“"‘\'][^”"’\']*[”"’\']')
+_BY_RE = re.compile(r'^by\s+', re.IGNORECASE)
+_TRAILER_RE = re.compile(r'\s+(?:et\.?\s+al\.?|abstract|keywords)$', re.IGNORECASE)
+_NOT_NAME_CHARS_RE = re.compile(r'[@{}()\[\]<>/\\|=~!?:%+_\d]|\w\.\w{2,}')
+_INITIALS_RE = re.compile(r'^(?:(?:[^\W\d_]\.-?)+|[^\W\d_])$')  # E.  E  C.A.  J.-P.
+_NAME_WORD_RE = re.compile(r"^[^\W\d_][^\W\d_'’\-.]*(?:['’\-][^\W\d_]+)*\.?$")
+# pdftotext emits some accents as spacing characters after the letter
+_SPACING_ACCENTS = {'\u00b4': '\u0301', '`': '\u0300', '\u00a8': '\u0308', '\u02c7': '\u030c', '\u02dc': '\u0303', '\u00b8': '\u0327'}
+_SPACING_ACCENT_RE = re.compile(r'\s?([´`¨ˇ˜¸])')
+
+PARTICLES = {'van', 'von', 'de', 'der', 'den', 'del', 'della', 'di', 'da', 'du', 'dos', 'das', 'la', 'le',
+             'ten', 'ter', 'bin', 'al', 'st', 'las', 'los'}
+# Headings, field labels and function words: prose, not a personal name
+_PROSE_WORDS = {
+    'abstract', 'introduction', 'keywords', 'email', 'mail', 'www', 'http', 'unknown', 'authors', 'author',
+    'the', 'of', 'for', 'in', 'on', 'with', 'to', 'from', 'we', 'our', 'this', 'that', 'these', 'is', 'are',
+    'be', 'can', 'also', 'an', 'a', 'as', 'by', 'at', 'it', 'its', 'one',
+}
+# Words of institution names; a piece with one starts an affiliation
+_AFFILIATION_WORDS = {
+    'university', 'universiteit', 'universidad', 'universitair', 'universita', 'department', 'dept',
+    'dipartimento', 'institute', 'instituto', 'school', 'college', 'faculty', 'laboratory', 'lab', 'labs',
+    'research', 'group', 'centre', 'center', 'centrum', 'nacional', 'science', 'sciences', 'engineering',
+    'computer', 'computing', 'informatics', 'informatica', 'mathematics', 'technology', 'technologies',
+    'division', 'unit', 'inc', 'ltd', 'corporation', 'company', 'foundation', 'society', 'conference',
+    'proceedings',
+}
+# Pieces made up of country names are parts of addresses
+_COUNTRIES = {
+    'uk', 'usa', 'united kingdom', 'united states', 'united states of america', 'america',
+    'new zealand', 'netherlands', 'the netherlands', 'denmark', 'norway', 'sweden', 'finland', 'germany',
+    'france', 'italy', 'spain', 'portugal', 'brazil', 'australia', 'canada', 'japan', 'china', 'korea',
+    'greece', 'austria', 'switzerland', 'belgium', 'ireland', 'scotland', 'england', 'wales', 'europe',
+}
+TITLE_WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'author_title_words.txt')
+
+Author = namedtuple('Author', 'name variants papers')
+
+def _recombine_accents(text):
+    """Attach spacing accents to the letter before them ('c´' -> 'ć', 'ı́' -> 'í')."""
+    text = _SPACING_ACCENT_RE.sub(lambda m: _SPACING_ACCENTS[m.group(1)], text)
+    text = re.sub('\u0131(?=[\u0300-\u036f])', 'i', text)
+    return unicodedata.normalize('NFC', text)
+
+def fold(text):
+    """text lower-cased, with diacritics and everything but letters removed."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if c.isalpha() and not unicodedata.combining(c))
+
+@lru_cache(maxsize=None)
+def title_words():
+    """Title words that leak into this corpus's authors fields (see author_title_words.txt)."""
+    with open(TITLE_WORDS_FILE, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip() and not line.startswith('#'))
+
+def _is_affiliation(piece):
+    return any(fold(word) in _AFFILIATION_WORDS for word in piece.split())
+
+@lru_cache(maxsize=None)
+def _country_keys():
+    return {tuple(fold(word) for word in country.split()) for country in _COUNTRIES}
+
+def _country_prefix(words):
+    """Number of leading folded words that spell one or more country names."""
+    position = 0
+    while position < len(words):
+        for length in range(min(4, len(words) - position), 0, -1):
+            if tuple(words[position:position + length]) in _country_keys():
+                position += length
+                break
+        else:
+            break
+    return position
+
+def _is_country(piece):
+    """True if piece is one or more country names ('UK', 'France Japan')."""
+    words = [fold(word) for word in piece.split()]
+    return bool(words) and _country_prefix(words) == len(words)
+
+def _is_place(piece):
+    """True if piece is or starts with a country ('France Toulouse' from two columns run together)."""
+    return _country_prefix([fold(word) for word in piece.split()]) > 0
+
+def _display_word(word):
+    if len(word) > 1 and word.isupper() and not _INITIALS_RE.match(word):
+        return word.title()
+    return word
+
+def _candidate_names(piece):
+    """Personal names in one piece of an authors field (usually one, none if it is not a name)."""
+    piece = _NICKNAME_RE.sub(' ', piece)
+    piece = _FOOTNOTE_RE.sub('', piece)
+    piece = re.sub(r'\s+', ' ', piece).strip(' .:-\t')
+    piece = _TRAILER_RE.sub('', _BY_RE.sub('', piece))
+    if not piece or _NOT_NAME_CHARS_RE.search(piece):
+        return []
+    words = [_display_word(word) for word in piece.split()]
+    folded = [fold(word) for word in words]
+    if not MIN_NAME_WORDS <= len(words) <= MAX_NAME_WORDS or len(set(folded)) < len(folded):
+        return []
+    for word, key in zip(words, folded):
+        if _INITIALS_RE.match(word):
+            continue
+        if (key in _PROSE_WORDS or key in _AFFILIATION_WORDS or key in title_words()
+                or not _NAME_WORD_RE.match(word)):
+            return []
+        if word[0].islower() and key not in PARTICLES:
+            return []
+    if folded[0] in PARTICLES or folded[-1] in PARTICLES or _INITIALS_RE.match(words[-1]):
+        return []  # a surname is neither a particle nor an initial
+    plain = not any(_INITIALS_RE.match(word) or key in PARTICLES for word, key in zip(words, folded))
+    if plain and len(words) in (4, 6) and not piece.isupper():
+        return [' '.join(words[i:i + 2]) for i in range(0, len(words), 2)]
+    return [' '.join(words)]
+
+def split_authors(text):
+    """Personal names found in an inventory authors field, in order, without repeats."""
+    names = []
+    for line in _recombine_accents(text or '').split(';'):
+        pieces = [piece for piece in _SPLIT_RE.split(line) if piece.strip()]
+        if len(pieces) == 2 and _is_country(pieces[1]):
+            continue  # a 'City, Country' address line
+        for piece in pieces:
+            if _is_affiliation(piece):
+                break  # an affiliation, followed by its address
+            if not _is_place(piece):
+                names.extend(_candidate_names(piece))
+    return list(dict.fromkeys(names))
+
+@lru_cache(maxsize=None)
+def name_parts(name):
+    """(folded surname, (folded given names and initials)) of a split_authors name."""
+    words = name.split()
+    given = []
+    for position, word in enumerate(words[:-1]):
+        if position and fold(word) in PARTICLES:
+            continue
+        if _INITIALS_RE.match(word) and '.' in word:
+            given.extend(fold(part) for part in re.split(r'[.\-]', word) if part)
+        else:
+            given.append(fold(word))
+    return fold(words[-1]), tuple(part for part in given if part)
+
+def compatible(given_a, given_b):
+    """True if two sequences of folded given names can belong to one person.
+
+    Names are compared in order; each pair must be equal or one an initial
+    of the other. A name missing at the end of the shorter one is allowed.
+    """
+    for a, b in zip(given_a, given_b):
+        if len(a) == 1 or len(b) == 1:
+            if a[0] != b[0]:
+                return False
+        elif a != b:
+            return False
+    return True
+
+def _specificity(name):
+    """Sort key putting the most complete and best-cased variant first."""
+    _, given = name_parts(name)
+    return (-sum(len(part) > 1 for part in given), -len(given),
+            name.isupper(), -sum(not c.isascii() for c in name), name)
+
+class AuthorIndex:
+    """Papers by author, with variants of a name grouped together; see the module docstring."""
+
+    def __init__(self):
+        self._papers = defaultdict(set)  # name variant -> papers
+        self._order = defaultdict(list)  # paper -> name variants in field order
+        self._groups = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """An index over inventory rows (their filename and authors)."""
+        index = cls()
+        for row in rows:
+            index.add(row['filename'], row.get('authors'))
+        return index
+
+    def add(self, paper, authors):
+        """Index the names in one paper's authors field."""
+        for name in split_authors(authors):
+            self._papers[name].add(paper)
+            if name not in self._order[paper]:
+                self._order[paper].append(name)
+        self._groups = None
+
+    def _grouped(self):
+        """({variant: group number}, [Author]), computed block by block."""
+        if self._groups is not None:
+            return self._groups
+        blocks = defaultdict(list)
+        for name in self._papers:
+            surname, given = name_parts(name)
+            blocks[surname, given[0][0] if given else ''].append(name)
+
+        group_of, authors = {}, []
+        for names in blocks.values():
+            groups = []  # [given names of the group's first variant, variants]
+            for name in sorted(names, key=_specificity):
+                given = name_parts(name)[1]
+                matches = [group for group in groups if compatible(group[0], given)]
+                if len(matches) == 1:
+                    matches[0][1].append(name)
+                else:  # a new person, or an abbreviation that fits several
+                    groups.append((given, [name]))
+            for _, variants in groups:
+                papers = set().union(*(self._papers[name] for name in variants))
+                counts = Counter({name: len(self._papers[name]) for name in variants})
+                # The most complete variant names the group; frequency breaks ties between equals
+                best = min(variants, key=lambda name: (_specificity(name)[:3], -counts[name], name))
+                for name in variants:
+                    group_of[name] = len(authors)
+                authors.append(Author(best, tuple(sorted(variants)), tuple(sorted(papers))))
+        self._groups = group_of, authors
+        return self._groups
+
+    def authors(self):
+        """Every Author (name, variants, papers), sorted by folded surname then name."""
+        return sorted(self._grouped()[1], key=lambda author: (name_parts(author.name)[0], author.name))
+
+    def canonical(self, name):
+        """The group name for a name variant in the index, else None."""
+        group_of, authors = self._grouped()
+        return authors[group_of[name]].name if name in group_of else None
+
+    def authors_of(self, paper):
+        """Group names of a paper's authors, in the order its authors field lists them."""
+        return list(dict.fromkeys(self.canonical(name) for name in self._order.get(paper, ())))
+
+    def find(self, query):
+        """Authors matching query: a full name (any variant of it) or a surname alone ('De Bra')."""
+        names = split_authors(' '.join(word[:1].upper() + word[1:] for word in query.split()))
+        _, authors = self._grouped()
+        if names:
+            surname, given = name_parts(names[0])
+            found = [author for author in authors if name_parts(author.name)[0] == surname and any(
+                compatible(name_parts(variant)[1], given) for variant in author.variants)]
+        else:
+            key = fold(query)
+            found = [author for author in authors if key and any(
+                ''.join(fold(word) for word in variant.split()[start:]) == key
+                for variant in author.variants for start in range(1, len(variant.split())))]
+        return sorted(found, key=lambda author: (-len(author.papers), author.name))
+
+    def papers(self, query):
+        """Sorted papers of every author matching query."""
+        return sorted(set().union(*(author.papers for author in self.find(query))))
+
+def read_rows(inventory=INVENTORY_CSV, store_path=None):
+    """Inventory rows from the paper store if given, else from the inventory CSV."""
+    if store_path:
+        with PaperStore(store_path) as store:
+            return list(store.papers())
+    with open(inventory, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def _print_author(author):
+    others = [name for name in author.variants if name != author.name]
+    print(f"{author.name} ({len(author.papers)} papers)" + (f"  also: {'; '.join(others)}" if others else ''))
+    for paper in author.papers:
+        print(f"    {paper}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up papers by author, with name variants grouped.')
+    parser.add_argument('names', nargs='*', help='author names or surnames to look up')
+    parser.add_argument('--list', action='store_true', help='list every author')
+    parser.add_argument('--min-papers', type=int, default=1, help='with --list, only authors of this many papers')
+    parser.add_argument('--inventory', default=INVENTORY_CSV, help=f'inventory CSV (default: {INVENTORY_CSV})')
+    add_store_argument(parser)
+    args = parser.parse_args()
+
+    rows = read_rows(args.inventory, args.store)
+    index = AuthorIndex.from_rows(rows)
+    for query in args.names:
+        found = index.find(query)
+        if not found:
+            print(f"{query}: no author found")
+        for author in found:
+            _print_author(author)
+
+    authors = index.authors()
+    if args.list:
+        for author in sorted(authors, key=lambda author: -len(author.papers)):
+            if len(author.papers) >= args.min_papers:
+                _print_author(author)
+    if not args.names:
+        variants = sum(len(author.variants) for author in authors)
+        with_authors = sum(bool(index.authors_of(row['filename'])) for row in rows)
+        print(f"\n{len(rows)} papers ({with_authors} with a recognised author), "
+              f"{variants} name variants, {len(authors)} authors")
+
+if __name__ == '__main__':
+    main()
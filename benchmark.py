@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the paper pipeline over reproducible synthetic corpora.
+
+Documents are generated from a seed: a title, authors, an affiliation, an
+abstract and body paragraphs. A share of them is garbled by applying
+garbled_fixes.csv in reverse (so 'the' becomes 't#e', 'world' becomes
+'%orld'). The same documents can be written as small single-font PDFs.
+
+Each stage is timed separately at every corpus size:
+- extract_text_from_pdf: generated PDFs through the chosen backend (at most
+  --pdfs per size, since every PDF costs process launches)
+- fix_garbled_text, is_garbled_text: every document text
+- garble_scores: the same texts scored a generation batch at a time
+- title_authors: front_matter.parse_front_matter, the pipeline's heuristics
+- title_authors_reference: the original extract_*_from_text functions
+- generate_markdown: one inventory row per document
+- find_next_paper: reviewed stems from a bibliography covering half the
+  corpus, then the review queue for the rest
+
+Documents are generated in batches outside the timed sections, so memory
+stays bounded at 50k documents. Results are written as JSON with the commit
+they were measured at; compare two result files to spot regressions:
+    python benchmark.py run [--sizes 100,1000,10000] [--output benchmark_results.json]
+    python benchmark.py compare OLD.json NEW.json [--tolerance 0.2]
+    python benchmark.py corpus DIR [--docs 100]   # write PDFs to DIR/referenced papers/
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from classify_papers import garble_scores, is_garbled_text
+from extract_paper_info import (extract_authors_from_text, extract_text_from_pdf,
+                                extract_title_from_text, fix_garbled_text, garbled_fixes)
+from find_next_paper import category_ranks, next_papers, read_reviewed_papers, review_queue
+from front_matter import parse_front_matter
+from generate_bibliography import generate_markdown
+from multi_pattern import ReplacementTable
+from pdf_backends import BACKENDS, available_backends
+
+RESULTS_FILE = 'benchmark_results.json'
+RESULTS_VERSION = 1
+BATCH_DOCS = 500
+GARBLED_SHARE = 0.2
+STAGES = ('extract_text_from_pdf', 'fix_garbled_text', 'is_garbled_text', 'garble_scores', 'title_authors',
+          'title_authors_reference', 'generate_markdown', 'find_next_paper')
+
+CATEGORIES = ['root', 'hypermedia', 'dexter_model', 'user_models', 'accessibility', 'mobile']
+FIRST_NAMES = ['John', 'Jane', 'Robert', 'Maria', 'Wei', 'Aisha', 'Pierre', 'Keiko', 'Lars', 'Ana']
+SURNAMES = ['Smith', 'Dodd', 'Bailey', 'Nielsen', 'Halasz', 'Schwartz', 'Garcia', 'Tanaka',
+            'Okafor', 'Moreau', 'Fischer', 'Kowalski']
+AFFILIATIONS = ['University of Toronto', 'Institute for Human Interaction', 'MIT Media Lab',
+                'Department of Computer Science, Aalto University']
+WORDS = ('the of and to in a is that for with as on by this are be user users interface interfaces '
+         'adaptive model models design system systems mobile world accessibility hypermedia '
+         'information task tasks study people context device devices interaction evaluation '
+         'which from their can we our results approach capability population persona navigation '
+         'link links node structure document presentation layer component storage runtime').split()
+
+def _sentence(rng, low=8, high=20):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+def _paragraph(rng, sentences=5):
+    return ' '.join(_sentence(rng) for _ in range(sentences))
+
+def _wrap(text, width=90):
+    lines, line = [], ''
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+@lru_cache(maxsize=None)
+def _garbler():
+    """garbled_fixes.csv in reverse: fixed text -> its garbled form."""
+    seen = set()
+    rows = []
+    for old, new in garbled_fixes().rows:
+        if new not in seen:
+            seen.add(new)
+            rows.append((new, old))
+    return ReplacementTable(rows)
+
+def make_document(seed, index, body_paragraphs=12, garbled_share=GARBLED_SHARE):
+    """One synthetic paper as a dict: stem, category, title, authors, garbled, lines, text."""
+    rng = random.Random(seed * 1000003 + index)
+    title = ' '.join(word.capitalize() for word in rng.choices(WORDS[10:], k=rng.randint(4, 9)))
+    authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}" for _ in range(rng.randint(1, 3))]
+    lines = [title, '', ', '.join(authors), rng.choice(AFFILIATIONS), '', 'Abstract']
+    lines += _wrap(_paragraph(rng, 4))
+    lines += ['', '1. Introduction']
+    for _ in range(body_paragraphs):
+        lines += _wrap(_paragraph(rng)) + ['']
+
+    garbled = rng.random() < garbled_share
+    text = '\n'.join(lines) + '\n'
+    if garbled:
+        text = _garbler().apply(text)
+        lines = text.split('\n')[:-1]
+    return {
+        'stem': f"paper{index:06d}",
+        'category': CATEGORIES[index % len(CATEGORIES)],
+        'title': title,
+        'authors': ', '.join(authors),
+        'garbled': garbled,
+        'lines': lines,
+        'text': text,
+    }
+
+def documents(seed, count, **kwargs):
+    """Yield lists of at most BATCH_DOCS documents, count in total."""
+    for start in range(0, count, BATCH_DOCS):
+        yield [make_document(seed, i, **kwargs) for i in range(start, min(count, start + BATCH_DOCS))]
+
+_PDF_LINES_PER_PAGE = 60
+
+def _pdf_string(text):
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+def minimal_pdf(lines, title='', author=''):
+    """Bytes of a PDF showing lines of ASCII text in Helvetica, 60 lines per page."""
+    pages = [lines[i:i + _PDF_LINES_PER_PAGE] for i in range(0, len(lines), _PDF_LINES_PER_PAGE)] or [[]]
+    # Objects: 1 catalog, 2 pages, 3 font, 4 info, then a page and its content per page
+    objects = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+               4: f"<< /Title {_pdf_string(title)} /Author {_pdf_string(author)} "
+                  f"/Producer (benchmark.py) >>".encode('latin-1')}
+    kids = []
+    for n, page_lines in enumerate(pages):
+        page_id, content_id = 5 + 2 * n, 6 + 2 * n
+        kids.append(f"{page_id} 0 R")
+        ops = ['BT', '/F1 10 Tf', '12 TL', '50 770 Td']
+        ops += [f"{_pdf_string(line)} Tj T*" for line in page_lines]
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1', 'replace')
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    out += b''.join(b"%010d 00000 n \n" % offsets[number] for number in range(1, size))
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+def write_corpus(root, count, seed=0, **kwargs):
+    """Write count generated PDFs to root/referenced papers/<category>/; returns their paths."""
+    paths = []
+    for batch in documents(seed, count, **kwargs):
+        for doc in batch:
+            directory = os.path.join(root, 'referenced papers', doc['category'])
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, doc['stem'] + '.pdf')
+            with open(path, 'wb') as f:
+                f.write(minimal_pdf(doc['lines'], doc['title'], doc['authors']))
+            paths.append(path)
+    return paths
+
+def _inventory_row(doc):
+    return {'filename': f"{doc['category']}/{doc['stem']}.pdf", 'category': doc['category'],
+            'title': doc['title'], 'authors': doc['authors'],
+            'abstract_preview': doc['lines'][6][:200], 'text_file': f"{doc['stem']}_review.txt"}
+
+def _timed(function, items):
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return time.perf_counter() - start
+
+def _title_authors(text):
+    extract_title_from_text(text)
+    extract_authors_from_text(text)
+
+def bench_size(size, seed=0, pdfs=50, backend='subprocess', stages=STAGES):
+    """{stage: {'seconds', 'docs'}} for a corpus of size documents."""
+    totals = {stage: [0.0, 0] for stage in stages}
+    text_stages = {
+        'fix_garbled_text': fix_garbled_text,
+        'is_garbled_text': is_garbled_text,
+        'title_authors': parse_front_matter,
+        'title_authors_reference': _title_authors,
+    }
+    rows = []
+    garbled = 0
+    for batch in documents(seed, size):
+        texts = [doc['text'] for doc in batch]
+        for stage, function in text_stages.items():
+            if stage in totals:
+                totals[stage][0] += _timed(function, texts)
+                totals[stage][1] += len(texts)
+        if 'garble_scores' in totals:
+            totals['garble_scores'][0] += _timed(garble_scores, [texts])
+            totals['garble_scores'][1] += len(texts)
+        rows.extend(_inventory_row(doc) for doc in batch)
+        garbled += sum(doc['garbled'] for doc in batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if 'extract_text_from_pdf' in totals and pdfs:
+            paths = write_corpus(tmp, min(pdfs, size), seed)
+            from pdf_backends import open_document
+
+            def extract(path):
+                with open_document(path, backend) as document:
+                    extract_text_from_pdf(path, document=document)
+            totals['extract_text_from_pdf'] = [_timed(extract, paths), len(paths)]
+
+        if 'generate_markdown' in totals:
+            papers_by_category = {}
+            for row in rows:
+                papers_by_category.setdefault(row['category'], []).append(row)
+            start = time.perf_counter()
+            generate_markdown(papers_by_category, os.path.join(tmp, 'bibliography.md'))
+            totals['generate_markdown'] = [time.perf_counter() - start, len(rows)]
+
+        if 'find_next_paper' in totals:
+            bibliography = os.path.join(tmp, 'COMPREHENSIVE_BIBLIOGRAPHY.md')
+            with open(bibliography, 'w', encoding='utf-8') as f:
+                for row in rows[::2]:
+                    f.write(f"### {row['title']}\n\n**File:** `referenced papers/{row['filename']}`\n\n")
+            details = {row['filename'].split('/')[1][:-4]: (row['category'], None) for row in rows}
+            start = time.perf_counter()
+            reviewed = read_reviewed_papers(bibliography)
+            to_review = [stem for stem in details if stem not in reviewed]
+            queue = review_queue(to_review, details, {}, category_ranks(details, reviewed))
+            next_papers(queue, 20)
+            totals['find_next_paper'] = [time.perf_counter() - start, len(rows)]
+
+    results = {stage: {'seconds': seconds, 'docs': docs} for stage, (seconds, docs) in totals.items()}
+    results['_corpus'] = {'docs': size, 'garbled': garbled}
+    return results
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def run(sizes, seed=0, pdfs=50, backend='subprocess', stages=STAGES):
+    """Benchmark every size; returns the JSON-ready results document."""
+    results = []
+    for size in sizes:
+        measured = bench_size(size, seed, pdfs, backend, stages)
+        corpus = measured.pop('_corpus')
+        for stage, timing in measured.items():
+            per_doc = timing['seconds'] / timing['docs'] * 1000 if timing['docs'] else None
+            results.append({'size': size, 'stage': stage, 'docs': timing['docs'],
+                            'seconds': timing['seconds'], 'ms_per_doc': per_doc})
+        print(f"{size} documents ({corpus['garbled']} garbled):")
+        for row in results[-len(measured):]:
+            if row['docs']:
+                print(f"  {row['stage']:25} {row['seconds']:9.3f}s  {row['ms_per_doc']:9.4f}ms/doc  "
+                      f"({row['docs']} docs)")
+    return {
+        'version': RESULTS_VERSION,
+        'commit': _commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'backend': backend,
+        'results': results,
+    }
+
+def compare(old, new, tolerance=0.2):
+    """Rows (size, stage, old ms/doc, new ms/doc, ratio) for stages measured in both.
+
+    Returns (rows, regressions) where regressions are the rows whose time per
+    document grew by more than tolerance.
+    """
+    before = {(r['size'], r['stage']): r['ms_per_doc'] for r in old['results'] if r['ms_per_doc']}
+    rows = []
+    for r in new['results']:
+        key = (r['size'], r['stage'])
+        if key in before and r['ms_per_doc']:
+            rows.append((r['size'], r['stage'], before[key], r['ms_per_doc'], r['ms_per_doc'] / before[key]))
+    regressions = [row for row in rows if row[4] > 1 + tolerance]
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the paper pipeline on synthetic corpora.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    timing = commands.add_parser('run', help='time each stage and write the results')
+    timing.add_argument('--sizes', default='100,1000,10000',
+                        help='comma-separated corpus sizes (default 100,1000,10000; up to 50000)')
+    timing.add_argument('--seed', type=int, default=0)
+    timing.add_argument('--pdfs', type=int, default=50, help='PDFs extracted per size (default 50)')
+    timing.add_argument('--backend', choices=sorted(BACKENDS), default='subprocess')
+    timing.add_argument('--stages', default=','.join(STAGES), help='comma-separated stages to time')
+    timing.add_argument('--output', default=RESULTS_FILE, help=f'results file (default: {RESULTS_FILE})')
+    check = commands.add_parser('compare', help='compare two results files')
+    check.add_argument('old')
+    check.add_argument('new')
+    check.add_argument('--tolerance', type=float, default=0.2,
+                       help='slow-down per document reported as a regression (default 0.2 = 20%%)')
+    corpus = commands.add_parser('corpus', help='write generated PDFs for extract_paper_info.py')
+    corpus.add_argument('directory')
+    corpus.add_argument('--docs', type=int, default=100)
+    corpus.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'corpus':
+        paths = write_corpus(args.directory, args.docs, args.seed)
+        print(f"Wrote {len(paths)} PDFs to {os.path.join(args.directory, 'referenced papers')}")
+        return
+
+    if args.command == 'compare':
+        with open(args.old, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        rows, regressions = compare(old, new, args.tolerance)
+        print(f"{old.get('commit') or '?'} -> {new.get('commit') or '?'}")
+        print(f"{'size':>7} {'stage':25} {'old ms/doc':>11} {'new ms/doc':>11} {'change':>8}")
+        for size, stage, before, after, ratio in rows:
+            flag = '  REGRESSION' if ratio > 1 + args.tolerance else ''
+            print(f"{size:7} {stage:25} {before:11.4f} {after:11.4f} {(ratio - 1) * 100:+7.1f}%{flag}")
+        print(f"{len(regressions)} regressions over {args.tolerance:.0%}")
+        sys.exit(1 if regressions else 0)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    if args.backend not in available_backends():
+        parser.error(f"backend {args.backend} is not available here")
+    sizes = [int(size) for size in args.sizes.split(',')]
+    document = run(sizes, args.seed, args.pdfs, args.backend, stages)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
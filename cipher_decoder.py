@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Infer and undo per-document character substitutions in garbled PDF text.
+
+Garbled PDFs come from fonts whose glyph codes are remapped consistently
+across a document ('+' for u, '6' for c, '1' for g, '3' for b, '%' for w, an
+e/i swap, ...). garbled_fixes.csv repairs known words one at a time; this
+module instead infers the document's mapping from its own bigram
+statistics:
+
+- an English bigram model over letters (case folded), ' ' (any
+  whitespace) and each other ASCII character is built from
+  REFERENCE_TEXT, a fixed copy of the hand-written reviews shipped with
+  this module, so editing COMPREHENSIVE_BIBLIOGRAPHY.md does not change
+  extraction output
+- candidates are the lowercase letters and the symbols that sit inside
+  words (MIN_INSIDE_SHARE of their uses), seen at least MIN_USES times;
+  genuine digits and punctuation mostly do not
+- starting from the identity, hill climbing gives a symbol a letter no
+  other symbol holds, lets it take one from another symbol, or swaps two
+  letters, whenever that raises the document's bigram log-likelihood by
+  MIN_GAIN_PER_USE nats per use of the symbols involved
+- the mapping is applied to the whole text in one str.translate pass
+
+Only text that looks_garbled (more than GARBLED_WORD_SHARE of its words
+carry one of GARBLED_SYMBOLS inside them, as in '6apa3ility') may have
+punctuation remapped; elsewhere only letters and digits are candidates, so
+hyphens, brackets and markup in clean text stay as they are. Text within
+ENGLISH_MARGIN of the model's own likelihood is left alone without
+climbing. The confidence is where the decoded text's likelihood
+falls between uniform noise (0) and the reference text (1). Glyphs for
+punctuation ('8' for '.'), capitals, and substitutions that merge two
+letters into one glyph (m and e both shown as 'e') are not inferred; the
+word table still covers those.
+
+Decode review texts and show the inferred mappings (default: the papers in
+garbled_papers.txt):
+    python cipher_decoder.py [STEM ...] [--write] [--review-store [PATH]]
+"""
+
+import argparse
+import math
+import os
+import re
+import string
+from collections import Counter
+from functools import lru_cache
+
+from paper_store import read_paper_list
+from review_store import add_review_store_argument, open_reviews
+
+REFERENCE_TEXT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cipher_reference.txt')
+LETTERS = string.ascii_lowercase
+_FIXED = '\x7f'
+CLASSES = LETTERS + ' ' + string.digits + string.punctuation + _FIXED
+SAMPLE_CHARS = 50000  # characters used to infer a mapping
+MIN_USES = 3
+MIN_GAIN_PER_USE = 1.0
+MIN_INSIDE_SHARE = 0.3  # of a symbol's uses inside a word, for it to stand for a letter
+ENGLISH_MARGIN = 0.05  # nats per bigram
+# Glyphs old font encodings substitute for letters, and the share of words
+# with one inside them above which text counts as garbled (clean thesis
+# texts stay below 0.03; a few remapped letters put text above 0.15)
+GARBLED_SYMBOLS = '#%+3615?248@>;='
+GARBLED_WORD_SHARE = 0.05
+MAX_SWEEPS = 20
+
+_SPACE_RE = re.compile(r'\s+')
+_OTHER_RE = re.compile(r'[^ -~]')  # non-ASCII: never remapped
+# A character between two non-spaces, at least one of them a letter
+_INSIDE_RE = re.compile(r'(?<=[A-Za-z])([^ ])(?=[^ ])|(?<=[^ ])([^ ])(?=[A-Za-z])')
+_GARBLED_WORD_RE = re.compile('[A-Za-z' + re.escape(GARBLED_SYMBOLS) + ']+')
+
+def _symbols(text):
+    """text with whitespace runs as ' ' and non-ASCII characters as _FIXED."""
+    return _OTHER_RE.sub(_FIXED, _SPACE_RE.sub(' ', text))
+
+def _class(symbol):
+    """Class a symbol reads as before decoding: itself, with letters case folded."""
+    return symbol.lower() if symbol in string.ascii_letters else symbol
+
+@lru_cache(maxsize=None)
+def english_model(path=REFERENCE_TEXT):
+    """(log P(next class | class) as nested lists over CLASSES, average log-likelihood of the reference text)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        tokens = ''.join(_class(c) for c in _symbols(f.read()))
+    counts = Counter(zip(tokens, tokens[1:]))
+    index = {c: i for i, c in enumerate(CLASSES)}
+    table = [[0.0] * len(CLASSES) for _ in CLASSES]
+    for a in CLASSES:
+        total = sum(counts[a, b] for b in CLASSES) + 0.5 * len(CLASSES)
+        for b in CLASSES:
+            table[index[a]][index[b]] = math.log((counts[a, b] + 0.5) / total)
+    pairs = sum(counts.values())
+    average = sum(count * table[index[a]][index[b]] for (a, b), count in counts.items()) / pairs
+    return table, average
+
+def looks_garbled(text):
+    """True if more than GARBLED_WORD_SHARE of text's words have a GARBLED_SYMBOLS glyph inside them."""
+    words = garbled = 0
+    for word in _GARBLED_WORD_RE.findall(text[:SAMPLE_CHARS]):
+        if sum(c.isalpha() for c in word) < 2:
+            continue
+        words += 1
+        if any(c in GARBLED_SYMBOLS for c in word[1:-1]):
+            garbled += 1
+    return words > 0 and garbled / words > GARBLED_WORD_SHARE
+
+def infer_mapping(text, model=None, punctuation=False):
+    """Infer text's substitutions: ({cipher character: plain letter}, confidence).
+
+    The mapping lists changed symbols only and is empty for text that
+    already reads as English. Punctuation is only remapped if punctuation
+    is true. confidence is 0..1 (see the module docstring).
+    """
+    table, reference = model or english_model()
+    tokens = _symbols(text[:SAMPLE_CHARS])
+    counts = Counter(zip(tokens, tokens[1:]))
+    pairs = sum(counts.values())
+    if not pairs:
+        return {}, 0.0
+
+    index = {c: i for i, c in enumerate(CLASSES)}
+    uses = Counter(tokens)
+    start = {s: index[_class(s)] for s in uses}
+    mapping = dict(start)
+    after = {s: Counter() for s in uses}
+    before = {s: Counter() for s in uses}
+    for (a, b), count in counts.items():
+        after[a][b] += count
+        before[b][a] += count
+
+    def likelihood():
+        return sum(count * table[mapping[a]][mapping[b]] for (a, b), count in counts.items()) / pairs
+
+    identity = likelihood()
+    uniform = math.log(1 / len(CLASSES))
+    if identity >= reference - ENGLISH_MARGIN:
+        return {}, round(min(1.0, (identity - uniform) / (reference - uniform)), 3)
+
+    def gain(symbol, target):
+        """Change in total log-likelihood if symbol mapped to target."""
+        old = mapping[symbol]
+        delta = 0.0
+        for neighbour, count in after[symbol].items():
+            if neighbour != symbol:
+                delta += count * (table[target][mapping[neighbour]] - table[old][mapping[neighbour]])
+        for neighbour, count in before[symbol].items():
+            if neighbour != symbol:
+                delta += count * (table[mapping[neighbour]][target] - table[mapping[neighbour]][old])
+        delta += after[symbol][symbol] * (table[target][target] - table[old][old])
+        return delta
+
+    # Symbols standing in for letters often sit inside words, next to a
+    # letter; genuine punctuation and digits (and glyphs for them) rarely do.
+    # Capitals are left as they are.
+    inside = Counter(match.group(match.lastindex) for match in _INSIDE_RE.finditer(tokens))
+    fixed = string.ascii_letters + ' ' + _FIXED + ('' if punctuation else string.punctuation)
+    movable = [s for s, n in uses.most_common() if n >= MIN_USES
+               and (s in LETTERS or s not in fixed and inside[s] >= MIN_INSIDE_SHARE * n)]
+    symbols = [s for s in movable if s not in LETTERS]
+    for _ in range(MAX_SWEEPS):
+        moved = False
+        # Each letter is one glyph: a symbol may take a letter no candidate holds
+        taken = {mapping[s] for s in movable}
+        for symbol in symbols:
+            free = [t for t in range(len(LETTERS)) if t not in taken] + [start[symbol]]
+            moves = [(gain(symbol, t), t) for t in free if t != mapping[symbol]]
+            if not moves:
+                continue
+            best, target = max(moves)
+            if best >= MIN_GAIN_PER_USE * uses[symbol]:
+                taken.discard(mapping[symbol])
+                taken.add(target)
+                mapping[symbol] = target
+                moved = True
+
+        def exchange(a, b, returned, needed):
+            """Give a b's letter and b returned, if that gains enough."""
+            old_a = mapping[a]
+            first = gain(a, mapping[b])
+            mapping[a] = mapping[b]
+            if first + gain(b, returned) >= MIN_GAIN_PER_USE * needed:
+                mapping[b] = returned
+                return True
+            mapping[a] = old_a
+            return False
+
+        for i, a in enumerate(movable):
+            for b in movable[i + 1:]:
+                if a in LETTERS and b in LETTERS:
+                    moved |= exchange(a, b, mapping[a], uses[a] + uses[b])  # two letters trade places
+        for a in symbols:
+            for b in symbols:
+                if a != b and mapping[b] < len(LETTERS):
+                    # a takes b's letter, b reads as itself again
+                    moved |= exchange(a, b, start[b], uses[a])
+        if not moved:
+            break
+
+    decoded = likelihood()
+    changed = {s: CLASSES[c] for s, c in mapping.items() if c != start[s]}
+    return changed, round(max(0.0, min(1.0, (decoded - uniform) / (reference - uniform))), 3)
+
+def translation_table(mapping):
+    """str.translate table for an infer_mapping mapping."""
+    return {ord(cipher): plain for cipher, plain in mapping.items()}
+
+def decode_text(text, report=None):
+    """Undo text's inferred substitutions; report (a dict) receives 'cipher' when a mapping is applied.
+
+    Punctuation is only remapped in text that looks_garbled.
+    """
+    if not text:
+        return text
+    mapping, confidence = infer_mapping(text, punctuation=looks_garbled(text))
+    if not mapping:
+        return text
+    if report is not None:
+        report['cipher'] = {'mapping': mapping, 'confidence': confidence}
+    return text.translate(translation_table(mapping))
+
+def main():
+    parser = argparse.ArgumentParser(description='Infer and undo character substitutions in review texts.')
+    parser.add_argument('stems', nargs='*', help='papers to decode (default: those in --list)')
+    parser.add_argument('--list', default='garbled_papers.txt', help='paper list (default: garbled_papers.txt)')
+    parser.add_argument('--reviews', default='paper_reviews', help='review directory (default: paper_reviews)')
+    parser.add_argument('--write', action='store_true', help='replace the review texts with the decoded ones')
+    add_review_store_argument(parser)
+    args = parser.parse_args()
+
+    stems = args.stems or read_paper_list(args.list)
+    decoded = 0
+    with open_reviews(args.reviews, args.review_store) as reviews:
+        for stem in stems:
+            text = reviews.get(stem)
+            if text is None:
+                print(f"{stem}: no review text")
+                continue
+            report = {}
+            fixed = decode_text(text, report)
+            if 'cipher' not in report:
+                print(f"{stem}: no substitutions found")
+                continue
+            cipher = report['cipher']
+            pairs = ' '.join(f"{a}>{b}" for a, b in sorted(cipher['mapping'].items()))
+            print(f"{stem}: confidence {cipher['confidence']:.2f}  {pairs}")
+            decoded += 1
+            if args.write:
+                reviews.put(stem, fixed)
+    print(f"\n{decoded} of {len(stems)} texts decoded" + (' and rewritten' if args.write and decoded else ''))
+
+if __name__ == '__main__':
+    main()
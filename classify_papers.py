@@ -1,98 +1,431 @@
 #!/usr/bin/env python3
 """
-Classify paper reviews as clean vs garbled based on suspicious character count.
+Classify paper reviews as clean vs garbled based on suspicious character count
+and known garbled-word patterns.
 """
 
+import argparse
+import csv
 import os
 import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
-def is_garbled_text(text):
-    """Check if text appears garbled based on suspicious character frequency and patterns."""
+try:
+    import numpy as np
+except ImportError:  # batch scoring falls back to garble_score per text
+    np = None
+
+from paper_store import PaperStore, add_store_argument
+from review_store import ReviewFiles, ReviewStore, add_review_store_argument
+
+# Characters that old font encodings substitute for letters
+SUSPICIOUS_CHARS = '#%+3615?m248@>;=J'
+
+# Known garbled fragments (old font encoding)
+GARBLED_PATTERNS = [
+    r't#e', r'%orld', r'pop\+lation', r'a1in1', r'n\+m3er',
+    r'e5perien6in1', r'f\+n6tional', r'6apa3ility', r'desi1n',
+    r'prod\+6ts', r's\+66ess', r'\+\s*sers', r'6orre6t',
+    r'lsk\d+Jeng', r'pjc\d+Jeng'  # garbled email patterns
+]
+
+# Words produced by e->i, t->e style substitutions (a different font encoding issue)
+SUBSTITUTION_WORDS = [
+    'systee', 'inforeation', 'eobile', 'coeputer',
+    'ieproveeents', 'eappings', 'coepleted', 'eode',
+    'graeear', 'optieization', 'prograeeing', 'subsystee',
+    'atteept', 'developers', 'lieitations', 'proprietary',
+    'toolkits', 'operating', 'features', 'notably',
+    'library', 'virtual', 'eeeory', 'prelieinary',
+    'vocabulary', 'opportunities', 'otherwise', 'engaged',
+    'designed', 'typically', 'exclusively', 'eeploy',
+    'sieple', 'fore', 'candidate', 'considerations',
+    'trade-offs', 'eepirical', 'evaluation', 'ieproveeents',
+]
+
+# Each signal and the value above which it marks text as garbled
+GARBLE_THRESHOLDS = {
+    'suspicious_ratio': 0.01,  # share of characters in SUSPICIOUS_CHARS
+    'pattern_hits': 0.5,  # distinct GARBLED_PATTERNS found (any one is enough)
+    'substitution_hits': 15,  # SUBSTITUTION_WORDS found
+    'garbled_words': 30,  # words of 5+ letters ending 'ee' or with 'ie' + consonant
+}
+
+# The last two thresholds were tuned on 5000-character samples; for longer
+# texts they are scaled up in proportion so whole documents can be scored.
+GARBLE_REFERENCE_LENGTH = 5000
+_LENGTH_SCALED = ('substitution_hits', 'garbled_words')
+
+_PATTERN_RES = [re.compile(pattern) for pattern in GARBLED_PATTERNS]
+_SUBSTITUTION_WEIGHTS = Counter(SUBSTITUTION_WORDS)
+# Plain words match as the tail of a word token; the rest (trade-offs) need a regex
+_SUBSTITUTION_TAILS = {w for w in _SUBSTITUTION_WEIGHTS if re.fullmatch(r'\w+', w)}
+_SUBSTITUTION_TAIL_LENGTHS = sorted({len(w) for w in _SUBSTITUTION_TAILS})
+_SUBSTITUTION_RES = {w: re.compile(re.escape(w) + r'\b', re.IGNORECASE)
+                     for w in _SUBSTITUTION_WEIGHTS if w not in _SUBSTITUTION_TAILS}
+_WORD_RE = re.compile(r'\w+')
+_IE_RE = re.compile(r'ie[^aeiou]')
+
+_SUSPICIOUS_CODES = [ord(c) for c in SUSPICIOUS_CHARS]
+BATCH_DOCS = 2000  # texts scored per NumPy batch
+READ_WORKERS = 8  # threads reading review texts in batch mode
+READ_CHUNK = 50  # texts read per thread task
+
+def garble_score(text):
+    """Score how garbled text looks.
+
+    Returns a dict with each signal of GARBLE_THRESHOLDS, the 'scale' applied
+    to the length-dependent thresholds, and 'score': the largest signal as a
+    multiple of its threshold. A score above 1.0 means garbled at the default
+    threshold.
+
+    All patterns are precompiled and the text is tokenised once; the word
+    signals are then computed over distinct tokens rather than every word.
+    """
+    breakdown = {signal: 0 for signal in GARBLE_THRESHOLDS}
+    breakdown.update(score=0.0, scale=1.0)
     if not text or len(text) < 100:
-        return False  # Too short to judge
+        return breakdown  # Too short to judge
 
-    # Pattern 1: Check suspicious characters (old font encoding)
-    suspicious = set('#%+3615?m248@>;=J')
     total_chars = len(text)
-    suspicious_count = sum(1 for c in text if c in suspicious)
-    suspicious_ratio = suspicious_count / total_chars if total_chars > 0 else 0
-
-    # If more than 1% suspicious characters, likely garbled
-    if suspicious_ratio > 0.01:
-        return True
-
-    # Pattern 2: Check for common garbled patterns (old font encoding)
-    garbled_patterns = [
-        r't#e', r'%orld', r'pop\+lation', r'a1in1', r'n\+m3er',
-        r'e5perien6in1', r'f\+n6tional', r'6apa3ility', r'desi1n',
-        r'prod\+6ts', r's\+66ess', r'\+\s*sers', r'6orre6t',
-        r'lsk\d+Jeng', r'pjc\d+Jeng'  # garbled email patterns
-    ]
-    for pattern in garbled_patterns:
-        if re.search(pattern, text):
-            return True
-
-    # Pattern 3: Check for common substitution patterns (e->i, t->e, etc.)
-    # These indicate a different font encoding issue
-    substitution_patterns = [
-        r'systee\b', r'inforeation\b', r'eobile\b', r'coeputer\b',
-        r'ieproveeents\b', r'eappings\b', r'coepleted\b', r'eode\b',
-        r'graeear\b', r'optieization\b', r'prograeeing\b', r'subsystee\b',
-        r'atteept\b', r'developers\b', r'lieitations\b', r'proprietary\b',
-        r'toolkits\b', r'operating\b', r'features\b', r'notably\b',
-        r'library\b', r'virtual\b', r'eeeory\b', r'prelieinary\b',
-        r'vocabulary\b', r'opportunities\b', r'otherwise\b', r'engaged\b',
-        r'designed\b', r'typically\b', r'exclusively\b', r'eeploy\b',
-        r'sieple\b', r'fore\b', r'candidate\b', r'considerations\b',
-        r'trade-offs\b', r'eepirical\b', r'evaluation\b', r'ieproveeents\b',
-    ]
-
-    # Count substitution pattern matches
-    substitution_count = 0
-    for pattern in substitution_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            substitution_count += 1
-
-    # If more than 15 distinct substitution patterns found, likely garbled
-    if substitution_count > 15:
-        return True
-
-    # Pattern 4: Check for unusual word patterns that suggest garbling
-    # Look for words with repeated 'e' -> 'i' substitution
-    words = re.findall(r'\b\w{5,}\b', text.lower())
-    garbled_word_count = 0
-    for word in words:
-        # Words ending with 'ee' (should be '...ed' or similar)
-        if re.search(r'ee\b', word) and len(word) > 4:
-            garbled_word_count += 1
-        # Words with 'ie' in middle (common substitution)
-        if re.search(r'ie[^aeiou]', word) and len(word) > 4:
-            garbled_word_count += 1
-
-    if garbled_word_count > 30:
-        return True
-
-    return False
-
-def analyze_reviews(reviews_dir):
-    """Analyze all review files and classify them."""
+    breakdown['suspicious_ratio'] = sum(text.count(c) for c in SUSPICIOUS_CHARS) / total_chars
+    breakdown['pattern_hits'] = sum(1 for regex in _PATTERN_RES if regex.search(text))
+
+    found = {w for w, regex in _SUBSTITUTION_RES.items() if regex.search(text)}
+    garbled_words = 0
+    for word, count in Counter(_WORD_RE.findall(text.lower())).items():
+        length = len(word)
+        if length >= 5:
+            # Words ending with 'ee' (should be '...ed' or similar)
+            if word.endswith('ee'):
+                garbled_words += count
+            # Words with 'ie' in middle (common e->i substitution)
+            if _IE_RE.search(word):
+                garbled_words += count
+        for tail in _SUBSTITUTION_TAIL_LENGTHS:
+            if tail > length:
+                break
+            if word[-tail:] in _SUBSTITUTION_TAILS:
+                found.add(word[-tail:])
+    breakdown['substitution_hits'] = sum(_SUBSTITUTION_WEIGHTS[w] for w in found)
+    breakdown['garbled_words'] = garbled_words
+
+    scale = max(1.0, total_chars / GARBLE_REFERENCE_LENGTH)
+    breakdown['scale'] = scale
+    breakdown['score'] = max(
+        breakdown[signal] / (limit * scale if signal in _LENGTH_SCALED else limit)
+        for signal, limit in GARBLE_THRESHOLDS.items()
+    )
+    return breakdown
+
+def _required_codes(regex):
+    """ASCII code points every match of regex contains (none for patterns with groups or classes)."""
+    pattern = regex.pattern
+    if any(c in pattern for c in '[(|'):
+        return []
+    required = []
+    tokens = re.findall(r'\\(.)|(.)', pattern)
+    for (escaped, plain), (_, following) in zip(tokens, tokens[1:] + [('', '')]):
+        if escaped:
+            char = '' if escaped.isalnum() else escaped  # \d, \s, \b ... are not literals
+        else:
+            char = '' if plain in '.^$*+?{}' else plain
+        if not char or following in ('?', '*', '{') or ord(char) > 127:
+            continue
+        if regex.flags & re.IGNORECASE and char.isalpha():
+            continue
+        required.append(ord(char))
+    return required
+
+def _matching_docs(regex, texts, histogram):
+    """Indices of the texts regex finds a match in.
+
+    Only texts containing the pattern's rarest required character are
+    searched, which skips most texts for the symbol-laden garbled patterns.
+    """
+    required = _required_codes(regex)
+    if required:
+        key = min(required, key=lambda code: histogram[:, code].sum())
+        candidates = np.flatnonzero(histogram[:, key])
+    else:
+        candidates = range(len(texts))
+    return [i for i in candidates if regex.search(texts[i])]
+
+def _joined_codes(texts):
+    """(small, codes, starts, lengths) for the texts joined by NUL separators.
+
+    small has one uint8 per character: the character itself if ASCII, else
+    128. codes has the uint32 code points, or is None when all the text is
+    ASCII. starts and lengths give each text's offset and length.
+    """
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    joined = '\0'.join(texts)
+    if joined.isascii():
+        return np.frombuffer(joined.encode('ascii'), dtype=np.uint8), None, starts, lengths
+    codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+    return np.minimum(codes, 128).astype(np.uint8), codes, starts, lengths
+
+def _lookup(chars):
+    """Table over code points 0..128 (128: anything beyond ASCII), True for chars."""
+    table = np.zeros(129, dtype=bool)
+    table[[ord(c) for c in chars]] = True
+    return table
+
+if np is not None:
+    _ASCII_WORD = _lookup([chr(c) for c in range(128) if _WORD_RE.match(chr(c))])
+    _VOWELS = _lookup('aeiou')
+    _TAIL_WORDS = sorted(_SUBSTITUTION_TAILS)
+    _TAIL_WEIGHTS = np.array([_SUBSTITUTION_WEIGHTS[w] for w in _TAIL_WORDS])
+    _TAIL_ENDINGS = np.zeros((129, 129), dtype=bool)  # [last character, one before]
+    for _tail in _TAIL_WORDS:
+        _TAIL_ENDINGS[ord(_tail[-1]), ord(_tail[-2])] = True
+    # [n]: a little-endian 64-bit mask clearing the first n bytes
+    _LOW_BYTES_CLEARED = np.array([(2 ** 64 - 1) >> 8 * n << 8 * n for n in range(9)], dtype=np.uint64)
+
+def _distinct_keys(keys):
+    """(distinct rows, index of each row's distinct row) for an (n, 2) uint64 key array.
+
+    Rows are told apart by a hash of their two halves, checked against the
+    rows themselves; on a collision they are sorted as 16-byte strings.
+    """
+    hashes = keys[:, 0] * np.uint64(0x9E3779B97F4A7C15) ^ keys[:, 1]
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if (keys == keys[first[inverse]]).all():
+        return keys[first], inverse
+    distinct, inverse = np.unique(np.ascontiguousarray(keys).view('V16').ravel(), return_inverse=True)
+    return distinct.view('<u8').reshape(-1, 2), inverse.ravel()
+
+def _word_signals(texts):
+    """(found _TAIL_WORDS matrix, garbled word counts) per text, as garble_score computes them.
+
+    Works on the lowercased texts as one array of character codes: tokens
+    are the runs of word characters, and only the distinct endings of the
+    tokens are compared with the substitution words.
+    """
+    count = len(texts)
+    lowered = [text.lower() for text in texts]
+    small, codes, starts, _ = _joined_codes(lowered)
+    word = _ASCII_WORD[small]
+    if codes is not None:
+        # Beyond ASCII, ask the regex engine itself which characters are \\w
+        others = np.unique(codes[small == 128])
+        word |= np.isin(codes, others[[bool(_WORD_RE.match(chr(c))) for c in others]])
+    padded = np.zeros(len(word) + 2, dtype=bool)
+    padded[1:-1] = word
+    token_starts = np.flatnonzero(padded[1:] > padded[:-1])
+    token_ends = np.flatnonzero(padded[1:] < padded[:-1])  # exclusive
+    token_lengths = token_ends - token_starts
+    token_docs = np.searchsorted(starts, token_starts, side='right') - 1
+    long_tokens = token_lengths >= 5
+
+    # Words of 5+ characters ending 'ee' (a long token has two characters to look back at)
+    e, i = ord('e'), ord('i')
+    ends_ee = long_tokens & (small[token_ends - 1] == e) & (small[token_ends - 2] == e)
+    garbled_words = np.bincount(token_docs[ends_ee], minlength=count)
+    # ... and those containing 'ie' followed by a word character that is not a vowel
+    ie = np.flatnonzero(small[:-2] == i)
+    ie = ie[(small[ie + 1] == e) & word[ie + 2] & ~_VOWELS[small[ie + 2]]]
+    ie_tokens = np.unique(np.searchsorted(token_starts, ie, side='right') - 1)
+    ie_tokens = ie_tokens[long_tokens[ie_tokens]]
+    garbled_words += np.bincount(token_docs[ie_tokens], minlength=count)
+
+    # Tokens ending in the last two characters of some substitution word ...
+    candidates = token_lengths >= min(map(len, _TAIL_WORDS))
+    candidates[candidates] = _TAIL_ENDINGS[small[token_ends[candidates] - 1], small[token_ends[candidates] - 2]]
+    candidates = np.flatnonzero(candidates)
+    # ... then, for each distinct sixteen-character ending (zero before the
+    # token starts; non-ASCII as 128), which substitution words it ends with.
+    # The endings are read as two little-endian integers straight from an
+    # (unaligned) view of the bytes, the last character in the top byte.
+    prefixed = np.concatenate((np.zeros(16, dtype=np.uint8), small))
+    octets = np.ndarray((len(prefixed) - 7,), dtype='<u8', buffer=prefixed, strides=(1,))
+    ends, lengths = token_ends[candidates] + 16, token_lengths[candidates]
+    keys = np.stack((octets[ends - 16] & _LOW_BYTES_CLEARED[np.clip(16 - lengths, 0, 8)],
+                     octets[ends - 8] & _LOW_BYTES_CLEARED[np.clip(8 - lengths, 0, 8)]), axis=1)
+    endings, inverse = _distinct_keys(keys)
+    tails = np.zeros((len(endings), len(_TAIL_WORDS)), dtype=bool)
+    for row, ending in enumerate(endings):
+        token = ending.tobytes().lstrip(b'\0').decode('latin-1')
+        for column, tail in enumerate(_TAIL_WORDS):
+            tails[row, column] = token.endswith(tail)
+    found = np.zeros((count, len(_TAIL_WORDS)), dtype=bool)
+    for column in np.flatnonzero(tails.any(axis=0)):
+        found[token_docs[candidates[tails[inverse, column]]], column] = True
+    return found, garbled_words
+
+def garble_scores(texts):
+    """garble_score for every text in a list, computed for the whole batch at once.
+
+    The texts are joined with NUL separators into one NumPy array of
+    character codes: a texts x characters histogram matrix gives the
+    suspicious ratios, token boundaries give the word signals (see
+    _word_signals), and each regex is only run on the texts whose histogram
+    has its rarest required character. Results are identical to
+    garble_score; without NumPy, garble_score is called per text.
+    """
+    if np is None or not texts:
+        return [garble_score(text) for text in texts]
+    texts = [text or '' for text in texts]
+    count = len(texts)
+    small, _, starts, lengths = _joined_codes(texts)
+
+    # Characters per text by code point (everything above ASCII in one bucket)
+    histogram = np.array([np.bincount(small[start:start + length], minlength=129)
+                          for start, length in zip(starts, lengths)])
+    suspicious = histogram[:, _SUSPICIOUS_CODES].sum(axis=1)
+
+    pattern_hits = np.zeros(count, dtype=np.int64)
+    for regex in _PATTERN_RES:
+        pattern_hits[_matching_docs(regex, texts, histogram)] += 1
+    found, garbled_words = _word_signals(texts)
+    substitution_hits = found.astype(np.int64) @ _TAIL_WEIGHTS
+    for word, regex in _SUBSTITUTION_RES.items():
+        substitution_hits[_matching_docs(regex, texts, histogram)] += _SUBSTITUTION_WEIGHTS[word]
+
+    signals = {
+        'suspicious_ratio': suspicious / np.maximum(lengths, 1),
+        'pattern_hits': pattern_hits,
+        'substitution_hits': substitution_hits,
+        'garbled_words': garbled_words,
+    }
+    scale = np.maximum(1.0, lengths / GARBLE_REFERENCE_LENGTH)
+    score = np.max([signals[signal] / (limit * scale if signal in _LENGTH_SCALED else limit)
+                    for signal, limit in GARBLE_THRESHOLDS.items()], axis=0)
+
+    breakdowns = []
+    for i, length in enumerate(lengths):
+        if length < 100:
+            breakdowns.append(garble_score(texts[i]))  # too short to judge
+            continue
+        breakdown = {signal: values[i].item() for signal, values in signals.items()}
+        breakdown.update(score=score[i].item(), scale=scale[i].item())
+        breakdowns.append(breakdown)
+    return breakdowns
+
+def read_reviews(reviews, stems, max_chars=None, workers=READ_WORKERS):
+    """Yield (stem, text or None) for stems from a ReviewFiles or ReviewStore, in order.
+
+    A pool of threads reads BATCH_DOCS texts at a time (READ_CHUNK per task),
+    the next batch while the caller works through the current one.
+    """
+    def read(chunk):
+        return [reviews.get(stem, max_chars) for stem in chunk]
+
+    def submit(batch):
+        return pool.map(read, [batch[i:i + READ_CHUNK] for i in range(0, len(batch), READ_CHUNK)])
+
+    stems = list(stems)
+    batches = [stems[i:i + BATCH_DOCS] for i in range(0, len(stems), BATCH_DOCS)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = submit(batches[0]) if batches else None
+        for i, batch in enumerate(batches):
+            current = chunks
+            if i + 1 < len(batches):
+                chunks = submit(batches[i + 1])
+            yield from zip(batch, (text for chunk in current for text in chunk))
+
+def score_texts(items):
+    """Yield (stem, text, garble_score breakdown) for (stem, text) pairs, BATCH_DOCS scored at once."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, BATCH_DOCS))
+        if not batch:
+            return
+        for (stem, text), breakdown in zip(batch, garble_scores([text for _, text in batch])):
+            yield stem, text, breakdown
+
+def is_garbled_text(text, threshold=1.0):
+    """Check if text appears garbled based on suspicious character frequency and patterns.
+
+    threshold is compared with garble_score()'s score; raise it to classify
+    fewer papers as garbled.
+    """
+    return garble_score(text)['score'] > threshold
+
+def analyze_reviews(reviews_dir, threshold=1.0, max_chars=5000, scores=None, store=None, review_store=None,
+                    batch=False):
+    """Analyze all review files and classify them.
+
+    Each file's first max_chars characters (all of it if max_chars is None)
+    are scored with garble_score and compared with threshold. If scores is a
+    dict, it receives each stem's score breakdown.
+
+    With a paper_store PaperStore, the review texts are read from the store
+    instead of reviews_dir, and each classification is written back to it.
+    With a review_store ReviewStore, only the first max_chars characters of
+    each text are decompressed from it.
+
+    With batch, texts are read by a thread pool (read_reviews; the paper
+    store streams them in one query) and scored BATCH_DOCS at a time with
+    garble_scores. The classification and scores are the same.
+    """
     import glob
 
     clean_papers = []
     garbled_papers = []
     total_papers = 0
 
+    if batch:
+        if store is not None:
+            items = store.review_texts(max_chars)
+        else:
+            reviews = review_store if review_store is not None else ReviewFiles(reviews_dir)
+            items = read_reviews(reviews, sorted(reviews.stems()), max_chars)
+        for stem, text, breakdown in score_texts(items):
+            total_papers += 1
+            if text is None and store is None:
+                print(f"Error reading review for {stem}: no review text")
+                garbled_papers.append(stem)
+                continue
+            if scores is not None:
+                scores[stem] = breakdown
+            garbled = breakdown['score'] > threshold
+            if store is not None:
+                store.set_classification(stem, garbled, breakdown)
+            (garbled_papers if garbled else clean_papers).append(stem)
+        clean_papers.sort()
+        garbled_papers.sort()
+        return clean_papers, garbled_papers, total_papers
+
+    if store is not None:
+        for stem in sorted(store.review_stems()):
+            total_papers += 1
+            breakdown = garble_score(store.review_text(stem, max_chars))
+            if scores is not None:
+                scores[stem] = breakdown
+            garbled = breakdown['score'] > threshold
+            store.set_classification(stem, garbled, breakdown)
+            (garbled_papers if garbled else clean_papers).append(stem)
+        return clean_papers, garbled_papers, total_papers
+
+    if review_store is not None:
+        for stem, text in review_store.items(max_chars):
+            total_papers += 1
+            breakdown = garble_score(text)
+            if scores is not None:
+                scores[stem] = breakdown
+            (garbled_papers if breakdown['score'] > threshold else clean_papers).append(stem)
+        clean_papers.sort()
+        garbled_papers.sort()
+        return clean_papers, garbled_papers, total_papers
+
     for review_path in glob.glob(os.path.join(reviews_dir, '*_review.txt')):
         total_papers += 1
         try:
             with open(review_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read(5000)  # Read first 5000 chars for analysis
+                text = f.read(max_chars) if max_chars else f.read()
 
             filename = os.path.basename(review_path)
             stem = filename.replace('_review.txt', '')
 
-            if is_garbled_text(text):
+            breakdown = garble_score(text)
+            if scores is not None:
+                scores[stem] = breakdown
+            if breakdown['score'] > threshold:
                 garbled_papers.append(stem)
             else:
                 clean_papers.append(stem)
@@ -106,9 +439,46 @@ def analyze_reviews(reviews_dir):
 
     return clean_papers, garbled_papers, total_papers
 
+def write_scores(scores, output_path):
+    """Write per-paper garble scores and their signal breakdown as CSV."""
+    fieldnames = ['stem', 'score', *GARBLE_THRESHOLDS, 'scale']
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for stem in sorted(scores):
+            writer.writerow({'stem': stem, **scores[stem]})
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--threshold', type=float, default=1.0,
+                        help='garble score above which a paper is garbled (default 1.0)')
+    parser.add_argument('--max-chars', type=int, default=5000,
+                        help='characters of each review to score; 0 scores the whole text (default 5000)')
+    parser.add_argument('--scores', metavar='CSV',
+                        help='also write each paper\'s score breakdown to this CSV file')
+    parser.add_argument('--batch', action='store_true',
+                        help=f'read reviews with {READ_WORKERS} threads and score {BATCH_DOCS} at a time with NumPy')
+    add_store_argument(parser)
+    add_review_store_argument(parser)
+    args = parser.parse_args()
+
     reviews_dir = 'paper_reviews'
-    clean, garbled, total = analyze_reviews(reviews_dir)
+    scores = {} if args.scores else None
+    if args.store:
+        with PaperStore(args.store) as store:
+            clean, garbled, total = analyze_reviews(reviews_dir, threshold=args.threshold,
+                                                    max_chars=args.max_chars or None, scores=scores,
+                                                    store=store, batch=args.batch)
+        print(f"Classification saved to {args.store}")
+    elif args.review_store:
+        with ReviewStore(args.review_store) as review_store:
+            clean, garbled, total = analyze_reviews(reviews_dir, threshold=args.threshold,
+                                                    max_chars=args.max_chars or None, scores=scores,
+                                                    review_store=review_store, batch=args.batch)
+    else:
+        clean, garbled, total = analyze_reviews(reviews_dir, threshold=args.threshold,
+                                                max_chars=args.max_chars or None, scores=scores,
+                                                batch=args.batch)
 
     print(f"Total papers analyzed: {total}")
     print(f"Clean papers: {len(clean)} ({len(clean)/total*100:.1f}%)")
@@ -129,6 +499,9 @@ def main():
 
     print(f"\nClean papers list saved to clean_papers.txt")
     print(f"Garbled papers list saved to garbled_papers.txt")
+    if scores is not None:
+        write_scores(scores, args.scores)
+        print(f"Garble scores saved to {args.scores}")
 
     # Show some examples
     print(f"\nFirst 10 clean papers:")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Resolve where the thesis refers to each paper, for the bibliography's
+Cross-references field.
+
+Every paper contributes match keys: its title, its authors' surnames and
+its PDF filename stem. All keys go into one multi_pattern.LiteralMatcher
+(case-insensitive, whole words), so each thesis .md/.txt file in the 01-09
+directories is scanned once, however many papers there are.
+
+Per-file matches are cached in cross_references.json with the file's size
+and mtime and the key set they were found with. A later run rescans a
+file only if it changed; unchanged files are scanned just for keys added
+since (new papers), and matches for keys that disappeared are dropped.
+
+    python cross_references.py [--inventory paper_inventory.csv] [--store [PATH]]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from multi_pattern import LiteralMatcher
+from paper_store import PaperStore, add_store_argument
+
+CACHE_FILE = 'cross_references.json'
+CACHE_VERSION = 1
+THESIS_DIR_RE = re.compile(r'^0[1-9]-')
+THESIS_SUFFIXES = ('.md', '.txt')
+
+# Keys shorter than these match too much unrelated text
+MIN_TITLE_CHARS = 15
+MIN_TITLE_WORDS = 3
+MIN_SURNAME_CHARS = 4
+MIN_STEM_CHARS = 8
+MAX_LISTED_FILES = 8
+
+KIND_ORDER = ('title', 'stem', 'surname')
+_NAME_SPLIT_RE = re.compile(r'[;,&]|\band\b', re.IGNORECASE)
+_NAME_WORD_RE = re.compile(r"^[A-Z][A-Za-z'\-]+$")
+_NUMBERED_STEM_RE = re.compile(r'^[a-z]?\d+$', re.IGNORECASE)
+_NOT_SURNAMES = {'unknown', 'authors', 'university', 'institute', 'department', 'school',
+                 'college', 'laboratory', 'research', 'centre', 'center', 'abstract'}
+
+def paper_keys(row):
+    """[(key, kind)] for an inventory row; keys are lower-cased."""
+    keys = []
+    title = re.sub(r'\s+', ' ', row.get('title') or '').strip().rstrip('.:;,')
+    if len(title) >= MIN_TITLE_CHARS and len(title.split()) >= MIN_TITLE_WORDS:
+        keys.append((title.lower(), 'title'))
+
+    for name in _NAME_SPLIT_RE.split(row.get('authors') or ''):
+        words = name.split()
+        # A personal name is two to four capitalised words; the last is the surname
+        if not 2 <= len(words) <= 4:
+            continue
+        surname = words[-1].strip('.')
+        if (len(surname) >= MIN_SURNAME_CHARS and _NAME_WORD_RE.match(surname)
+                and surname.lower() not in _NOT_SURNAMES):
+            keys.append((surname.lower(), 'surname'))
+
+    stem = Path(row['filename']).stem.strip()
+    if len(stem) >= MIN_STEM_CHARS and not _NUMBERED_STEM_RE.match(stem):
+        keys.append((stem.lower(), 'stem'))
+    return list(dict.fromkeys(keys))
+
+def thesis_files(root='.'):
+    """Relative paths of the thesis .md/.txt files in the 01-09 directories, sorted."""
+    paths = []
+    for name in sorted(os.listdir(root)):
+        top = os.path.join(root, name)
+        if not (THESIS_DIR_RE.match(name) and os.path.isdir(top)):
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            paths.extend(os.path.relpath(os.path.join(dirpath, filename), root)
+                         for filename in sorted(filenames) if filename.endswith(THESIS_SUFFIXES))
+    return paths
+
+def _count_matches(matcher, text):
+    return Counter(key for _, _, key in matcher.matches(text))
+
+def scan_thesis(keys, cache_path=CACHE_FILE, root='.'):
+    """{thesis path: {key: occurrences}} for the given lower-case keys.
+
+    Uses and updates the cache at cache_path (None disables it). Returns
+    (matches, stats) where stats counts 'scanned', 'delta' (scanned for new
+    keys only) and 'reused' files.
+    """
+    keys = set(keys)
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if cache.get('version') != CACHE_VERSION:
+            cache = {}
+    cached_files = cache.get('files', {})
+    new_keys = keys - set(cache.get('keys', []))
+    matchers = {}
+
+    def matcher(name):
+        if name not in matchers:
+            chosen = keys if name == 'full' else new_keys
+            matchers[name] = LiteralMatcher(chosen, ignore_case=True, whole_words=True)
+        return matchers[name]
+
+    matches = {}
+    files = {}
+    stats = Counter()
+    for path in thesis_files(root):
+        stat = os.stat(os.path.join(root, path))
+        entry = cached_files.get(path)
+        fresh = entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+        if fresh and not new_keys:
+            found = {key: count for key, count in entry['matches'].items() if key in keys}
+            stats['reused'] += 1
+        else:
+            with open(os.path.join(root, path), 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+            if fresh:
+                found = {key: count for key, count in entry['matches'].items() if key in keys}
+                found.update(_count_matches(matcher('delta'), text))
+                stats['delta'] += 1
+            else:
+                found = dict(_count_matches(matcher('full'), text))
+                stats['scanned'] += 1
+        matches[path] = found
+        files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'matches': found}
+
+    if cache_path:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'keys': sorted(keys), 'files': files}, f)
+        os.replace(tmp_path, cache_path)
+    return matches, stats
+
+def resolve(rows, cache_path=CACHE_FILE, root='.'):
+    """{filename: [(thesis path, [kinds])]} for inventory rows, best matches first.
+
+    Returns (references, stats); see scan_thesis for stats.
+    """
+    owners = defaultdict(list)  # key -> [(filename, kind)]
+    for row in rows:
+        for key, kind in paper_keys(row):
+            owners[key].append((row['filename'], kind))
+    matches, stats = scan_thesis(owners, cache_path, root)
+
+    found = defaultdict(lambda: defaultdict(set))  # filename -> path -> kinds
+    for path, counts in matches.items():
+        for key in counts:
+            for filename, kind in owners.get(key, ()):
+                found[filename][path].add(kind)
+
+    references = {}
+    for filename, paths in found.items():
+        ranked = sorted(paths.items(),
+                        key=lambda item: (min(KIND_ORDER.index(kind) for kind in item[1]), item[0]))
+        references[filename] = [(path, sorted(kinds, key=KIND_ORDER.index)) for path, kinds in ranked]
+    return references, stats
+
+def format_references(references):
+    """Markdown for the Cross-references field, or '' when there are none."""
+    if not references:
+        return ''
+    listed = [f"`{path}` ({', '.join(kinds)})" for path, kinds in references[:MAX_LISTED_FILES]]
+    if len(references) > MAX_LISTED_FILES:
+        listed.append(f"and {len(references) - MAX_LISTED_FILES} more")
+    return '; '.join(listed)
+
+def read_rows(inventory_csv, store_path=None):
+    """Inventory rows from the paper store or the inventory CSV."""
+    if store_path:
+        with PaperStore(store_path) as store:
+            return store.papers()
+    with open(inventory_csv, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def main():
+    parser = argparse.ArgumentParser(description='Find where the thesis refers to each paper.')
+    parser.add_argument('--inventory', default='paper_inventory.csv')
+    parser.add_argument('--cache', default=CACHE_FILE, help=f'per-file match cache (default: {CACHE_FILE})')
+    add_store_argument(parser)
+    args = parser.parse_args()
+
+    rows = read_rows(args.inventory, args.store)
+    references, stats = resolve(rows, args.cache)
+    print(f"Thesis files: {stats['scanned']} scanned, {stats['delta']} scanned for new keys, "
+          f"{stats['reused']} reused")
+    print(f"Papers referenced: {len(references)} of {len(rows)}")
+    for row in rows:
+        if row['filename'] in references:
+            print(f"\n{row['filename']}")
+            print(f"  {format_references(references[row['filename']])}")
+
+if __name__ == '__main__':
+    main()
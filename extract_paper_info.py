@@ -4,13 +4,34 @@ Extract information from referenced papers for bibliography creation.
 Processes PDF files and extracts title, authors, abstract, and first page content.
 """
 
+import argparse
 import os
-import subprocess
 import re
 import csv
-from collections import Counter
+import hashlib
+import json
+import subprocess
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
 
+from cipher_decoder import decode_text, looks_garbled
+from front_matter import parse_front_matter
+from multi_pattern import load_replacement_table
+from near_duplicates import find_clusters, minhash
+from paper_store import PaperStore, add_store_argument, paper_stem, row_stem
+from pdf_backends import BACKENDS, PDFTOTEXT_STRATEGIES, PDFOpenError, open_document
+from pipeline_metrics import METRICS_FILE, MetricsLog
+from review_store import REVIEW_SUFFIX, add_review_store_argument, open_reviews, review_stem
+from timeout_scheduler import (DEFAULT_INFO_TIMEOUT, DEFAULT_TIMEOUT, TIMEOUT_STATS_FILE, info_timeout,
+                               is_quarantined, load_timeout_stats, quarantine, record_timings, release,
+                               save_timeout_stats, strategy_timeouts, timed_out)
+
+GARBLED_FIXES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'garbled_fixes.csv')
+
 def clean_text(text, max_length=None):
     """Clean text for CSV: remove newlines, extra spaces, limit length."""
     if not text:
@@ -22,150 +43,317 @@ def clean_text(text, max_length=None):
         text = text[:max_length] + '...'
     return text
 
-def extract_pdf_metadata(pdf_path):
-    """Extract title and author from PDF metadata using pdfinfo."""
+def extract_pdf_info(pdf_path, document=None, report=None, timeout=DEFAULT_INFO_TIMEOUT):
+    """Return every field pdfinfo reports (Title, Author, Producer, Pages, ...) as a dict.
+
+    document is an open pdf_backends document; by default the subprocess
+    backend reads the metadata in-process, running pdfinfo only for PDFs it
+    cannot parse. If report is a dict it receives 'info_seconds', the
+    'info_source' ('native' or 'pdfinfo') where the backend has a choice,
+    and on failure 'info_error'.
+    """
+    start = time.perf_counter()
+    info = {}
     try:
-        result = subprocess.run(
-            ['pdfinfo', '-raw', pdf_path],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        if result.returncode == 0:
-            metadata = result.stdout
-            title = ''
-            author = ''
-            for line in metadata.split('\n'):
-                if line.startswith('Title:'):
-                    title = line[6:].strip()
-                elif line.startswith('Author:'):
-                    author = line[7:].strip()
-            return title, author
+        if document is None:
+            document = open_document(pdf_path)
+        info = document.info(timeout=timeout)
+        if report is not None and document.info_source:
+            report['info_source'] = document.info_source
     except Exception as e:
-        pass  # pdfinfo not available or failed
-    return '', ''
+        # pdfinfo not available or failed
+        if report is not None:
+            report['info_error'] = _error_name(e)
+    if report is not None:
+        report['info_seconds'] = time.perf_counter() - start
+    return info
 
-def fix_garbled_text(text):
-    """Attempt to fix garbled character substitutions using known pattern fixes."""
+def extract_pdf_metadata(pdf_path, info=None):
+    """Extract title and author from PDF metadata (see extract_pdf_info).
+
+    Pass an info dict from extract_pdf_info to avoid reading the metadata again.
+    """
+    if info is None:
+        info = extract_pdf_info(pdf_path)
+    return info.get('Title', ''), info.get('Author', '')
+
+def pdf_producer(info):
+    """Normalised Producer/Creator of a PDF, with version numbers dropped."""
+    producer = info.get('Producer') or info.get('Creator') or ''
+    producer = re.sub(r'[\d._-]+', ' ', producer.lower())
+    return re.sub(r'\s+', ' ', producer).strip() or 'unknown'
+
+def fix_garbled_text(text, report=None):
+    """Attempt to fix garbled character substitutions.
+
+    Known word fixes from garbled_fixes.csv (earlier rows take precedence)
+    are applied in a single pass (see multi_pattern.ReplacementTable). If
+    the text then still looks garbled, the document's own character mapping
+    is inferred and undone (see cipher_decoder); clean text is never
+    decoded. If report is a dict it receives the inferred 'cipher' mapping
+    and confidence, when there is one.
+    """
     if not text:
         return text
 
     # Count suspicious characters
-    suspicious = set('#%+3615?m248@>;=')
+    suspicious = '#%+3615?m248@>;='
     total_chars = len(text)
     if total_chars == 0:
         return text
-    suspicious_count = sum(1 for c in text if c in suspicious)
-    # If less than 2% suspicious, likely not garbled
-    if suspicious_count / total_chars < 0.02:
+    suspicious_count = sum(text.count(c) for c in suspicious)
+    # If less than 2% suspicious, likely no known garbled words
+    if suspicious_count / total_chars >= 0.02:
+        text = garbled_fixes().apply(text)
+
+    if not looks_garbled(text):
         return text
+    return decode_text(text, report)
 
-    # Known pattern fixes derived from observed patterns in garbled PDFs
-    pattern_fixes = [
-        ('#e', 'The'),   # "#e" -> "The" (common at start of sentences)
-        ('t#e', 'the'),  # "t#e" -> "the"
-        ('%o', 'wo'),    # "%o" -> "wo"
-        ('%orld', 'world'),
-        ('pop+lation', 'population'),
-        ('a1in1', 'aging'),
-        ('n+m3er', 'number'),
-        ('%#o', 'who'),
-        ('e5perien6in1', 'experiencing'),
-        ('f+n6tional', 'functional'),
-        ('6apa3ility', 'capability'),
-        ('in6rease8', 'increase.'),
-        ('desi1n', 'design'),
-        ('9in6l+sive', 'inclusive'),
-        ('prod+6ts', 'products'),
-        ('a66ommodate', 'accommodate'),
-        ('%ider', 'wider'),
-        ('metri6s', 'metrics'),
-        ('s+66ess', 'success'),
-        ('s+6#', 'such'),
-        ('S+66essf+l', 'Successful'),
-        ('in6l+sive', 'inclusive'),
-        ('re=+ires', 'requires'),
-        ('3alan6e', 'balance'),
-        ('3et%een', 'between'),
-        ('+sers', 'users'),
-        ('alon1', 'along'),
-        ('%it#', 'with'),
-        ('eval+ation8', 'evaluation.'),
-        ('@f', 'If'),
-        ('6orre6t', 'correct'),
-        ('e56l+sion8', 'exclusion.'),
-        ('lsk12Jeng.cam.ac.uk', 'lsk12@eng.cam.ac.uk'),
-        ('pjc10Jeng.cam.ac.uk', 'pjc10@eng.cam.ac.uk'),
-        ('ma>es', 'makes'),
-        ('Honse=+ently', 'Consequently'),
-    ]
+@lru_cache(maxsize=None)
+def garbled_fixes():
+    """Known pattern fixes derived from observed patterns in garbled PDFs."""
+    return load_replacement_table(GARBLED_FIXES_CSV)
 
-    # Apply pattern fixes (case-sensitive)
-    result = text
-    for old, new in pattern_fixes:
-        if old in result:
-            result = result.replace(old, new)
-
-    # Fix common spacing issues
-    spacing_fixes = [
-        ('t he ', 'the '),
-        ('T he ', 'The '),
-        ('w orld', 'world'),
-        ('p opulation', 'population'),
-    ]
-    for old, new in spacing_fixes:
-        result = result.replace(old, new)
-
-    return result
-
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using pdftotext with multiple strategies."""
-    strategies = [
-        ['pdftotext', '-layout', '-enc', 'UTF-8', pdf_path, '-'],
-        ['pdftotext', '-raw', '-enc', 'UTF-8', pdf_path, '-'],
-        ['pdftotext', '-layout', pdf_path, '-'],  # original default
-        ['pdftotext', '-raw', pdf_path, '-'],
-        ['pdftotext', '-table', '-enc', 'UTF-8', pdf_path, '-'],
-        ['pdftotext', '-layout', '-eol', 'unix', '-enc', 'Latin1', pdf_path, '-'],
-    ]
+
+# Streaming mode gives up on a strategy whose first UNREADABLE_SAMPLE_CHARS
+# characters score below UNREADABLE_SCORE
+UNREADABLE_SAMPLE_CHARS = 20000
+UNREADABLE_SCORE = 0.3
+
+def readable_count(text):
+    """Number of alphabetic, whitespace and common punctuation characters in text."""
+    return sum(1 for c in text if c.isalpha() or c.isspace() or c in '.,;:!?\'"()-')
+
+def _error_name(error):
+    if isinstance(error, subprocess.TimeoutExpired):
+        return 'timeout'
+    return f"{type(error).__name__}: {error}"[:200]
+
+def _attempt(strategy, start, chars=0, score=None, error=None, **extra):
+    """Metrics for one strategy attempt that began at perf_counter() time start."""
+    return {'strategy': strategy, 'seconds': time.perf_counter() - start, 'chars': chars,
+            'score': score, 'error': _error_name(error) if error else None, **extra}
+
+def extract_text_from_pdf(pdf_path, strategy_order=None, report=None, first_page=None, last_page=None,
+                          document=None, timeouts=None):
+    """Extract text from PDF using pdftotext with multiple strategies.
+
+    strategy_order lists the strategy names to try (default: every entry of
+    PDFTOTEXT_STRATEGIES, in order). If report is a dict it receives the name
+    of the winning 'strategy', its readability 'score', the number of
+    pdftotext 'launches' (0 for in-process backends), the per-strategy
+    'attempts' (see _attempt) and
+    any inferred 'cipher' (see fix_garbled_text).
+    first_page/last_page limit conversion to a page range (1-based, inclusive).
+    document is an open pdf_backends document; by default pdftotext is run.
+    timeouts maps strategy names to their timeout (see timeout_scheduler);
+    with it, no further strategies are tried after the first timeout.
+    """
+    if strategy_order is None:
+        strategy_order = [name for name, _ in PDFTOTEXT_STRATEGIES]
+    if document is None:
+        document = open_document(pdf_path)
 
     best_text = ""
     best_score = -1
+    best_strategy = None
+    launches = 0
+    attempts = []
 
-    for cmd in strategies:
+    for name in strategy_order:
+        start = time.perf_counter()
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            if result.returncode == 0 and result.stdout:
-                text = result.stdout
-                # Score text by readability: ratio of alphabetic + space + punctuation
-                total_chars = len(text)
-                if total_chars == 0:
-                    continue
-                readable_chars = sum(1 for c in text if c.isalpha() or c.isspace() or c in '.,;:!?\'"()-')
-                score = readable_chars / total_chars
-                # Prefer longer text
-                if score > 0.7 and len(text) > 1000:
-                    # High quality text
-                    best_text = text
-                    best_score = score
-                    break
-                elif score > best_score:
-                    best_text = text
-                    best_score = score
+            if document.spawns_processes:
+                launches += 1
+            text = document.text(name, first_page=first_page, last_page=last_page,
+                                 timeout=timeouts[name] if timeouts else DEFAULT_TIMEOUT)
         except Exception as e:
+            attempts.append(_attempt(name, start, error=e))
+            if timeouts and isinstance(e, subprocess.TimeoutExpired):
+                break  # a pathological file; the retry queue gets it
             continue  # Try next strategy
+        if not text:
+            attempts.append(_attempt(name, start))
+            continue
+        # Score text by readability: ratio of alphabetic + space + punctuation
+        total_chars = len(text)
+        readable_chars = readable_count(text)
+        score = readable_chars / total_chars
+        attempts.append(_attempt(name, start, total_chars, score))
+        # Prefer longer text
+        if score > 0.7 and len(text) > 1000:
+            # High quality text
+            best_text = text
+            best_score = score
+            best_strategy = name
+            break
+        elif score > best_score:
+            best_text = text
+            best_score = score
+            best_strategy = name
+
+    if report is not None:
+        report['strategy'] = best_strategy
+        report['score'] = best_score if best_strategy else None
+        report['launches'] = launches
+        report['attempts'] = attempts
 
     # If we have text, try to fix garbled characters
     if best_text:
-        best_text = fix_garbled_text(best_text)
+        best_text = fix_garbled_text(best_text, report)
 
     return best_text
 
+def extract_text_streaming(pdf_path, output_path, strategy_order=None, report=None, document=None,
+                           max_chars=200000, timeouts=None):
+    """Stream pdftotext output straight into output_path, stopping early when possible.
+
+    Works like extract_text_from_pdf, but reads each strategy's output in
+    chunks, writing it to disk and scoring readability as it arrives. A
+    strategy is stopped once max_chars characters have been read (all the
+    review file keeps) or once its first UNREADABLE_SAMPLE_CHARS characters
+    score below UNREADABLE_SCORE, so at most two max_chars texts are ever
+    held in memory, however large the PDF. Scores are therefore those of the
+    kept prefix, and garble fixes are applied to that prefix only. timeouts
+    works as for extract_text_from_pdf.
+
+    Returns the text written to output_path, or '' (and no file) if none.
+    """
+    if strategy_order is None:
+        strategy_order = [name for name, _ in PDFTOTEXT_STRATEGIES]
+    if document is None:
+        document = open_document(pdf_path)
+    part_path = output_path + '.part'
+    best_path = output_path + '.best'
+
+    best_text = ""
+    best_score = -1
+    best_strategy = None
+    launches = 0
+    attempts = []
+
+    for name in strategy_order:
+        chunks = []
+        length = 0
+        readable = 0
+        stopped = None
+        start = time.perf_counter()
+        try:
+            if document.spawns_processes:
+                launches += 1
+            with open(part_path, 'w', encoding='utf-8') as out:
+                stream = document.stream(name, timeout=timeouts[name] if timeouts else DEFAULT_TIMEOUT)
+                try:
+                    for chunk in stream:
+                        chunk = chunk[:max_chars - length]
+                        out.write(chunk)
+                        chunks.append(chunk)
+                        length += len(chunk)
+                        readable += readable_count(chunk)
+                        if length >= max_chars:
+                            stopped = 'max_chars'
+                            break  # enough text for the review file
+                        if length >= UNREADABLE_SAMPLE_CHARS and readable / length < UNREADABLE_SCORE:
+                            stopped = 'unreadable'
+                            break  # clearly unreadable, no point converting the rest
+                finally:
+                    stream.close()  # stops pdftotext if we broke out early
+        except Exception as e:
+            attempts.append(_attempt(name, start, length, readable / length if length else None, e,
+                                     stopped=stopped))
+            if timeouts and isinstance(e, subprocess.TimeoutExpired):
+                break  # a pathological file; the retry queue gets it
+            continue  # Try next strategy
+        if length == 0:
+            attempts.append(_attempt(name, start, stopped=stopped))
+            continue
+        score = readable / length
+        attempts.append(_attempt(name, start, length, score, stopped=stopped))
+        if score > best_score or (score > 0.7 and length > 1000):
+            best_text = ''.join(chunks)
+            best_score = score
+            best_strategy = name
+            os.replace(part_path, best_path)
+        if score > 0.7 and length > 1000:
+            break  # High quality text
+
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    if report is not None:
+        report['strategy'] = best_strategy
+        report['score'] = best_score if best_strategy else None
+        report['launches'] = launches
+        report['attempts'] = attempts
+    if not best_text:
+        return best_text
+
+    # If we have text, try to fix garbled characters
+    fixed_text = fix_garbled_text(best_text, report)
+    if fixed_text == best_text:
+        os.replace(best_path, output_path)
+    else:
+        fixed_text = fixed_text[:max_chars]
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(fixed_text)
+        os.remove(best_path)
+    return fixed_text
+
+def load_strategy_stats(stats_path):
+    """Load per-producer strategy win counts, or empty stats if absent."""
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'producers': {}, 'files': 0, 'launches': 0}
+
+def save_strategy_stats(stats_path, stats):
+    """Atomically write strategy statistics."""
+    tmp_path = stats_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, stats_path)
+
+def order_strategies(stats, producer):
+    """Strategy names to try for a PDF from producer, best historical winner first.
+
+    Every strategy stays in the order: those that never won for the producer
+    come last, so they still run when the winners give no text or garbled
+    text. Unknown producers get the default order.
+    """
+    default = [name for name, _ in PDFTOTEXT_STRATEGIES]
+    history = stats['producers'].get(producer)
+    if not history:
+        return default
+    wins = history['wins']
+    return sorted(default, key=lambda name: -wins.get(name, 0))  # stable: ties keep default order
+
+def record_strategy_result(stats, producer, strategy, launches, adaptive):
+    """Record which strategy won for a PDF and how many launches it took.
+
+    Files tried in the default order give each producer a baseline launch
+    count; for adaptively ordered files the difference from that baseline is
+    returned as the estimated number of launches saved. launches is None for
+    in-process backends, which count towards the wins only.
+    """
+    history = stats['producers'].setdefault(producer, {'files': 0, 'wins': {}})
+    history['files'] += 1
+    if strategy:
+        history['wins'][strategy] = history['wins'].get(strategy, 0) + 1
+    stats['files'] += 1
+    if launches is None:
+        return 0.0
+    stats['launches'] += launches
+
+    saved = 0.0
+    if not adaptive:
+        history['baseline_files'] = history.get('baseline_files', 0) + 1
+        history['baseline_launches'] = history.get('baseline_launches', 0) + launches
+    elif history.get('baseline_files'):
+        saved = history['baseline_launches'] / history['baseline_files'] - launches
+    stats['launches_saved'] = stats.get('launches_saved', 0.0) + saved
+    return saved
+
 def extract_potential_title(text, max_lines=20):
     """Extract potential title from first few lines."""
     lines = text.split('\n')[:max_lines]
@@ -357,80 +545,857 @@ def extract_abstract(text):
     abstract_text = re.sub(r'\s+', ' ', abstract_text)
     return abstract_text.strip()
 
-def process_papers(root_dir, output_csv, reviews_dir):
-    """Process all PDFs in root_dir and write to CSV."""
-    Path(reviews_dir).mkdir(exist_ok=True)
+MANIFEST_VERSION = 2
+
+INVENTORY_FIELDS = ['filename', 'category', 'title', 'authors', 'abstract_preview', 'text_file',
+                    'duplicate_group']
+
+def find_pdfs(root_dir):
+    """List PDFs under root_dir as (pdf_path, relative_path, category) in walk order."""
+    pdfs = []
+    for root, dirs, files in os.walk(root_dir):
+        # Skip hidden directories
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+
+        for file in files:
+            if file.lower().endswith('.pdf') and not file.startswith('.'):
+                pdfs.append(_pdf_location(root_dir, os.path.join(root, file)))
+    return pdfs
+
+def _pdf_location(root_dir, pdf_path):
+    """(pdf_path, relative_path, category) for a PDF under root_dir, as find_pdfs lists it."""
+    relative_path = os.path.relpath(pdf_path, root_dir)
+    # Determine category from directory structure
+    category = os.path.dirname(relative_path) or 'root'
+    return pdf_path, relative_path, category
+
+def extract_paper_record(pdf_path, strategy_stats=None, header_pages=None, review_text=True,
+                         backend='subprocess', stream_path=None, timeout_stats=None):
+    """Extract review text, PDF metadata and inventory fields for one PDF.
+
+    Returns a dict with 'text' (empty when nothing could be extracted),
+    'metadata', 'fields', the PDF 'producer', the winning pdftotext
+    'strategy', the number of pdftotext 'launches', the character 'cipher'
+    inferred for garbled text (or None) and 'metrics' (strategy
+    attempts and stage timings, see pipeline_metrics). With strategy_stats,
+    strategies are tried in the order that has worked best for the producer.
+
+    With header_pages, only pages 1..header_pages are converted for field
+    parsing; the full text for the review file is then converted once with
+    the winning strategy, or not at all when review_text is false.
+
+    backend names the pdf_backends implementation that serves text and
+    metadata.
+
+    With stream_path, the review text is streamed into that file (see
+    extract_text_streaming) instead of being returned: 'text_path' is then
+    set and 'text' is empty.
+
+    With timeout_stats (see timeout_scheduler), pdfinfo and every strategy get
+    a timeout predicted from the PDF's size and page count, and strategies
+    stop at the first timeout. Safe to run in a worker process.
+
+    A PDF the backend cannot open gives the empty record, with the reason
+    in metrics['open_error'].
+    """
+    started = time.perf_counter()
+    try:
+        document = open_document(pdf_path, backend)
+    except PDFOpenError as e:
+        return _empty_record('unknown', {'open_error': _error_name(e), 'attempts': [],
+                                         'total_seconds': time.perf_counter() - started})
+    with document:
+        return _extract_paper_record(pdf_path, document, strategy_stats, header_pages, review_text,
+                                     stream_path, timeout_stats)
+
+def _empty_record(producer, metrics, adaptive=False, strategy=None, launches=0, **report):
+    """A record with no text or fields (see extract_paper_record)."""
+    return {'text': '', 'text_path': None, 'metadata': None, 'fields': None, 'signature': None,
+            'producer': producer, 'cipher': None, 'adaptive': adaptive, 'strategy': strategy,
+            'launches': launches, 'metrics': metrics, **report}
+
+def _extract_paper_record(pdf_path, document, strategy_stats, header_pages, review_text, stream_path,
+                          timeout_stats=None):
+    started = time.perf_counter()
+    metrics = {'subprocess': document.spawns_processes, 'first_pages': header_pages}
+    size_bytes = os.path.getsize(pdf_path)
+    info = extract_pdf_info(pdf_path, document, report=metrics,
+                            timeout=info_timeout(timeout_stats, size_bytes) if timeout_stats
+                            else DEFAULT_INFO_TIMEOUT)
+    producer = pdf_producer(info)
+    order = order_strategies(strategy_stats, producer) if strategy_stats else None
+    timeouts = None
+    if timeout_stats:
+        timeouts = strategy_timeouts(timeout_stats, order or [name for name, _ in PDFTOTEXT_STRATEGIES],
+                                     _page_count(info), size_bytes)
+        metrics['timeout_limits'] = timeouts
+    report = {}
+    start = time.perf_counter()
+    if stream_path and not header_pages:
+        text = extract_text_streaming(pdf_path, stream_path, strategy_order=order, report=report,
+                                      document=document, timeouts=timeouts)
+    else:
+        text = extract_text_from_pdf(pdf_path, strategy_order=order, report=report,
+                                     first_page=1 if header_pages else None, last_page=header_pages,
+                                     document=document, timeouts=timeouts)
+    metrics.update(extract_seconds=time.perf_counter() - start, pages=_page_count(info),
+                   score=report.pop('score'), attempts=report.pop('attempts'), text_chars=len(text))
+    record = _empty_record(producer, metrics,
+                           adaptive=order is not None and order != [name for name, _ in PDFTOTEXT_STRATEGIES],
+                           **report)
+    if not text:
+        metrics['total_seconds'] = time.perf_counter() - started
+        return record
+
+    # Extract information
+    meta_title, meta_author = extract_pdf_metadata(pdf_path, info)
+    start = time.perf_counter()
+    title, authors, abstract = parse_front_matter(text, meta_title, meta_author)
+    metrics['parse_seconds'] = time.perf_counter() - start
+
+    # Clean fields for CSV
+    fields = {
+        'title': clean_text(title, max_length=300),
+        'authors': clean_text(authors, max_length=300),
+        'abstract_preview': clean_text(abstract, max_length=300)[:200] if abstract else '',
+    }
+
+    # Near-duplicate signature of the text the fields were parsed from
+    start = time.perf_counter()
+    signature = minhash(text[:200000])
+    metrics['signature_seconds'] = time.perf_counter() - start
+
+    if header_pages:
+        if review_text:
+            start = time.perf_counter()
+            full_text = _convert_review_text(pdf_path, document, record['strategy'], stream_path)
+            metrics['review_seconds'] = time.perf_counter() - start
+            if document.spawns_processes:
+                record['launches'] += 1
+            text = full_text or text
+        else:
+            text = ''
+
+    if stream_path and text and os.path.exists(stream_path):
+        record['text_path'] = stream_path
+        text = ''
+    record.update(
+        text=text[:200000],  # First 200k chars (most papers)
+        metadata={'title': meta_title, 'author': meta_author},
+        fields=fields,
+        signature=signature,
+    )
+    metrics['total_seconds'] = time.perf_counter() - started
+    return record
+
+def _page_count(info):
+    pages = str(info.get('Pages', '')).strip()
+    return int(pages) if pages.isdigit() else None
+
+def _convert_review_text(pdf_path, document, strategy, stream_path=None):
+    """Whole-document text for one known-good strategy, streamed to stream_path if given."""
+    if stream_path:
+        return extract_text_streaming(pdf_path, stream_path, strategy_order=[strategy], document=document)
+    return extract_text_from_pdf(pdf_path, strategy_order=[strategy], document=document)[:200000]
+
+def extract_review_text(pdf_path, strategy, backend='subprocess', stream_path=None):
+    """Convert a whole PDF with one known-good strategy, for the review file.
+
+    With stream_path the text is streamed into that file and None is returned.
+    """
+    with open_document(pdf_path, backend) as document:
+        text = _convert_review_text(pdf_path, document, strategy, stream_path)
+    return None if stream_path else text
+
+def _stream_path(reviews_dir, index):
+    """Per-PDF scratch file that a streaming worker writes review text into."""
+    return os.path.join(reviews_dir, f".stream-{index}.txt")
+
+def _extract_records(pdf_paths, jobs, strategy_stats=None, header_pages=None, review_text=True,
+                     backend='subprocess', stream_paths=None, timeout_stats=None):
+    """Yield extract_paper_record results in input order, using jobs worker processes.
+
+    Only a few PDFs per worker are queued ahead, so closing the generator
+    (when the run's time budget is spent) waits for the running ones only.
+    """
+    extract = partial(extract_paper_record, strategy_stats=strategy_stats,
+                      header_pages=header_pages, review_text=review_text, backend=backend,
+                      timeout_stats=timeout_stats)
+    if stream_paths is None:
+        stream_paths = [None] * len(pdf_paths)
+    if jobs <= 1:
+        for pdf_path, stream_path in zip(pdf_paths, stream_paths):
+            yield extract(pdf_path, stream_path=stream_path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Results are yielded in submission order, so output matches the serial run
+        futures = deque()
+        try:
+            for pdf_path, stream_path in zip(pdf_paths, stream_paths):
+                futures.append(executor.submit(_call_with_stream_path, extract, pdf_path, stream_path))
+                if len(futures) > 2 * jobs:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+def _call_with_stream_path(extract, pdf_path, stream_path):
+    return extract(pdf_path, stream_path=stream_path)
 
+def _extract_review_texts(jobs_list, jobs, backend='subprocess', stream_paths=None):
+    """Yield extract_review_text results for (pdf_path, strategy) pairs in order."""
+    if stream_paths is None:
+        stream_paths = [None] * len(jobs_list)
+    args = ([pdf_path for pdf_path, _ in jobs_list], [strategy for _, strategy in jobs_list],
+            [backend] * len(jobs_list), stream_paths)
+    if jobs <= 1:
+        yield from map(extract_review_text, *args)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(extract_review_text, *args)
+
+def review_stems(relative_paths):
+    """{relative path: review stem} for the PDFs of one inventory.
+
+    A review is named after its PDF's file name; PDFs whose file names
+    collide in different directories are told apart by their directories
+    ('mobile/paper1.pdf' -> 'mobile__paper1').
+    """
+    counts = Counter(paper_stem(path) for path in relative_paths)
+    return {path: paper_stem(path) if counts[paper_stem(path)] == 1
+            else '__'.join(Path(os.path.splitext(path)[0]).parts)
+            for path in relative_paths}
+
+def _write_review(reviews, stem, text):
+    """Save extracted text for manual review; return (filename, size in bytes).
+
+    reviews is a review_store ReviewFiles directory or ReviewStore.
+    """
+    return f"{stem}{REVIEW_SUFFIX}", reviews.put(stem, text)
+
+def _move_review(reviews, stem, stream_path):
+    """Move a streamed review file into reviews; return (filename, size in bytes).
+
+    Returns (None, 0) if the stream produced no text.
+    """
+    if not os.path.exists(stream_path):
+        return None, 0
+    return f"{stem}{REVIEW_SUFFIX}", reviews.import_file(stem, stream_path)
+
+def _write_pdf_metrics(metrics, record, pdf_path, relative_path, category, output_bytes, **extra):
+    """Append a record's metrics line, if metrics are being collected."""
+    if metrics:
+        metrics.write('pdf', file=relative_path, category=category, producer=record['producer'],
+                      strategy=record['strategy'], launches=record['launches'], adaptive=record['adaptive'],
+                      pdf_bytes=os.path.getsize(pdf_path), output_bytes=output_bytes,
+                      fields=bool(record['fields']), cipher=record['cipher'], **extra, **record['metrics'])
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    """Load the extraction manifest (relative path -> entry), or {} if absent."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('papers', {})
+
+def save_manifest(manifest_path, papers):
+    """Atomically write the extraction manifest."""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'papers': papers}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def _extraction_options(backend, header_pages, adaptive):
+    """The settings a manifest entry was extracted with; an entry is reused only under the same ones."""
+    return {'backend': backend, 'header_pages': header_pages, 'adaptive': adaptive}
+
+def _reusable(entry, options):
+    """Check that a manifest entry was extracted with options and produced fields.
+
+    Entries without fields (no text could be extracted) are never reused, so
+    such PDFs are tried again, e.g. with another backend.
+    """
+    return bool(entry and entry.get('fields')) and entry.get('options') == options
+
+def _review_intact(entry, reviews):
+    """Check that the review text an entry points to is still stored unchanged."""
+    if not entry.get('text_file'):
+        return True
+    return reviews.size(review_stem(entry['text_file'])) == entry['text_bytes']
+
+def _reuse_entry(entry, stem, reviews):
+    """Adapt a cached entry to a PDF with the same content under review stem stem.
+
+    Returns None when the cached review text is missing and the PDF has to be
+    extracted again.
+    """
+    if not _review_intact(entry, reviews):
+        return None
+    entry = dict(entry)
+    if entry.get('text_file'):
+        review_filename = f"{stem}{REVIEW_SUFFIX}"
+        if review_filename != entry['text_file']:
+            reviews.copy(review_stem(entry['text_file']), stem)
+            entry['text_file'] = review_filename
+    return entry
+
+def _drop_reviews(reviews, previous, manifest):
+    """Delete the review texts that only entries dropped from the manifest pointed to."""
+    kept = {entry['text_file'] for entry in manifest.values() if entry.get('text_file')}
+    for entry in previous.values():
+        if entry.get('text_file') and entry['text_file'] not in kept:
+            reviews.delete(review_stem(entry['text_file']))
+
+def _entry_signature(entry, reviews):
+    """Near-duplicate signature for a cached entry, from its review text."""
+    if not entry.get('text_file'):
+        return None
+    return minhash(reviews.get(review_stem(entry['text_file'])) or '')
+
+class _Extraction:
+    """One extraction run over a list of PDFs (see process_papers).
+
+    plan() picks the manifest entries that can be reused and queues the
+    other PDFs, convert_deferred() writes review text that an earlier run
+    deferred, extract() extracts the queue, and rows() turns the resulting
+    manifest entries into inventory rows. The totals of the run are kept as
+    attributes.
+    """
+
+    def __init__(self, pdfs, reviews, reviews_dir, options, jobs=1, review_text=True, stream=False,
+                 metrics=None, stems=None):
+        self.pdfs = pdfs
+        # Review stem per relative path; pass the whole inventory's when pdfs is part of it
+        self.stems = stems if stems is not None else review_stems([pdf[1] for pdf in pdfs])
+        self.reviews = reviews
+        self.reviews_dir = reviews_dir
+        self.options = options
+        self.jobs = jobs
+        self.review_text = review_text
+        self.stream = stream
+        self.metrics = metrics
+        self.entries = [None] * len(pdfs)
+        self.pending = []  # indices to extract
+        self.copies = {}  # index -> earlier pending index with byte-identical content
+        self.rewritten = set()  # stems whose review file this run writes
+        self.out_of_time = set()
+        self.extracted = 0
+        self.launches = 0
+        self.timeouts = 0
+        self.saved = 0.0
+
+    def plan(self, cached=None):
+        """Reuse the cached manifest entries that still apply; queue every other PDF.
+
+        Without a cached manifest (None) every PDF is extracted.
+        """
+        if cached is None:
+            self.pending = list(range(len(self.pdfs)))
+            return
+        cached = {path: entry for path, entry in cached.items() if _reusable(entry, self.options)}
+        by_hash = {entry['sha256']: entry for entry in cached.values()}
+        pending_by_hash = {}
+        for i, (pdf_path, relative_path, _) in enumerate(self.pdfs):
+            stat = os.stat(pdf_path)
+            entry = cached.get(relative_path)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                self.entries[i] = _reuse_entry(entry, self.stems[relative_path], self.reviews)
+            if self.entries[i] is None:
+                sha = file_sha256(pdf_path)
+                if sha in by_hash:
+                    # Touched, moved or copied: same bytes, so same extraction
+                    self.entries[i] = _reuse_entry(by_hash[sha], self.stems[relative_path], self.reviews)
+                if self.entries[i] is None:
+                    self.entries[i] = {'sha256': sha, 'options': self.options}
+                self.entries[i].update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            if 'fields' not in self.entries[i]:
+                sha = self.entries[i]['sha256']
+                if sha in pending_by_hash:
+                    self.copies[i] = pending_by_hash[sha]
+                else:
+                    pending_by_hash[sha] = i
+                    self.pending.append(i)
+
+    @property
+    def reused(self):
+        return len(self.pdfs) - len(self.pending) - len(self.copies)
+
+    def convert_deferred(self):
+        """Write the full review text that an earlier review_text=False run deferred."""
+        deferred = [i for i, entry in enumerate(self.entries)
+                    if entry and entry.get('review_pending') and 'fields' in entry]
+        if deferred:
+            print(f"Converting deferred review text for {len(deferred)} PDFs")
+        stream_paths = [_stream_path(self.reviews_dir, i) for i in deferred] if self.stream else None
+        texts = _extract_review_texts([(self.pdfs[i][0], self.entries[i]['strategy']) for i in deferred],
+                                      self.jobs, self.options['backend'], stream_paths)
+        for n, (i, text) in enumerate(zip(deferred, texts)):
+            stem = self.stems[self.pdfs[i][1]]
+            entry = self.entries[i]
+            entry['review_pending'] = False
+            self.rewritten.add(stem)
+            if self.stream:
+                review_filename, text_bytes = _move_review(self.reviews, stem, stream_paths[n])
+                if review_filename:
+                    entry.update(text_file=review_filename, text_bytes=text_bytes)
+            elif text:
+                review_filename, text_bytes = _write_review(self.reviews, stem, text)
+                entry.update(text_file=review_filename, text_bytes=text_bytes)
+
+    def _quarantined(self, timeout_stats):
+        """Pending PDFs that keep timing out; they wait for the retry round at the end."""
+        deferred = set()
+        if timeout_stats:
+            for i in self.pending:
+                relative_path = self.pdfs[i][1]
+                if relative_path in timeout_stats['quarantine']:
+                    sha = self.entries[i]['sha256'] if self.entries[i] else file_sha256(self.pdfs[i][0])
+                    if is_quarantined(timeout_stats, relative_path, sha):
+                        deferred.add(i)
+            if deferred:
+                print(f"Deferring {len(deferred)} quarantined PDFs to the end of the run")
+        return deferred
+
+    def extract(self, strategy_stats=None, timeout_stats=None, deadline=None):
+        """Extract the queued PDFs in order, copying byte-identical ones.
+
+        strategy_stats and timeout_stats are updated with this run's results;
+        PDFs that time out under the adaptive limits are retried at the end
+        with the default ones. No extraction starts after deadline (a
+        perf_counter() time); those PDFs are left in out_of_time.
+        """
+        # Read once up front so serial and parallel runs order strategies identically
+        snapshot = json.loads(json.dumps(strategy_stats)) if strategy_stats else None
+        limits = json.loads(json.dumps(timeout_stats)) if timeout_stats else None
+        deferred = self._quarantined(timeout_stats)
+        queue = list(range(len(self.pdfs)))
+        extract = [i for i in self.pending if i not in deferred]
+        while queue:
+            stream_paths = [_stream_path(self.reviews_dir, i) for i in extract] if self.stream else None
+            records = _extract_records([self.pdfs[i][0] for i in extract], self.jobs, snapshot,
+                                       self.options['header_pages'], self.review_text, self.options['backend'],
+                                       stream_paths, limits)
+            retry = []
+            for i in queue:
+                entry = self.entries[i]
+                if i in deferred or self.copies.get(i) in deferred:
+                    retry.append(i)
+                elif i in self.copies:
+                    if self.copies[i] in self.out_of_time:
+                        self.out_of_time.add(i)
+                    else:
+                        self.entries[i] = self._copy(i)
+                elif entry is None or 'fields' not in entry:
+                    if deadline and time.perf_counter() > deadline:
+                        self.out_of_time.add(i)
+                        continue
+                    print(f"Processing: {self.pdfs[i][1]}")
+                    if not self._add_record(i, next(records), strategy_stats, timeout_stats, limits):
+                        deferred.add(i)
+                        retry.append(i)
+                elif 'minhash' not in entry:
+                    entry['minhash'] = _entry_signature(entry, self.reviews)  # manifest from before signatures
+            records.close()  # cancels extractions queued past the time budget
+
+            queue, deferred, limits = retry, set(), None
+            extract = [i for i in retry if i not in self.copies]
+            if extract:
+                print(f"Retrying {len(extract)} PDFs that timed out, with the default timeouts")
+
+    def _copy(self, i):
+        """Entry for a PDF with the same bytes as one extracted earlier in this run."""
+        relative_path = self.pdfs[i][1]
+        source = self.entries[self.copies[i]]
+        print(f"Duplicate: {relative_path} (same content as {self.pdfs[self.copies[i]][1]})")
+        entry = dict(_reuse_entry(source, self.stems[relative_path], self.reviews) or source,
+                     size=self.entries[i]['size'], mtime_ns=self.entries[i]['mtime_ns'])
+        if entry.get('text_file'):
+            self.rewritten.add(self.stems[relative_path])
+        return entry
+
+    def _add_record(self, i, record, strategy_stats, timeout_stats, limits):
+        """Turn an extract_paper_record result into PDF i's entry and review file.
+
+        Returns False, keeping nothing, if the PDF timed out under the adaptive
+        limits and has to be retried.
+        """
+        pdf_path, relative_path, category = self.pdfs[i]
+        entry = self.entries[i]
+        self.launches += record['launches']
+        timeouts = sum(attempt['error'] == 'timeout' for attempt in record['metrics']['attempts'])
+        self.timeouts += timeouts
+        if timeout_stats is not None:
+            record_timings(timeout_stats, record['metrics'], os.path.getsize(pdf_path))
+            if timed_out(record['metrics']):
+                quarantine(timeout_stats, relative_path, entry['sha256'] if entry else file_sha256(pdf_path))
+            else:
+                release(timeout_stats, relative_path)
+        if limits and timed_out(record['metrics']):
+            for path in (record['text_path'], _stream_path(self.reviews_dir, i)):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            _write_pdf_metrics(self.metrics, record, pdf_path, relative_path, category, 0,
+                               timeouts=timeouts, deferred=True)
+            return False
+
+        stem = self.stems[relative_path]
+        self.rewritten.add(stem)
+        if strategy_stats is not None:
+            launches = record['launches'] if record['metrics'].get('subprocess') else None
+            self.saved += record_strategy_result(strategy_stats, record['producer'], record['strategy'],
+                                                 launches, record['adaptive'])
+        entry = dict(entry or {}, options=self.options, metadata=record['metadata'], fields=record['fields'],
+                     producer=record['producer'], strategy=record['strategy'],
+                     cipher=record['cipher'], minhash=record['signature'], text_file=None, text_bytes=0,
+                     review_pending=bool(record['fields']) and not self.review_text)
+        if record['text_path']:
+            review_filename, text_bytes = _move_review(self.reviews, stem, record['text_path'])
+            entry.update(text_file=review_filename, text_bytes=text_bytes)
+        elif record['text']:
+            review_filename, text_bytes = _write_review(self.reviews, stem, record['text'])
+            entry.update(text_file=review_filename, text_bytes=text_bytes)
+        elif self.stream and os.path.exists(_stream_path(self.reviews_dir, i)):
+            os.remove(_stream_path(self.reviews_dir, i))  # text without usable fields
+
+        _write_pdf_metrics(self.metrics, record, pdf_path, relative_path, category, entry['text_bytes'],
+                           timeouts=timeouts, retry=limits is None and timeout_stats is not None)
+        self.entries[i] = entry
+        self.extracted += 1
+        if self.extracted % 10 == 0:
+            print(f"Processed {self.extracted} PDFs...")
+        return True
+
+    def keep_previous(self, previous):
+        """Give the PDFs left over by the time budget their previous manifest entry, if it still applies."""
+        for i in self.out_of_time:
+            entry = previous.get(self.pdfs[i][1])
+            self.entries[i] = entry if _reusable(entry, self.options) else None
+
+    def manifest(self):
+        """{relative path: entry} for the PDFs worth remembering."""
+        return {self.pdfs[i][1]: entry for i, entry in enumerate(self.entries) if _reusable(entry, self.options)}
+
+    def rows(self):
+        """Inventory rows, in input order, for the PDFs with fields."""
+        duplicate_group = _duplicate_groups([(self.pdfs[i][1], entry) for i, entry in enumerate(self.entries)])
+        rows = []
+        for (pdf_path, relative_path, category), entry in zip(self.pdfs, self.entries):
+            if entry and entry['fields']:
+                rows.append(_inventory_row(relative_path, category, entry, duplicate_group))
+        return rows
+
+def _duplicate_groups(entries):
+    """{relative path: first path of its near-duplicate cluster} for (relative path, entry) pairs in order."""
+    clusters = find_clusters({n: entry.get('minhash') for n, (_, entry) in enumerate(entries)
+                              if entry and entry['fields']})
+    if clusters:
+        print(f"Near-duplicate clusters: {len(clusters)} "
+              f"({sum(len(members) for members in clusters)} PDFs)")
+    return {entries[n][0]: entries[members[0]][0] for members in clusters for n in members}
+
+def _inventory_row(relative_path, category, entry, duplicate_group):
+    return {
+        'filename': relative_path,
+        'category': category,
+        **entry['fields'],
+        'text_file': entry['text_file'] or '',
+        'duplicate_group': duplicate_group.get(relative_path, ''),
+    }
+
+def write_inventory(output_csv, rows):
+    """Write inventory rows to the CSV."""
     with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['filename', 'category', 'title', 'authors', 'abstract_preview', 'text_file']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=INVENTORY_FIELDS)
         writer.writeheader()
+        writer.writerows(rows)
 
-        pdf_count = 0
-        for root, dirs, files in os.walk(root_dir):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-
-            for file in files:
-                if file.lower().endswith('.pdf') and not file.startswith('.'):
-                    pdf_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(pdf_path, root_dir)
-
-                    # Determine category from directory structure
-                    category = os.path.relpath(root, root_dir)
-                    if category == '.':
-                        category = 'root'
-
-                    print(f"Processing: {relative_path}")
-
-                    # Extract text
-                    text = extract_text_from_pdf(pdf_path)
-
-                    if text:
-                        # Save extracted text for manual review
-                        review_filename = f"{Path(file).stem}_review.txt"
-                        review_path = os.path.join(reviews_dir, review_filename)
-                        with open(review_path, 'w', encoding='utf-8') as f:
-                            f.write(text[:200000])  # First 200k chars (most papers)
-
-                        # Extract information
-                        meta_title, meta_author = extract_pdf_metadata(pdf_path)
-                        title = meta_title if meta_title else extract_title_from_text(text)
-                        if not title:
-                            title = extract_potential_title(text)
-                        authors = meta_author if meta_author else extract_authors_from_text(text)
-                        if not authors:
-                            authors = extract_potential_authors(text)
-                        abstract = extract_abstract(text)
-
-                        # Clean fields for CSV
-                        title_clean = clean_text(title, max_length=300)
-                        authors_clean = clean_text(authors, max_length=300)
-                        abstract_clean = clean_text(abstract, max_length=300)[:200] if abstract else ''
-
-                        writer.writerow({
-                            'filename': relative_path,
-                            'category': category,
-                            'title': title_clean,
-                            'authors': authors_clean,
-                            'abstract_preview': abstract_clean,
-                            'text_file': review_filename
-                        })
-
-                    pdf_count += 1
-                    if pdf_count % 10 == 0:
-                        print(f"Processed {pdf_count} PDFs...")
-
-        print(f"Total PDFs processed: {pdf_count}")
+def _store_papers(store_path, rows, rewritten, reviews):
+    """Write the inventory, and review texts rewritten this run or new to the store, to a paper_store."""
+    with PaperStore(store_path) as store:
+        store.replace_papers(rows)
+        stems = {row_stem(row) for row in rows if row['text_file']}
+        stems = (stems & rewritten) | (stems - store.review_stems())
+        for stem in stems:
+            text = reviews.get(stem)
+            if text is not None:
+                store.put_review(stem, text)
+
+def _print_totals(run, strategy_stats):
+    print(f"Total PDFs processed: {run.extracted}")
+    if run.options['backend'] != 'subprocess':
+        return  # nothing is launched in-process
+    if run.extracted:
+        print(f"pdftotext launches: {run.launches} ({run.launches / run.extracted:.2f} per PDF)")
+    if strategy_stats is not None:
+        print(f"Launches saved by adaptive strategy order: ~{run.saved:.0f} this run, "
+              f"~{strategy_stats.get('launches_saved', 0.0):.0f} overall")
+
+def process_papers(root_dir, output_csv, reviews_dir, jobs=1, manifest_path=None, rebuild=False,
+                   strategy_stats_path=None, header_pages=None, review_text=True,
+                   backend='subprocess', stream=False, store_path=None, metrics_path=None,
+                   timeout_stats_path=None, time_budget=None, review_store_path=None):
+    """Process all PDFs in root_dir and write to CSV.
+
+    With jobs > 1, extraction and field parsing run in a process pool; rows and
+    review files are still written by this process in walk order.
+
+    With a manifest_path, PDFs whose size and mtime (or, failing that, content
+    hash) match the manifest are not extracted again: their fields and review
+    file are reused, provided they were extracted with the same backend,
+    header_pages and strategy ordering and yielded fields; PDFs without
+    text are left out of the manifest and tried again by the next run. Rows
+    for PDFs that no longer exist are dropped, and so are review texts no
+    manifest entry points to any more. rebuild ignores the existing manifest
+    but still writes a fresh one. Review texts are named by review_stems.
+
+    With a strategy_stats_path, pdftotext strategies are ordered per PDF
+    producer from past wins (see order_strategies). The statistics are read
+    once up front so serial and parallel runs choose identically, and are
+    updated with this run's winners at the end.
+
+    header_pages switches to front-matter mode: fields are parsed from the
+    first header_pages pages and the full text is converted once, with the
+    winning strategy, for the review file. With review_text false that full
+    conversion is deferred; the manifest remembers it and a later run with
+    review_text true converts just those PDFs.
+
+    backend selects the pdf_backends implementation ('subprocess' runs
+    pdftotext/pdfinfo, 'pymupdf' parses each PDF once in-process).
+
+    With stream, review text is streamed from pdftotext straight into a
+    scratch file in reviews_dir (see extract_text_streaming), which is then
+    renamed to the review file, instead of passing through memory.
+
+    Byte-identical PDFs (same SHA-256 in the manifest) are extracted once per
+    run and copied. Every PDF gets a near_duplicates MinHash signature of its
+    text, kept in the manifest; the inventory's duplicate_group column names
+    the first PDF (in walk order) of each near-duplicate cluster.
+
+    With a store_path, the inventory rows and any new or missing review texts
+    are also written to that paper_store database.
+
+    With a review_store_path, review texts are kept in that compressed
+    review_store.ReviewStore instead of as files in reviews_dir (which then
+    only holds streaming scratch files).
+
+    Returns the inventory rows and the set of stems whose review text this
+    run wrote.
+
+    With a metrics_path, a JSON line per extracted PDF (strategy attempts,
+    timeouts, stage timings, output bytes) and one for the run are appended
+    to that file; see pipeline_metrics.py for the format and a summary.
+
+    With a timeout_stats_path, timeouts adapt to each PDF's size and page
+    count and a timed-out PDF is retried at the end of the run with the
+    default timeouts; repeat offenders are deferred there from the start
+    (see timeout_scheduler). With a time_budget in seconds, no new extraction
+    starts once it is spent; the PDFs left over keep their previous manifest
+    entry, and new or changed ones are extracted by the next run.
+    """
+    run_started = time.perf_counter()
+    metrics = MetricsLog(metrics_path, datetime.now().isoformat(timespec='seconds')) if metrics_path else None
+    Path(reviews_dir).mkdir(exist_ok=True)
+    reviews = open_reviews(reviews_dir, review_store_path)
+    options = _extraction_options(backend, header_pages, strategy_stats_path is not None)
+    run = _Extraction(find_pdfs(root_dir), reviews, reviews_dir, options, jobs, review_text, stream, metrics)
+
+    previous = load_manifest(manifest_path) if manifest_path else {}
+    if manifest_path:
+        run.plan({} if rebuild else previous)
+        print(f"Reusing {run.reused} unchanged PDFs, extracting {len(run.pending)}"
+              + (f", copying {len(run.copies)} byte-identical duplicates" if run.copies else ""))
+    else:
+        run.plan(None)
+    if review_text:
+        run.convert_deferred()
+
+    strategy_stats = load_strategy_stats(strategy_stats_path) if strategy_stats_path else None
+    timeout_stats = load_timeout_stats(timeout_stats_path) if timeout_stats_path else None
+    run.extract(strategy_stats, timeout_stats, run_started + time_budget if time_budget else None)
+    if run.out_of_time:
+        print(f"Time budget of {time_budget:g}s used up: {len(run.out_of_time)} PDFs left for the next run")
+        # Keep the previous extraction, if any; new and changed PDFs wait for the next run
+        run.keep_previous(previous)
+
+    rows = run.rows()
+    write_inventory(output_csv, rows)
+    _print_totals(run, strategy_stats)
+    if strategy_stats is not None:
+        save_strategy_stats(strategy_stats_path, strategy_stats)
+    if timeout_stats is not None:
+        save_timeout_stats(timeout_stats_path, timeout_stats)
+        if timeout_stats['quarantine']:
+            print(f"Quarantined PDFs: {len(timeout_stats['quarantine'])} (see timeout_scheduler.py)")
+    if metrics:
+        metrics.write('run', seconds=time.perf_counter() - run_started, pdfs=len(run.pdfs),
+                      extracted=run.extracted, reused=run.reused, copied=len(run.copies),
+                      launches=run.launches, timeouts=run.timeouts, out_of_time=len(run.out_of_time),
+                      jobs=jobs, backend=backend, stream=stream, header_pages=header_pages)
+        print(f"Metrics appended to {metrics_path} ({run.timeouts} timeouts); "
+              f"summarise with: python pipeline_metrics.py {metrics_path}")
+    if manifest_path:
+        save_manifest(manifest_path, run.manifest())
+        _drop_reviews(reviews, previous, run.manifest())
+    if store_path:
+        _store_papers(store_path, rows, run.rewritten, reviews)
+    reviews.close()
+
+    return rows, run.rewritten
+
+def update_papers(root_dir, changed, output_csv, reviews_dir, manifest_path, jobs=1, strategy_stats_path=None,
+                  backend='subprocess', stream=False, store_path=None, review_store_path=None):
+    """Bring the inventory up to date after changes to just the given paths.
+
+    changed holds paths of PDFs under root_dir that were added, modified or
+    removed, or of directories whose contents were. Only the PDFs among them
+    are planned and extracted as in process_papers; their rows replace the
+    old ones in the inventory CSV in place (new PDFs are appended) and rows
+    for PDFs that are gone are dropped, as are their manifest entries. The
+    duplicate_group column is recomputed from the manifest's signatures.
+
+    The whole tree is processed instead when root_dir itself changed (lost
+    watch events), or when the inventory has rows the manifest cannot
+    vouch for under these options. Returns what process_papers returns.
+    """
+    options = _extraction_options(backend, None, strategy_stats_path is not None)
+    manifest = load_manifest(manifest_path)
+    try:
+        with open(output_csv, 'r', newline='', encoding='utf-8') as f:
+            old_rows = list(csv.DictReader(f))
+    except OSError:
+        old_rows = None
+    changed = {os.path.relpath(path, root_dir) for path in changed}
+    if (old_rows is None or '.' in changed
+            or not all(_reusable(manifest.get(row['filename']), options) for row in old_rows)):
+        return process_papers(root_dir, output_csv, reviews_dir, jobs=jobs, manifest_path=manifest_path,
+                              strategy_stats_path=strategy_stats_path, backend=backend, stream=stream,
+                              store_path=store_path, review_store_path=review_store_path)
+
+    found = {}
+    for relative_path in changed:
+        path = os.path.join(root_dir, relative_path)
+        if any(part.startswith('.') for part in Path(relative_path).parts):
+            continue  # hidden, as find_pdfs skips them
+        if os.path.isdir(path):
+            found.update((pdf_path, _pdf_location(root_dir, pdf_path)) for pdf_path, _, _ in find_pdfs(path))
+        elif relative_path.lower().endswith('.pdf') and os.path.isfile(path):
+            found[path] = _pdf_location(root_dir, path)
+    present = {pdf[1] for pdf in found.values()}
+    removed = {path for path in manifest.keys() | {row['filename'] for row in old_rows}
+               if path not in present
+               and any(path == prefix or path.startswith(prefix + os.sep) for prefix in changed)}
+    stems = review_stems(((manifest.keys() | {row['filename'] for row in old_rows}) - removed) | present)
+    for row in old_rows:
+        # An added or removed namesake changes the review stem of an unchanged PDF
+        path = os.path.join(root_dir, row['filename'])
+        if row['filename'] in stems and row_stem(row) != stems[row['filename']] and os.path.isfile(path):
+            found[path] = _pdf_location(root_dir, path)
+    pdfs = sorted(found.values(), key=lambda pdf: pdf[1])
+    present = {pdf[1] for pdf in pdfs}
+
+    Path(reviews_dir).mkdir(exist_ok=True)
+    reviews = open_reviews(reviews_dir, review_store_path)
+    run = _Extraction(pdfs, reviews, reviews_dir, options, jobs, stream=stream, stems=stems)
+    previous = dict(manifest)
+    run.plan(manifest)
+    print(f"Updating {len(pdfs)} changed PDFs (reusing {run.reused}, extracting {len(run.pending)}"
+          + (f", copying {len(run.copies)}" if run.copies else "") + f"), removing {len(removed)}")
+    run.convert_deferred()
+    strategy_stats = load_strategy_stats(strategy_stats_path) if strategy_stats_path else None
+    run.extract(strategy_stats)
+
+    # Merge: changed rows in place, new ones at the end, removed ones dropped
+    for path in removed | present:
+        manifest.pop(path, None)
+    manifest.update(run.manifest())
+    updated = {pdf[1]: (pdf[2], entry) for pdf, entry in zip(pdfs, run.entries) if entry and entry['fields']}
+    merged = [(row['filename'], row['category']) for row in old_rows
+              if row['filename'] not in removed and (row['filename'] not in present or row['filename'] in updated)]
+    known = {path for path, _ in merged}
+    merged += [(path, updated[path][0]) for path in sorted(updated) if path not in known]
+    entries = {path: updated[path][1] if path in updated else manifest[path] for path, _ in merged}
+    duplicate_group = _duplicate_groups([(path, entries[path]) for path, _ in merged])
+    rows = [_inventory_row(path, category, entries[path], duplicate_group) for path, category in merged]
+
+    write_inventory(output_csv, rows)
+    _print_totals(run, strategy_stats)
+    if strategy_stats is not None:
+        save_strategy_stats(strategy_stats_path, strategy_stats)
+    save_manifest(manifest_path, manifest)
+    _drop_reviews(reviews, previous, manifest)
+    if store_path:
+        _store_papers(store_path, rows, run.rewritten, reviews)
+    reviews.close()
+
+    return rows, run.rewritten
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='worker processes for extraction (0 = one per CPU; default 1)')
+    parser.add_argument('--manifest', default='paper_manifest.json',
+                        help='incremental cache of extracted PDFs (default: paper_manifest.json)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='do not read or write the manifest')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='re-extract every PDF, then write a fresh manifest')
+    parser.add_argument('--adaptive-order', action='store_true',
+                        help='try first the pdftotext strategies that won most often for each PDF producer')
+    parser.add_argument('--strategy-stats', default='strategy_stats.json',
+                        help='per-producer pdftotext strategy history for --adaptive-order '
+                             '(default: strategy_stats.json)')
+    parser.add_argument('--header-pages', type=int, default=None, metavar='N',
+                        help='parse title/authors/abstract from pages 1-N only')
+    parser.add_argument('--no-review-text', action='store_true',
+                        help='with --header-pages, defer full-text review files to a later run')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='subprocess',
+                        help='PDF text/metadata backend (default: subprocess, i.e. poppler tools)')
+    parser.add_argument('--stream', action='store_true',
+                        help='stream pdftotext output into review files, stopping at 200k characters')
+    parser.add_argument('--adaptive-timeouts', action='store_true',
+                        help='predict pdftotext timeouts per PDF and retry timed-out PDFs at the end')
+    parser.add_argument('--timeout-stats', default=TIMEOUT_STATS_FILE,
+                        help=f'observed conversion rates and quarantined PDFs (default: {TIMEOUT_STATS_FILE})')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='start no new extraction after this many seconds')
+    parser.add_argument('--metrics', nargs='?', const=METRICS_FILE, metavar='FILE',
+                        help=f'append per-PDF timings and strategy outcomes as JSON lines (default: {METRICS_FILE})')
+    add_store_argument(parser)
+    add_review_store_argument(parser)
+    args = parser.parse_args()
 
-if __name__ == '__main__':
     root_dir = 'referenced papers'
     output_csv = 'paper_inventory.csv'
     reviews_dir = 'paper_reviews'
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    manifest_path = None if args.no_cache else args.manifest
 
     if os.path.exists(root_dir):
-        process_papers(root_dir, output_csv, reviews_dir)
+        process_papers(root_dir, output_csv, reviews_dir, jobs=jobs,
+                       manifest_path=manifest_path, rebuild=args.rebuild,
+                       strategy_stats_path=args.strategy_stats if args.adaptive_order else None,
+                       header_pages=args.header_pages,
+                       review_text=not (args.header_pages and args.no_review_text),
+                       backend=args.backend, stream=args.stream, store_path=args.store,
+                       metrics_path=args.metrics,
+                       timeout_stats_path=args.timeout_stats if args.adaptive_timeouts else None,
+                       time_budget=args.time_budget, review_store_path=args.review_store)
         print(f"Output written to {output_csv}")
-        print(f"Extracted text files in {reviews_dir}")
+        print(f"Extracted text in {args.review_store or reviews_dir}")
     else:
-        print(f"Directory '{root_dir}' not found.")
\ No newline at end of file
+        print(f"Directory '{root_dir}' not found.")
+
+if __name__ == '__main__':
+    main()
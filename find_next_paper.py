@@ -1,35 +1,174 @@
 #!/usr/bin/env python3
 """
 Find next clean papers to review.
+
+Reviewed stems come from the **File:** lines of COMPREHENSIVE_BIBLIOGRAPHY.md.
+They are cached in a small index (reviewed_index.json) keyed by content
+hashes of the bibliography's entry blocks. An unchanged file is not read at
+all; a changed one is read and hashed in full, but only the blocks whose
+hash is new are searched for File lines.
+
+Unreviewed clean papers are then ranked in a priority queue by category
+(least-reviewed categories first, or the order given with --categories),
+extraction quality (lowest garble score first) and age (oldest PDF first).
 """
 
+import argparse
+import csv
+import hashlib
+import heapq
+import json
 import os
+import re
+from collections import defaultdict
+
+from extract_paper_info import load_manifest
+from paper_store import PaperStore, add_store_argument, read_paper_list, row_stem
+
+BIBLIOGRAPHY = 'COMPREHENSIVE_BIBLIOGRAPHY.md'
+REVIEWED_INDEX_VERSION = 1
+
+_FILE_RE = re.compile(r'\*\*File:\*\* `referenced papers/[^/]+/([^\.]+)\.pdf`')
+# Entries start with a '### ' heading; splitting there keeps blocks stable
+# when entries are added or edited elsewhere in the file
+_BLOCK_RE = re.compile(r'^(?=### )', re.MULTILINE)
 
 def read_clean_papers():
     """Read clean papers list."""
-    with open('clean_papers.txt', 'r', encoding='utf-8') as f:
-        # Skip comment lines
-        papers = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-    return papers
-
-def read_reviewed_papers():
-    """Read already reviewed papers from COMPREHENSIVE_BIBLIOGRAPHY.md."""
-    reviewed = set()
+    return read_paper_list('clean_papers.txt')
+
+def read_reviewed_papers(bibliography=BIBLIOGRAPHY, index_path=None):
+    """Read already reviewed papers from COMPREHENSIVE_BIBLIOGRAPHY.md.
+
+    With an index_path the result is cached there. The file is re-read only
+    when its size or mtime changed; it is then split and hashed as a whole,
+    and only entry blocks whose hash is not in the index are scanned.
+    """
+    index = _load_index(index_path) if index_path else {}
     try:
-        with open('COMPREHENSIVE_BIBLIOGRAPHY.md', 'r', encoding='utf-8') as f:
+        stat = os.stat(bibliography)
+        if index.get('size') == stat.st_size and index.get('mtime_ns') == stat.st_mtime_ns:
+            return {stem for stems in index['blocks'].values() for stem in stems}
+
+        with open(bibliography, 'r', encoding='utf-8') as f:
             content = f.read()
-            # Look for "File:" lines
-            import re
-            file_pattern = r'\*\*File:\*\* `referenced papers/[^/]+/([^\.]+)\.pdf`'
-            matches = re.findall(file_pattern, content)
-            reviewed.update(matches)
     except Exception as e:
         print(f"Error reading reviewed papers: {e}")
-    return reviewed
+        return set()
+
+    known = index.get('blocks', {})
+    blocks = {}
+    scanned = 0
+    for block in _BLOCK_RE.split(content):
+        digest = hashlib.sha1(block.encode('utf-8')).hexdigest()
+        if digest in blocks:
+            continue
+        if digest in known:
+            blocks[digest] = known[digest]
+        else:
+            blocks[digest] = sorted(set(_FILE_RE.findall(block)))
+            scanned += 1
+    # Blocks without File lines are kept too, so they are not rescanned
+    if index_path:
+        _save_index(index_path, {'version': REVIEWED_INDEX_VERSION, 'size': stat.st_size,
+                                 'mtime_ns': stat.st_mtime_ns, 'blocks': blocks})
+        if known:
+            print(f"Reviewed index: scanned {scanned} new of {len(blocks)} bibliography blocks")
+    return {stem for stems in blocks.values() for stem in stems}
+
+def _load_index(index_path):
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index if index.get('version') == REVIEWED_INDEX_VERSION else {}
+
+def _save_index(index_path, index):
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+def read_paper_details(manifest_path='paper_manifest.json', inventory_csv='paper_inventory.csv', papers=None):
+    """{stem: (category, PDF mtime in ns or None)} for the papers of the inventory.
+
+    Categories are the inventory's category column, as classify_papers uses;
+    papers are inventory rows to use instead of inventory_csv (such as a
+    paper store's). PDF ages come from the manifest.
+    """
+    if papers is None:
+        if not os.path.exists(inventory_csv):
+            return {}
+        with open(inventory_csv, 'r', encoding='utf-8') as f:
+            papers = list(csv.DictReader(f))
+    manifest = load_manifest(manifest_path)
+    details = {}
+    for row in papers:
+        entry = manifest.get(row['filename']) or {}
+        details.setdefault(row_stem(row), (row['category'], entry.get('mtime_ns')))
+    return details
+
+def read_quality(scores_csv):
+    """{stem: garble score} from a classify_papers.py --scores CSV."""
+    with open(scores_csv, 'r', encoding='utf-8') as f:
+        return {row['stem']: float(row['score']) for row in csv.DictReader(f)}
+
+def category_ranks(details, reviewed, priority=()):
+    """{category: rank}: priority categories first, then the least-reviewed share first."""
+    totals = defaultdict(int)
+    done = defaultdict(int)
+    for stem, (category, _) in details.items():
+        totals[category] += 1
+        done[category] += stem in reviewed
+    ordered = [c for c in priority if c in totals]
+    ordered += sorted((c for c in totals if c not in ordered),
+                      key=lambda c: (done[c] / totals[c], c))
+    return {category: rank for rank, category in enumerate(ordered)}
+
+def review_queue(to_review, details, quality, ranks):
+    """Heap of (category rank, garble score, mtime, stem, category) for to_review stems."""
+    unknown_rank = len(ranks)
+    heap = []
+    for stem in to_review:
+        category, mtime_ns = details.get(stem, ('unknown', None))
+        heap.append((ranks.get(category, unknown_rank), quality.get(stem, 0.0),
+                     mtime_ns if mtime_ns is not None else 0, stem, category))
+    heapq.heapify(heap)
+    return heap
+
+def next_papers(heap, count):
+    """Pop the count highest-priority entries off a review_queue heap."""
+    return [heapq.heappop(heap) for _ in range(min(count, len(heap)))]
 
 def main():
-    clean_papers = read_clean_papers()
-    reviewed_papers = read_reviewed_papers()
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    add_store_argument(parser)
+    parser.add_argument('--count', '-n', type=int, default=20, help='papers to list (default 20)')
+    parser.add_argument('--index', default='reviewed_index.json',
+                        help='reviewed-stem index file (default: reviewed_index.json)')
+    parser.add_argument('--manifest', default='paper_manifest.json',
+                        help='extraction manifest, for PDF ages')
+    parser.add_argument('--scores', metavar='CSV',
+                        help='garble scores from classify_papers.py --scores (the store\'s are used with --store)')
+    parser.add_argument('--categories', default='',
+                        help='comma-separated categories to review first')
+    args = parser.parse_args()
+
+    reviewed_papers = read_reviewed_papers(index_path=args.index)
+    quality = read_quality(args.scores) if args.scores else {}
+    if args.store:
+        with PaperStore(args.store) as store:
+            # Record what the bibliography covers; papers marked in the store count too
+            store.mark_reviewed(reviewed_papers)
+            reviewed_papers |= store.reviewed_stems()
+            clean_papers = store.classified_stems(garbled=False)
+            papers = list(store.papers())
+            if not args.scores:
+                quality = {stem: breakdown['score'] for stem, breakdown in store.scores().items()}
+    else:
+        clean_papers = read_clean_papers()
+        papers = None
 
     print(f"Total clean papers: {len(clean_papers)}")
     print(f"Already reviewed: {len(reviewed_papers)}")
@@ -38,42 +177,23 @@ def main():
     to_review = [p for p in clean_papers if p not in reviewed_papers]
     print(f"Papers to review: {len(to_review)}")
 
-    # Show next 20 papers
-    print(f"\nNext 20 papers to review (alphabetical order):")
-    for i, paper in enumerate(to_review[:20]):
-        print(f"{i+1:3}. {paper}")
-
-    # Also show by rough category grouping
-    print(f"\nFirst few papers by rough grouping:")
-    groups = {}
-    for paper in to_review[:30]:
-        # Simple grouping by prefix
-        if paper.startswith('p'):
-            # Try to extract number
-            import re
-            match = re.match(r'p(\d+)', paper)
-            if match:
-                num = int(match.group(1))
-                if num < 100:
-                    group = 'p00-p99'
-                elif num < 200:
-                    group = 'p100-p199'
-                elif num < 300:
-                    group = 'p200-p299'
-                else:
-                    group = 'p300+'
-            else:
-                group = 'p-other'
-        elif paper.startswith('a'):
-            group = 'a-prefix'
-        else:
-            group = 'other'
+    details = read_paper_details(args.manifest, papers=papers)
+    priority = [c.strip() for c in args.categories.split(',') if c.strip()]
+    ranks = category_ranks(details, reviewed_papers, priority)
+    queue = review_queue(to_review, details, quality, ranks)
 
-        if group not in groups:
-            groups[group] = []
-        groups[group].append(paper)
+    print(f"\nNext {args.count} papers to review (by category, extraction quality, age):")
+    upcoming = next_papers(queue, args.count)
+    for i, (_, score, _, paper, category) in enumerate(upcoming):
+        print(f"{i+1:3}. {paper}  [{category}, garble score {score:.2f}]")
 
-    for group in sorted(groups.keys()):
+    # Also show the upcoming papers by category
+    groups = defaultdict(list)
+    for _, _, _, paper, category in upcoming:
+        groups[category].append(paper)
+    if groups:
+        print(f"\nUpcoming papers by category:")
+    for group in sorted(groups, key=lambda c: ranks.get(c, len(ranks))):
         papers = groups[group]
         print(f"\n{group} ({len(papers)}):")
         for paper in papers[:5]:
@@ -82,4 +202,4 @@ def main():
             print(f"  ... and {len(papers) - 5} more")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Title, author and abstract parsing for extracted paper text.
+
+FrontMatter splits the start of a document into stripped lines once, lazily
+and only as far as the heuristics look, and answers every field from that
+shared line model with precompiled patterns. It reproduces the original
+extract_*_from_text / extract_potential_* / extract_abstract functions of
+extract_paper_info.py exactly; those are kept there as the reference.
+
+Check agreement with the reference functions and the current inventory, and
+the CPU time saved:
+    python front_matter.py --compare [--manifest paper_manifest.json]
+"""
+
+import argparse
+import csv
+import os
+import re
+import time
+
+# extract_title_from_text
+TITLE_CONTENT_LINES = 31  # non-empty lines examined
+TITLE_STOP_WORDS = ('abstract', 'introduction', 'keywords', 'ccs', '1.', '1 ')
+_TITLE_SKIP_RE = re.compile(
+    r'^(?:proceedings|conference|volume|issue|issn)$'
+    r'|^(?:chi \d{4}|acm|ieee|copyright)'
+    r'|proceedings|symposium|workshop|conference'
+)
+_AFFILIATION_RE = re.compile(r'university|institute|lab|department|center|school')
+
+# extract_potential_title
+POTENTIAL_TITLE_LINES = 20
+_TITLE_AFFILIATION_RE = re.compile(r',.*(university|institute|lab|@)', re.IGNORECASE)
+_TITLE_SEPARATOR_RE = re.compile(r'\b(and|et al\.?|,)\b', re.IGNORECASE)
+
+# extract_authors_from_text
+AUTHOR_LINES = 15  # lines examined after the title
+_DIGIT_RE = re.compile(r'\d')
+_AUTHOR_SEPARATOR_RE = re.compile(r'\b(and|&|,)\b', re.IGNORECASE)
+
+# extract_potential_authors
+POTENTIAL_AUTHOR_LINES = 30
+_NAME_END_RE = re.compile(r'[\[\(@]')
+
+# extract_abstract
+ABSTRACT_HEADINGS = {'abstract', 'summary', 'synopsis'}
+ABSTRACT_STOPS = {'introduction', 'keywords', 'ccs', 'acm classification', 'author keywords',
+                  '1.', '1 introduction', '1. introduction'}
+ABSTRACT_MAX_LINES = 30
+_ABSTRACT_HEADING_RE = re.compile('|'.join(sorted(ABSTRACT_HEADINGS)), re.IGNORECASE)
+
+def _split_lines(text, pos=0):
+    """Yield the '\\n'-separated lines of text from offset pos, as str.split would."""
+    while True:
+        end = text.find('\n', pos)
+        if end < 0:
+            yield text[pos:]
+            return
+        yield text[pos:end]
+        pos = end + 1
+
+class FrontMatter:
+    """Front-matter fields of one document's text, parsed on demand."""
+
+    def __init__(self, text):
+        self.text = text
+        self._source = _split_lines(text)
+        self._lines = []  # stripped lines split so far
+        self._cache = {}
+
+    def _line_count(self, count):
+        """Split lines until count are available (or the text ends); return how many there are."""
+        while len(self._lines) < count:
+            line = next(self._source, None)
+            if line is None:
+                break
+            self._lines.append(line.strip())
+        return min(count, len(self._lines))
+
+    def lines(self, start=0, stop=None):
+        """Yield stripped lines start..stop-1 (to the end of the text if stop is None)."""
+        i = start
+        while stop is None or i < stop:
+            if self._line_count(i + 1) <= i:
+                return
+            yield self._lines[i]
+            i += 1
+
+    def _cached(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def _title_and_index(self):
+        """The heuristic title and the index of its line (-1 if there is no title)."""
+        content = 0
+        for i, line in enumerate(self.lines()):
+            if not line:
+                continue
+            content += 1
+            if content > TITLE_CONTENT_LINES:
+                break
+            line_lower = line.lower()
+            if line_lower.startswith(TITLE_STOP_WORDS):
+                break
+            if _TITLE_SKIP_RE.search(line_lower):
+                continue
+            if len(line) > 200 or len(line) < 5:
+                continue
+            if line.isupper():
+                continue
+            if '@' in line or 'http' in line:
+                continue
+            if _AFFILIATION_RE.search(line_lower):
+                continue
+            # Later lines with the same text would pass the same tests, so
+            # this is also the first line equal to the title
+            return line, i
+        return '', -1
+
+    @property
+    def title_from_text(self):
+        """Same as extract_title_from_text."""
+        return self._cached('title', self._title_and_index)[0]
+
+    @property
+    def potential_title(self):
+        """Same as extract_potential_title."""
+        return self._cached('potential_title', self._potential_title)
+
+    def _potential_title(self):
+        for line in self.lines(0, POTENTIAL_TITLE_LINES):
+            if not line:
+                continue
+            if len(line) < 10 or len(line) > 200:
+                continue
+            line_lower = line.lower()
+            if line_lower.startswith(('abstract', 'introduction')):
+                break
+            if line_lower.startswith(('proceedings', 'copyright')):
+                continue
+            if _TITLE_AFFILIATION_RE.search(line):
+                continue
+            if _TITLE_SEPARATOR_RE.search(line):
+                continue
+            return line
+        return ''
+
+    @property
+    def authors_from_text(self):
+        """Same as extract_authors_from_text."""
+        return self._cached('authors', self._authors_from_text)
+
+    def _authors_from_text(self):
+        title, title_idx = self._cached('title', self._title_and_index)
+        if not title:
+            # The original looks for the first line equal to the (empty)
+            # title, i.e. the first blank line
+            title_idx = next((i for i, line in enumerate(self.lines()) if not line), -1)
+        start = title_idx + 1 if title_idx >= 0 else 0
+        authors = []
+        for line in self.lines(start, start + AUTHOR_LINES):
+            if not line:
+                continue
+            if len(line) > 150 or len(line) < 2:
+                continue
+            if _DIGIT_RE.search(line):
+                continue
+            if '@' in line:
+                name_part = line.split('@')[0].strip()
+                if name_part and len(name_part) > 3:
+                    authors.append(name_part)
+                continue
+            if _AFFILIATION_RE.search(line.lower()):
+                continue
+            if _AUTHOR_SEPARATOR_RE.search(line):
+                authors.append(line)
+                continue
+            words = line.split()
+            if 1 <= len(words) <= 4 and all(w[0].isupper() for w in words):
+                authors.append(line)
+        # First 3 unique authors
+        return '; '.join(list(dict.fromkeys(authors))[:3])
+
+    @property
+    def potential_authors(self):
+        """Same as extract_potential_authors."""
+        return self._cached('potential_authors', self._potential_authors)
+
+    def _potential_authors(self):
+        authors = []
+        for line in self.lines(0, POTENTIAL_AUTHOR_LINES):
+            if not line or len(line) > 200:
+                continue
+            line_lower = line.lower()
+            if '@' in line or 'university' in line_lower or 'institute' in line_lower:
+                name_part = _NAME_END_RE.split(line, 1)[0].strip()
+                if name_part and len(name_part) > 3:
+                    authors.append(name_part)
+            elif _AUTHOR_SEPARATOR_RE.search(line):
+                authors.append(line)
+        return '; '.join(authors[:3])
+
+    @property
+    def abstract(self):
+        """Same as extract_abstract."""
+        return self._cached('abstract', self._abstract)
+
+    def _abstract(self):
+        # Nothing is collected before the first heading line, so search for
+        # it directly instead of walking every line of the document
+        text = self.text
+        for match in _ABSTRACT_HEADING_RE.finditer(text):
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_end = text.find('\n', match.end())
+            line = text[line_start:line_end] if line_end >= 0 else text[line_start:]
+            if line.lower().strip() in ABSTRACT_HEADINGS:
+                break
+        else:
+            return ''
+
+        abstract_lines = []
+        for line in _split_lines(text, line_start):
+            line = line.strip()
+            line_lower = line.lower()
+            if line_lower in ABSTRACT_HEADINGS:
+                continue
+            if line_lower in ABSTRACT_STOPS:
+                break
+            if line:
+                abstract_lines.append(line)
+            if len(abstract_lines) > ABSTRACT_MAX_LINES:
+                break
+        return re.sub(r'\s+', ' ', ' '.join(abstract_lines)).strip()
+
+    def fields(self, meta_title='', meta_author=''):
+        """Return (title, authors, abstract), preferring the PDF metadata when present."""
+        title = meta_title or self.title_from_text or self.potential_title
+        authors = meta_author or self.authors_from_text or self.potential_authors
+        return title, authors, self.abstract
+
+def parse_front_matter(text, meta_title='', meta_author=''):
+    """Return (title, authors, abstract) for text; see FrontMatter.fields."""
+    return FrontMatter(text).fields(meta_title, meta_author)
+
+def reference_front_matter(text, meta_title='', meta_author=''):
+    """(title, authors, abstract) from the original extract_paper_info functions."""
+    from extract_paper_info import (extract_abstract, extract_authors_from_text,
+                                    extract_potential_authors, extract_potential_title,
+                                    extract_title_from_text)
+
+    title = meta_title if meta_title else extract_title_from_text(text)
+    if not title:
+        title = extract_potential_title(text)
+    authors = meta_author if meta_author else extract_authors_from_text(text)
+    if not authors:
+        authors = extract_potential_authors(text)
+    return title, authors, extract_abstract(text)
+
+def compare(manifest_path, reviews_dir, inventory_csv=None):
+    """Parse every review text in the manifest with both parsers.
+
+    Returns a dict of counts: 'documents', per-field agreement with the
+    reference functions ('reference') and with the inventory CSV
+    ('inventory'), 'mismatches' (first few stems that disagree with the
+    reference) and the CPU seconds spent by each parser.
+    """
+    from extract_paper_info import clean_text, load_manifest
+
+    entries = load_manifest(manifest_path)
+    inventory = {}
+    if inventory_csv and os.path.exists(inventory_csv):
+        with open(inventory_csv, 'r', newline='', encoding='utf-8') as f:
+            inventory = {row['filename']: row for row in csv.DictReader(f)}
+
+    names = ('title', 'authors', 'abstract_preview')
+    result = {'documents': 0, 'reference': dict.fromkeys(names, 0),
+              'inventory': dict.fromkeys(names, 0), 'inventory_rows': 0,
+              'mismatches': [], 'reference_cpu': 0.0, 'parser_cpu': 0.0}
+    for relative_path, entry in sorted(entries.items()):
+        if not entry.get('text_file') or not entry.get('fields'):
+            continue
+        review_path = os.path.join(reviews_dir, entry['text_file'])
+        if not os.path.exists(review_path):
+            continue
+        with open(review_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        metadata = entry.get('metadata') or {}
+        meta = (metadata.get('title') or '', metadata.get('author') or '')
+
+        start = time.process_time()
+        expected = reference_front_matter(text, *meta)
+        result['reference_cpu'] += time.process_time() - start
+        start = time.process_time()
+        parsed = parse_front_matter(text, *meta)
+        result['parser_cpu'] += time.process_time() - start
+
+        result['documents'] += 1
+        row = inventory.get(relative_path)
+        result['inventory_rows'] += row is not None
+        for name, new, old in zip(names, parsed, expected):
+            result['reference'][name] += new == old
+            if row is not None:
+                limit = 200 if name == 'abstract_preview' else None
+                value = clean_text(new, max_length=300)[:limit] if new else ''
+                result['inventory'][name] += value == row[name]
+        if parsed != expected and len(result['mismatches']) < 10:
+            result['mismatches'].append(relative_path)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Front-matter parser for extracted paper text.')
+    parser.add_argument('--compare', action='store_true', required=True,
+                        help='compare with the original functions on the existing review files')
+    parser.add_argument('--manifest', default='paper_manifest.json',
+                        help='extraction manifest with per-PDF metadata (default: paper_manifest.json)')
+    parser.add_argument('--reviews', default='paper_reviews', help='review text directory')
+    parser.add_argument('--inventory', default='paper_inventory.csv', help='inventory CSV to check against')
+    args = parser.parse_args()
+
+    result = compare(args.manifest, args.reviews, args.inventory)
+    documents = result['documents']
+    if not documents:
+        print("No review texts found in the manifest")
+        return
+    print(f"Documents compared: {documents}")
+    for name in result['reference']:
+        line = f"  {name:17} {result['reference'][name]}/{documents} match the original functions"
+        if result['inventory_rows']:
+            line += f", {result['inventory'][name]}/{result['inventory_rows']} match the inventory"
+        print(line)
+    for relative_path in result['mismatches']:
+        print(f"  differs: {relative_path}")
+    old_ms = result['reference_cpu'] / documents * 1000
+    new_ms = result['parser_cpu'] / documents * 1000
+    print(f"CPU per document: {old_ms:.2f}ms original, {new_ms:.2f}ms shared parser "
+          f"({old_ms - new_ms:.2f}ms saved, {old_ms / new_ms if new_ms else float('inf'):.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,29 @@
 """
 Generate markdown bibliography from paper_inventory.csv.
 Creates structured entries with placeholders for detailed reviews.
+
+--incremental re-renders only the category sections whose papers changed
+and keeps the rest of the existing file (manual edits included);
+--split DIR writes one file per category into DIR and makes the output
+file a short index. --cross-references fills each entry's Cross-references
+field with the thesis files that mention the paper (see cross_references.py).
+--authors replaces each raw authors field with the cleaned, grouped names
+from author_index.py and writes the author -> papers list to
+AUTHORS_AUTO_GENERATED.md.
 """
 
+import argparse
 import csv
+import hashlib
+import json
 import os
+import re
 from collections import defaultdict
+from pathlib import Path
+
+from author_index import AuthorIndex
+from cross_references import format_references, resolve
+from paper_store import PaperStore, add_store_argument
 
 def read_csv(csv_path):
     """Read CSV and group by category."""
@@ -20,6 +38,14 @@ def read_csv(csv_path):
 
     return papers_by_category
 
+def read_store(store_path):
+    """Read the inventory from the paper store and group by category."""
+    papers_by_category = defaultdict(list)
+    with PaperStore(store_path) as store:
+        for row in store.papers():
+            papers_by_category[row['category']].append(row)
+    return papers_by_category
+
 def format_citation(row):
     """Format a basic citation from row data."""
     title = row['title'].strip() if row['title'].strip() else 'Unknown Title'
@@ -28,57 +54,248 @@ def format_citation(row):
     # Simple citation format (can be improved later)
     return f"{authors}. ({row.get('year', 'Unknown Year')}). {title}."
 
+def display_name(category):
+    """Section heading for a category."""
+    if category == 'root':
+        return 'Root Directory'
+    return category.replace('_', ' ').title()
+
+def render_header():
+    return ("# Comprehensive Bibliography - Auto-generated\n\n"
+            "This file contains automatically extracted references from the `referenced papers/` directory.\n"
+            "Entries are grouped by category. Detailed reviews will be added manually.\n\n")
+
+def render_section(category, papers):
+    """Markdown for one category section: its heading and an entry per paper."""
+    parts = [f"## {display_name(category)}\n\n"]
+    for paper in sorted(papers, key=lambda x: x['filename']):
+        citation = format_citation(paper)
+        parts.append(f"### {citation}\n\n")
+        parts.append(f"**File:** `{paper['filename']}`  \n")
+        parts.append(f"**Category:** {category}  \n")
+
+        if paper['abstract_preview']:
+            parts.append(f"**Abstract Preview:** {paper['abstract_preview']}  \n")
+
+        parts.append("\n**Summary:** *[Summary to be added]*  \n")
+        parts.append("\n**Thesis Relevance:** *[Relevance to be added]*  \n")
+        if paper.get('cross_references'):
+            parts.append(f"\n**Cross-references:** {paper['cross_references']}  \n")
+        else:
+            parts.append("\n**Cross-references:** *[Thesis chapters, models, publications]*  \n")
+
+        parts.append("\n---\n\n")
+    return ''.join(parts)
+
+def render_notes(papers_by_category):
+    return ("\n## Notes\n"
+            f"Total papers: {sum(len(papers) for papers in papers_by_category.values())}\n"
+            "Generated from `paper_inventory.csv`. Manual review needed for accuracy.\n")
+
+def cite_indexed_authors(papers_by_category):
+    """Replace each paper's authors field with its grouped names from an AuthorIndex; returns the index.
+
+    A field in which no name is recognised is kept as it is.
+    """
+    index = AuthorIndex.from_rows(row for papers in papers_by_category.values() for row in papers)
+    for papers in papers_by_category.values():
+        for row in papers:
+            row['authors'] = ', '.join(index.authors_of(row['filename'])) or row['authors']
+    return index
+
+def render_author_index(index):
+    """Markdown listing every author of the index with their papers."""
+    parts = ["# Author Index - Auto-generated\n\n"
+             "Authors from `paper_inventory.csv`, with spelling variants of a name grouped "
+             "(see `author_index.py`).\n\n"]
+    for author in index.authors():
+        others = [name for name in author.variants if name != author.name]
+        also = f" (also: {'; '.join(others)})" if others else ''
+        papers = ', '.join(f"`{paper}`" for paper in author.papers)
+        parts.append(f"- **{author.name}**{also}: {papers}\n")
+    return ''.join(parts)
+
 def generate_markdown(papers_by_category, output_path):
     """Generate markdown file with categorized entries."""
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("# Comprehensive Bibliography - Auto-generated\n\n")
-        f.write("This file contains automatically extracted references from the `referenced papers/` directory.\n")
-        f.write("Entries are grouped by category. Detailed reviews will be added manually.\n\n")
-
+        f.write(render_header())
         # Sort categories for consistent output
-        categories = sorted(papers_by_category.keys())
+        for category in sorted(papers_by_category.keys()):
+            f.write(render_section(category, papers_by_category[category]))
+        f.write(render_notes(papers_by_category))
+
+# Incremental output wraps each section in marker comments carrying a hash of
+# the inventory fields it was rendered from. Bump RENDER_VERSION when
+# render_section's output format changes so every section is re-rendered.
+RENDER_VERSION = 1
+SECTION_FIELDS = ('filename', 'title', 'authors', 'abstract_preview', 'year', 'cross_references')
+_SECTION_RE = re.compile(r'<!-- section: (.+?) ([0-9a-f]{16}) -->\n(.*?)<!-- end section: \1 -->\n', re.DOTALL)
+
+def section_hash(category, papers):
+    """Hash of everything render_section uses, to tell whether a section is stale."""
+    rows = sorted([paper.get(field) or '' for field in SECTION_FIELDS] for paper in papers)
+    data = json.dumps([RENDER_VERSION, category, rows], ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
 
-        for category in categories:
-            if category == 'root':
-                display_category = 'Root Directory'
-            else:
-                display_category = category.replace('_', ' ').title()
+def wrap_section(category, digest, body):
+    return f"<!-- section: {category} {digest} -->\n{body}<!-- end section: {category} -->\n"
 
-            f.write(f"## {display_category}\n\n")
+def read_sections(text):
+    """Existing sections of a bibliography: {category: (hash or None, body)}.
 
-            papers = papers_by_category[category]
-            # Sort by filename
-            papers.sort(key=lambda x: x['filename'])
+    Marked sections come from the marker comments. A file written by the
+    full generator has none; its '## ' sections are matched to categories by
+    heading (with no hash) so they can be adopted.
+    """
+    sections = {category: (digest, body) for category, digest, body in _SECTION_RE.findall(text)}
+    if sections:
+        return sections
+    headings = [m for m in re.finditer(r'^## (.+)\n', text, re.MULTILINE) if m.group(1) != 'Notes']
+    notes = text.find('\n## Notes\n')
+    for n, match in enumerate(headings):
+        end = headings[n + 1].start() if n + 1 < len(headings) else (notes if notes >= 0 else len(text))
+        sections[match.group(1)] = (None, text[match.start():end])
+    return sections
 
-            for i, paper in enumerate(papers, 1):
-                citation = format_citation(paper)
-                f.write(f"### {citation}\n\n")
-                f.write(f"**File:** `{paper['filename']}`  \n")
-                f.write(f"**Category:** {category}  \n")
+def _existing_section(sections, category, papers):
+    """The kept body for a category if it is up to date, else None."""
+    digest = section_hash(category, papers)
+    if category in sections and sections[category][0] == digest:
+        return sections[category][1]
+    legacy = sections.get(display_name(category))
+    if legacy and legacy[0] is None:
+        # Unmarked section from a full run: without a hash there is no telling
+        # what it was rendered from, so adopt it only if it is still current
+        if legacy[1] == render_section(category, papers):
+            return legacy[1]
+    return None
 
-                if paper['abstract_preview']:
-                    f.write(f"**Abstract Preview:** {paper['abstract_preview']}  \n")
+def _write_if_changed(path, text):
+    """Write text to path unless it already holds exactly that; returns whether it wrote."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
 
-                f.write("\n**Summary:** *[Summary to be added]*  \n")
-                f.write("\n**Thesis Relevance:** *[Relevance to be added]*  \n")
-                f.write("\n**Cross-references:** *[Thesis chapters, models, publications]*  \n")
+def update_markdown(papers_by_category, output_path):
+    """Incrementally update output_path, re-rendering only sections whose papers changed.
 
-                f.write("\n---\n\n")
+    Up-to-date sections are kept byte for byte, so manual edits in them
+    survive. Returns the list of re-rendered categories.
+    """
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            sections = read_sections(f.read())
+    except OSError:
+        sections = {}
 
-        f.write("\n## Notes\n")
-        f.write(f"Total papers: {sum(len(papers) for papers in papers_by_category.values())}\n")
-        f.write("Generated from `paper_inventory.csv`. Manual review needed for accuracy.\n")
+    parts = [render_header()]
+    rendered = []
+    for category in sorted(papers_by_category.keys()):
+        papers = papers_by_category[category]
+        body = _existing_section(sections, category, papers)
+        if body is None:
+            body = render_section(category, papers)
+            rendered.append(category)
+        parts.append(wrap_section(category, section_hash(category, papers), body))
+    parts.append(render_notes(papers_by_category))
+    _write_if_changed(output_path, ''.join(parts))
+    return rendered
+
+def section_filename(category):
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', category)}.md"
+
+def write_split_markdown(papers_by_category, output_dir, index_path):
+    """Write one file per category into output_dir, plus a small index.
+
+    Category files whose papers are unchanged are left untouched (manual
+    edits included); files for categories that no longer exist are removed
+    only if they still carry a section marker. Returns the list of
+    re-rendered categories.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    rendered = []
+    for category in sorted(papers_by_category.keys()):
+        papers = papers_by_category[category]
+        path = os.path.join(output_dir, section_filename(category))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                sections = read_sections(f.read())
+        except OSError:
+            sections = {}
+        if _existing_section(sections, category, papers) is None:
+            body = render_section(category, papers)
+            _write_if_changed(path, wrap_section(category, section_hash(category, papers), body))
+            rendered.append(category)
+
+    wanted = {section_filename(category) for category in papers_by_category}
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name.endswith('.md') and name not in wanted:
+            with open(path, 'r', encoding='utf-8') as f:
+                if _SECTION_RE.search(f.read()):
+                    os.remove(path)
+
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    lines = [render_header(), "## Categories\n\n"]
+    for category in sorted(papers_by_category.keys()):
+        link = os.path.relpath(os.path.join(output_dir, section_filename(category)), index_dir)
+        lines.append(f"- [{display_name(category)}]({Path(link).as_posix()}) "
+                     f"({len(papers_by_category[category])} papers)\n")
+    lines.append(render_notes(papers_by_category))
+    _write_if_changed(index_path, ''.join(lines))
+    return rendered
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    add_store_argument(parser)
+    parser.add_argument('--incremental', action='store_true',
+                        help='only re-render category sections whose papers changed')
+    parser.add_argument('--split', metavar='DIR',
+                        help='write one file per category into DIR plus an index (implies --incremental)')
+    parser.add_argument('--cross-references', action='store_true',
+                        help='fill Cross-references from the thesis files (cached in cross_references.json)')
+    parser.add_argument('--authors', action='store_true',
+                        help='cite cleaned, grouped author names and write the author index (author_index.py)')
+    args = parser.parse_args()
+
     csv_path = 'paper_inventory.csv'
     output_path = 'BIBLIOGRAPHY_AUTO_GENERATED.md'
+    authors_path = 'AUTHORS_AUTO_GENERATED.md'
 
-    if not os.path.exists(csv_path):
+    if args.store:
+        papers_by_category = read_store(args.store)
+    elif not os.path.exists(csv_path):
         print(f"Error: {csv_path} not found. Run extract_paper_info.py first.")
         return
+    else:
+        papers_by_category = read_csv(csv_path)
 
-    papers_by_category = read_csv(csv_path)
-    generate_markdown(papers_by_category, output_path)
+    if args.cross_references:
+        references, stats = resolve([row for papers in papers_by_category.values() for row in papers])
+        for papers in papers_by_category.values():
+            for row in papers:
+                row['cross_references'] = format_references(references.get(row['filename']))
+        print(f"Cross-references: {len(references)} papers found in the thesis "
+              f"({stats['scanned']} files scanned, {stats['delta']} for new keys only, "
+              f"{stats['reused']} reused)")
+    if args.authors:
+        index = cite_indexed_authors(papers_by_category)
+        _write_if_changed(authors_path, render_author_index(index))
+        print(f"Authors: {len(index.authors())} authors written to {authors_path}")
+    if args.split:
+        rendered = write_split_markdown(papers_by_category, args.split, output_path)
+        print(f"Re-rendered {len(rendered)} of {len(papers_by_category)} category files in {args.split}")
+    elif args.incremental:
+        rendered = update_markdown(papers_by_category, output_path)
+        print(f"Re-rendered {len(rendered)} of {len(papers_by_category)} sections")
+    else:
+        generate_markdown(papers_by_category, output_path)
 
     print(f"Generated {output_path}")
     print(f"Categories: {len(papers_by_category)}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Single-pass matching and replacement of many literal strings at once.
+
+LiteralMatcher compiles a set of literal keys into one trie-shaped regular
+expression, so a scan costs one pass over the text regardless of how many
+keys there are. ReplacementTable builds on it to apply an ordered
+old -> new table (such as garbled_fixes.csv) in one pass.
+
+Replacement semantics: rows are ranked by their order in the table. Every
+occurrence of every key is found in the original text. Occurrences are
+taken rank by rank, left to right; one is skipped if it overlaps an earlier
+occurrence of its own row or a character an earlier row has already
+changed (characters a row's old and new text share at either end count as
+unchanged). Replaced text is not rescanned. This reproduces applying
+str.replace row by row, except where the inserted text itself completes a
+new match for a later row.
+
+Check a table against row-by-row str.replace:
+    python multi_pattern.py --verify garbled_fixes.csv [TEXT_FILE ...]
+"""
+
+import argparse
+import csv
+import glob
+import random
+import re
+
+def _trie_pattern(keys):
+    """Regex source matching any of keys, shaped as a trie (longest match first)."""
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = {}  # end-of-key marker
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+class LiteralMatcher:
+    """Find every occurrence of a set of literal keys in one scan."""
+
+    def __init__(self, keys, ignore_case=False, whole_words=False):
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+        self.keys = {self._normalise(key) for key in keys if key}
+        self._lengths = sorted({len(key) for key in self.keys}, reverse=True)
+        trie = _trie_pattern(self.keys)
+        if whole_words:
+            pattern = r'(?<!\w)(?=(' + trie + r')(?!\w))'
+        else:
+            pattern = '(?=(' + trie + '))'
+        flags = re.IGNORECASE if ignore_case else 0
+        self._regex = re.compile(pattern, flags) if self.keys else None
+
+    def _normalise(self, key):
+        return key.lower() if self.ignore_case else key
+
+    def matches(self, text):
+        """Yield (start, end, key) for every occurrence, overlapping ones included."""
+        if self._regex is None:
+            return
+        for match in self._regex.finditer(text):
+            start = match.start()
+            found = match.group(1)
+            yield start, start + len(found), self._normalise(found)
+            # Shorter keys starting here are prefixes of the longest match
+            for length in self._lengths:
+                if length >= len(found):
+                    continue
+                piece = self._normalise(found[:length])
+                if piece not in self.keys:
+                    continue
+                end = start + length
+                if self.whole_words and end < len(text) and re.match(r'\w', text[end]):
+                    continue
+                yield start, end, piece
+
+def _core_span(old, new):
+    """Lengths of the prefix and suffix old and new share, leaving old a non-empty core."""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    prefix = min(prefix, len(old) - 1)
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    suffix = min(suffix, len(old) - 1 - prefix)
+    return prefix, suffix
+
+class ReplacementTable:
+    """An ordered old -> new replacement table applied in a single pass."""
+
+    def __init__(self, rows):
+        self.rows = [(old, new) for old, new in rows if old]
+        self._rank = {}
+        for rank, (old, new) in enumerate(self.rows):
+            self._rank.setdefault(old, rank)
+        # A row only changes the core of its match; the shared prefix and
+        # suffix survive, and a later row may still match across them.
+        self._cores = []
+        for old, new in self.rows:
+            prefix, suffix = _core_span(old, new)
+            self._cores.append((prefix, len(old) - suffix, new[prefix:len(new) - suffix]))
+        self._matcher = LiteralMatcher(self._rank)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def apply(self, text):
+        """Apply the whole table to text in one left-to-right scan."""
+        candidates = [(self._rank[key], start, end) for start, end, key in self._matcher.matches(text)]
+        if not candidates:
+            return text
+        candidates.sort()
+        changed = bytearray(len(text))
+        chosen = []
+        current_rank = last_end = None
+        for rank, start, end in candidates:
+            if rank != current_rank:
+                current_rank, last_end = rank, 0
+            # Skip matches broken by an earlier row, or overlapping this row's previous match
+            if start < last_end or changed.find(1, start, end) != -1:
+                continue
+            core_start, core_end, replacement = self._cores[rank]
+            core_start += start
+            core_end += start
+            changed[core_start:core_end] = b'\x01' * (core_end - core_start)
+            chosen.append((core_start, core_end, replacement))
+            last_end = end
+        chosen.sort()
+
+        pieces = []
+        pos = 0
+        for start, end, replacement in chosen:
+            pieces.append(text[pos:start])
+            pieces.append(replacement)
+            pos = end
+        pieces.append(text[pos:])
+        return ''.join(pieces)
+
+    def apply_sequential(self, text):
+        """Reference implementation: str.replace for each row in turn."""
+        for old, new in self.rows:
+            if old in text:
+                text = text.replace(old, new)
+        return text
+
+def load_replacement_table(csv_path):
+    """Load a ReplacementTable from a CSV file with 'garbled' and 'fixed' columns."""
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        return ReplacementTable((row['garbled'], row['fixed']) for row in csv.DictReader(f))
+
+def sample_texts(table, count=2000, seed=0):
+    """Generate texts mixing every table key with filler words and separators."""
+    rng = random.Random(seed)
+    filler = ['the', 'users', 'of', 'mobile', 'design', 'in', '12', 'a', 'world', 'he']
+    tokens = [old for old, _ in table.rows] + [new for _, new in table.rows] + filler
+    separators = [' ', ' ', ' ', '\n', ', ', '. ', '(', ')']
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(tokens) for _ in range(rng.randint(1, 30))]
+        texts.append(''.join(word + rng.choice(separators) for word in words))
+    return texts
+
+def verify(table, texts):
+    """Return the texts for which apply() and apply_sequential() disagree."""
+    return [text for text in texts if table.apply(text) != table.apply_sequential(text)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a replacement table against row-by-row str.replace.')
+    parser.add_argument('--verify', metavar='TABLE_CSV', required=True, help='replacement table to check')
+    parser.add_argument('files', nargs='*', help='text files (globs allowed) to check as well')
+    args = parser.parse_args()
+
+    table = load_replacement_table(args.verify)
+    texts = sample_texts(table)
+    for pattern in args.files:
+        for path in glob.glob(pattern):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                texts.append(f.read())
+
+    mismatches = verify(table, texts)
+    print(f"{len(table)} rows, {len(texts)} texts checked, {len(mismatches)} mismatches")
+    for text in mismatches[:5]:
+        print(f"  {text[:120]!r}")
+        print(f"    single pass: {table.apply(text)[:120]!r}")
+        print(f"    sequential:  {table.apply_sequential(text)[:120]!r}")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for extracted texts.
+
+Each text is reduced to a MinHash signature of its word 5-shingles using
+one-permutation hashing: every shingle is hashed once, the hash picks one
+of SIGNATURE_BINS bins and the bin keeps its minimum; empty bins are filled
+from the next non-empty bin (densification). The share of equal bins
+between two signatures estimates the Jaccard similarity of their shingle
+sets.
+
+Candidate pairs come from LSH banding (BANDS bands of the signature, each
+hashed to a bucket), so only texts sharing a bucket are compared and the
+cost grows with the number of texts, not its square. Pairs at or above the
+threshold are joined into clusters with union-find.
+
+extract_paper_info.py stores a signature per PDF in the manifest and marks
+clusters in the inventory's duplicate_group column. To check text files
+directly (default: everything search_index.py indexes):
+    python near_duplicates.py [--threshold 0.8] [FILE ...]
+"""
+
+import argparse
+import os
+import re
+import zlib
+from collections import defaultdict
+
+SHINGLE_WORDS = 5
+SIGNATURE_BINS = 128
+BANDS = 16  # of SIGNATURE_BINS // BANDS rows; pairs near 0.7 similarity become candidates
+DUPLICATE_THRESHOLD = 0.8
+FULL_COMPARE_BUCKET = 32  # larger buckets are compared against their first member only
+
+_TOKEN_RE = re.compile(r'\w+')
+_PRIME = (1 << 61) - 1
+_HASH_A = 0x5DEECE66D1F3A9B
+_HASH_B = 0x2545F4914F6CDD1D
+_EMPTY = -1
+
+def shingles(text):
+    """CRC-32 hashes of the word SHINGLE_WORDS-grams of text (lower-cased)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {zlib.crc32(' '.join(tokens[i:i + SHINGLE_WORDS]).encode('utf-8'))
+            for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+def minhash(text):
+    """One-permutation MinHash signature of text, or None if it has no words."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    bins = [_EMPTY] * SIGNATURE_BINS
+    for h in hashes:
+        g = (_HASH_A * h + _HASH_B) % _PRIME
+        slot, value = g % SIGNATURE_BINS, g // SIGNATURE_BINS
+        if bins[slot] == _EMPTY or value < bins[slot]:
+            bins[slot] = value
+    # Densify: an empty bin borrows the next non-empty bin's value, offset by
+    # the distance so borrowed values differ from the originals
+    signature = list(bins)
+    for slot in range(SIGNATURE_BINS):
+        distance = 1
+        while signature[slot] == _EMPTY:
+            source = bins[(slot + distance) % SIGNATURE_BINS]
+            if source != _EMPTY:
+                signature[slot] = source + distance * _PRIME
+            distance += 1
+    return signature
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+def candidate_pairs(signatures):
+    """Pairs of keys whose signatures share at least one LSH band.
+
+    signatures is {key: signature}; keys must be orderable.
+    """
+    rows = SIGNATURE_BINS // BANDS
+    pairs = set()
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        for key, signature in signatures.items():
+            if signature:
+                buckets[tuple(signature[band * rows:(band + 1) * rows])].append(key)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            members.sort()
+            if len(members) <= FULL_COMPARE_BUCKET:
+                pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+            else:
+                pairs.update((members[0], b) for b in members[1:])
+    return pairs
+
+def find_clusters(signatures, threshold=DUPLICATE_THRESHOLD):
+    """Group keys whose texts are near-duplicates.
+
+    Returns a list of clusters (sorted lists of two or more keys), ordered by
+    their first key.
+    """
+    parent = {}
+
+    def find(key):
+        root = key
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while key != root:  # path compression
+            parent[key], key = root, parent.get(key, key)
+        return root
+
+    for a, b in candidate_pairs(signatures):
+        if similarity(signatures[a], signatures[b]) >= threshold:
+            parent.setdefault(a, a)
+            parent.setdefault(b, b)
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = defaultdict(list)
+    for key in parent:
+        clusters[find(key)].append(key)
+    return sorted((sorted(members) for members in clusters.values() if len(members) > 1),
+                  key=lambda members: members[0])
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate text files.')
+    parser.add_argument('files', nargs='*', help='text files (default: the search_index.py sources)')
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD,
+                        help=f'estimated Jaccard similarity for a duplicate (default {DUPLICATE_THRESHOLD})')
+    args = parser.parse_args()
+
+    paths = args.files
+    if not paths:
+        from search_index import find_sources
+        paths = find_sources()
+
+    signatures = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            signatures[path] = minhash(f.read())
+
+    clusters = find_clusters(signatures, args.threshold)
+    print(f"{len(paths)} files, {len(clusters)} duplicate clusters")
+    for members in clusters:
+        first = members[0]
+        print(f"\n{first}")
+        for other in members[1:]:
+            print(f"  {similarity(signatures[first], signatures[other]):.2f}  {other}")
+
+if __name__ == '__main__':
+    main()
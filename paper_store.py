@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store for the paper pipeline.
+
+Holds what the scripts otherwise pass around as files: the inventory rows
+(paper_inventory.csv), review texts (paper_reviews/*_review.txt), garble
+scores and classification (clean_papers.txt / garbled_papers.txt) and
+which papers have been reviewed. Each script takes --store [PATH] to read
+and write it instead of (or as well as) those files.
+
+Tables:
+    papers   one row per PDF, keyed by relative filename, in inventory order;
+             indexed by category and stem
+    reviews  one row per review stem: text, garble score breakdown and the
+             garbled flag (NULL until classified); indexed by garbled
+
+    python paper_store.py import                 # load the existing files
+    python paper_store.py export [--lists]       # write paper_inventory.csv (+ lists)
+    python paper_store.py query [--category C] [--garbled | --clean] [--stem S]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sqlite3
+from pathlib import Path
+
+DEFAULT_STORE = 'papers.db'
+
+INVENTORY_COLUMNS = ['filename', 'category', 'title', 'authors', 'abstract_preview', 'text_file',
+                     'duplicate_group']
+SCORE_COLUMNS = ['score', 'suspicious_ratio', 'pattern_hits', 'substitution_hits', 'garbled_words', 'scale']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    position INTEGER NOT NULL,
+    filename TEXT PRIMARY KEY,
+    stem TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    authors TEXT NOT NULL DEFAULT '',
+    abstract_preview TEXT NOT NULL DEFAULT '',
+    text_file TEXT NOT NULL DEFAULT '',
+    duplicate_group TEXT NOT NULL DEFAULT '',
+    reviewed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS papers_category ON papers (category);
+CREATE INDEX IF NOT EXISTS papers_stem ON papers (stem);
+CREATE TABLE IF NOT EXISTS reviews (
+    stem TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    score REAL,
+    suspicious_ratio REAL,
+    pattern_hits INTEGER,
+    substitution_hits INTEGER,
+    garbled_words INTEGER,
+    scale REAL,
+    garbled INTEGER
+);
+CREATE INDEX IF NOT EXISTS reviews_garbled ON reviews (garbled);
+"""
+
+def paper_stem(filename):
+    """Stem used for review files and classification lists."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def row_stem(row):
+    """Stem of an inventory row's review text.
+
+    That is the PDF's paper_stem unless another PDF in the inventory has the
+    same file name (see extract_paper_info.review_stems).
+    """
+    text_file = row.get('text_file') or ''
+    if text_file.endswith('_review.txt'):
+        return text_file[:-len('_review.txt')]
+    return paper_stem(row['filename'])
+
+class PaperStore:
+    """An open paper store; use as a context manager (commits on success)."""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        columns = {row['name'] for row in self.db.execute('PRAGMA table_info(papers)')}
+        if 'duplicate_group' not in columns:  # store created before duplicate detection
+            self.db.execute("ALTER TABLE papers ADD COLUMN duplicate_group TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.db.commit()
+        else:
+            self.db.rollback()
+        self.close()
+
+    # Inventory
+
+    def replace_papers(self, rows):
+        """Replace the inventory with rows (inventory CSV dicts), keeping reviewed flags."""
+        reviewed = self.reviewed_stems()
+        self.db.execute('DELETE FROM papers')
+        self.db.executemany(
+            'INSERT INTO papers (position, filename, stem, category, title, authors, abstract_preview,'
+            ' text_file, duplicate_group, reviewed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((position, row['filename'], row_stem(row), row['category'],
+              row.get('title') or '', row.get('authors') or '', row.get('abstract_preview') or '',
+              row.get('text_file') or '', row.get('duplicate_group') or '',
+              row_stem(row) in reviewed)
+             for position, row in enumerate(rows)))
+
+    def papers(self, category=None, garbled=None, stem=None):
+        """Inventory rows as dicts in inventory order, optionally filtered.
+
+        garbled=True/False keeps papers whose review is classified garbled/clean.
+        Each dict also carries 'stem', 'reviewed' and 'garbled'.
+        """
+        query = ('SELECT papers.*, reviews.garbled FROM papers'
+                 ' LEFT JOIN reviews ON reviews.stem = papers.stem')
+        conditions, params = [], []
+        if category is not None:
+            conditions.append('papers.category = ?')
+            params.append(category)
+        if stem is not None:
+            conditions.append('papers.stem = ?')
+            params.append(stem)
+        if garbled is not None:
+            conditions.append('reviews.garbled = ?')
+            params.append(int(garbled))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY papers.position'
+        return [dict(row) for row in self.db.execute(query, params)]
+
+    def category_counts(self, garbled=None):
+        """{category: number of papers}, optionally only those with that garble state."""
+        query = 'SELECT papers.category, COUNT(*) FROM papers'
+        params = []
+        if garbled is not None:
+            query += ' JOIN reviews ON reviews.stem = papers.stem WHERE reviews.garbled = ?'
+            params.append(int(garbled))
+        query += ' GROUP BY papers.category'
+        return dict(self.db.execute(query, params).fetchall())
+
+    # Review texts
+
+    def put_review(self, stem, text):
+        """Store a review text; its classification is cleared until rescored."""
+        self.db.execute(
+            'INSERT INTO reviews (stem, text) VALUES (?, ?) ON CONFLICT (stem) DO UPDATE SET'
+            ' text = excluded.text, score = NULL, suspicious_ratio = NULL, pattern_hits = NULL,'
+            ' substitution_hits = NULL, garbled_words = NULL, scale = NULL, garbled = NULL',
+            (stem, text))
+
+    def review_text(self, stem, max_chars=None):
+        """The review text for stem (its first max_chars characters), or None."""
+        if max_chars:
+            row = self.db.execute('SELECT substr(text, 1, ?) FROM reviews WHERE stem = ?',
+                                  (max_chars, stem)).fetchone()
+        else:
+            row = self.db.execute('SELECT text FROM reviews WHERE stem = ?', (stem,)).fetchone()
+        return row[0] if row else None
+
+    def review_texts(self, max_chars=None):
+        """Yield (stem, text) for every review, in stem order."""
+        if max_chars:
+            rows = self.db.execute('SELECT stem, substr(text, 1, ?) FROM reviews ORDER BY stem', (max_chars,))
+        else:
+            rows = self.db.execute('SELECT stem, text FROM reviews ORDER BY stem')
+        yield from rows
+
+    def review_stems(self):
+        return {row[0] for row in self.db.execute('SELECT stem FROM reviews')}
+
+    # Classification
+
+    def set_classification(self, stem, garbled, breakdown=None):
+        """Record whether stem's review is garbled, with its garble_score breakdown."""
+        breakdown = breakdown or {}
+        self.db.execute(
+            'UPDATE reviews SET garbled = ?, ' + ', '.join(f'{c} = ?' for c in SCORE_COLUMNS)
+            + ' WHERE stem = ?',
+            (int(garbled), *(breakdown.get(c) for c in SCORE_COLUMNS), stem))
+
+    def classified_stems(self, garbled):
+        """Sorted stems whose review is classified garbled (True) or clean (False)."""
+        return [row[0] for row in self.db.execute(
+            'SELECT stem FROM reviews WHERE garbled = ? ORDER BY stem', (int(garbled),))]
+
+    def scores(self):
+        """{stem: garble_score breakdown} for every scored review."""
+        return {row['stem']: {c: row[c] for c in SCORE_COLUMNS} for row in self.db.execute(
+            'SELECT stem, ' + ', '.join(SCORE_COLUMNS) + ' FROM reviews WHERE score IS NOT NULL')}
+
+    # Review status
+
+    def mark_reviewed(self, stems, reviewed=True):
+        self.db.executemany('UPDATE papers SET reviewed = ? WHERE stem = ?',
+                            ((int(reviewed), stem) for stem in stems))
+
+    def reviewed_stems(self):
+        return {row[0] for row in self.db.execute('SELECT DISTINCT stem FROM papers WHERE reviewed')}
+
+    # File compatibility
+
+    def export_csv(self, csv_path):
+        """Write the inventory as paper_inventory.csv; returns the row count."""
+        rows = self.papers()
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=INVENTORY_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
+
+    def import_csv(self, csv_path):
+        """Replace the inventory with the rows of an inventory CSV; returns the row count."""
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.replace_papers(rows)
+        return len(rows)
+
+    def import_reviews(self, reviews_dir, stems=None):
+        """Load *_review.txt files (only those for stems, if given); returns the count."""
+        if stems is None:
+            stems = [os.path.basename(path)[:-len('_review.txt')]
+                     for path in glob.glob(os.path.join(reviews_dir, '*_review.txt'))]
+        count = 0
+        for stem in stems:
+            review_path = os.path.join(reviews_dir, f"{stem}_review.txt")
+            if not os.path.exists(review_path):
+                continue
+            with open(review_path, 'r', encoding='utf-8', errors='ignore') as f:
+                self.put_review(stem, f.read())
+            count += 1
+        return count
+
+    def import_lists(self, clean_path, garbled_path):
+        """Load classifications from clean_papers.txt / garbled_papers.txt, where present."""
+        count = 0
+        for path, garbled in ((clean_path, False), (garbled_path, True)):
+            if os.path.exists(path):
+                for stem in read_paper_list(path):
+                    self.set_classification(stem, garbled)
+                    count += 1
+        return count
+
+    def export_lists(self, clean_path, garbled_path):
+        """Write clean_papers.txt / garbled_papers.txt from the stored classification."""
+        write_paper_list(clean_path, "Clean Papers (readable text)", self.classified_stems(False))
+        write_paper_list(garbled_path, "Garbled Papers (font encoding issues)", self.classified_stems(True))
+
+def read_paper_list(path):
+    """Stems listed in a clean/garbled papers file, skipping comment lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def write_paper_list(path, heading, stems, generator='classify_papers.py'):
+    """Write a clean/garbled papers file in the format classify_papers.py uses."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# {heading}\n")
+        f.write(f"# Generated by {generator}\n\n")
+        for stem in stems:
+            f.write(f"{stem}\n")
+
+def add_store_argument(parser):
+    """Add the shared --store [PATH] option to a script's argument parser."""
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE, metavar='PATH',
+                        help=f'use the SQLite paper store (default path: {DEFAULT_STORE})')
+
+def main():
+    parser = argparse.ArgumentParser(description='Indexed SQLite store for the paper pipeline.')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'store path (default: {DEFAULT_STORE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('import', help='load the inventory CSV, review files and classification lists')
+    load.add_argument('--inventory', default='paper_inventory.csv')
+    load.add_argument('--reviews', default='paper_reviews')
+
+    dump = commands.add_parser('export', help='write the inventory CSV from the store')
+    dump.add_argument('--inventory', default='paper_inventory.csv')
+    dump.add_argument('--lists', action='store_true',
+                      help='also write clean_papers.txt and garbled_papers.txt')
+
+    query = commands.add_parser('query', help='list papers matching filters')
+    query.add_argument('--category')
+    query.add_argument('--stem')
+    state = query.add_mutually_exclusive_group()
+    state.add_argument('--garbled', action='store_const', const=True, dest='garbled')
+    state.add_argument('--clean', action='store_const', const=False, dest='garbled')
+    args = parser.parse_args()
+
+    with PaperStore(args.store) as store:
+        if args.command == 'import':
+            if os.path.exists(args.inventory):
+                print(f"Papers: {store.import_csv(args.inventory)}")
+            if Path(args.reviews).is_dir():
+                print(f"Review texts: {store.import_reviews(args.reviews)}")
+            print(f"Classifications: {store.import_lists('clean_papers.txt', 'garbled_papers.txt')}")
+        elif args.command == 'export':
+            print(f"Wrote {store.export_csv(args.inventory)} rows to {args.inventory}")
+            if args.lists:
+                store.export_lists('clean_papers.txt', 'garbled_papers.txt')
+                print("Wrote clean_papers.txt and garbled_papers.txt")
+        else:
+            for paper in store.papers(category=args.category, garbled=args.garbled, stem=args.stem):
+                state = {None: 'unclassified', 0: 'clean', 1: 'garbled'}[paper['garbled']]
+                reviewed = ', reviewed' if paper['reviewed'] else ''
+                print(f"{paper['filename']}  [{state}{reviewed}]  {paper['title']}")
+
+if __name__ == '__main__':
+    main()
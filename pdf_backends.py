@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+PDF text and metadata backends used by extract_paper_info.py.
+
+A backend opens a PDF once and returns a document object that serves text
+for any named pdftotext strategy (optionally for a page range) and the
+pdfinfo-style metadata fields.
+
+- subprocess: runs poppler's pdftotext for every request (the original
+  behaviour); metadata is read in-process by pdf_metadata, with pdfinfo
+  only for PDFs it cannot parse.
+- pymupdf: parses the document once in-process with the optional PyMuPDF
+  package and answers every strategy and the metadata from that parse.
+
+Run as a script to compare per-PDF latency of the available backends:
+    python pdf_backends.py [--repeat N] PDF [PDF ...]
+"""
+
+import argparse
+import statistics
+import subprocess
+import threading
+import time
+
+from pdf_metadata import PDFMetadataError, read_pdf_info
+
+try:
+    import pymupdf
+except ImportError:  # older PyMuPDF releases only provide the fitz name
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+# pdftotext option sets tried by extract_text_from_pdf, in default order
+PDFTOTEXT_STRATEGIES = [
+    ('layout-utf8', ['-layout', '-enc', 'UTF-8']),
+    ('raw-utf8', ['-raw', '-enc', 'UTF-8']),
+    ('layout', ['-layout']),  # original default
+    ('raw', ['-raw']),
+    ('table-utf8', ['-table', '-enc', 'UTF-8']),
+    ('layout-latin1', ['-layout', '-eol', 'unix', '-enc', 'Latin1']),
+]
+
+# Characters read from a pdftotext pipe at a time when streaming
+STREAM_CHUNK_CHARS = 65536
+
+class PDFOpenError(ValueError):
+    """The backend cannot open or parse the PDF at all."""
+
+class PDFDocument:
+    """Base class for an open PDF; use as a context manager."""
+
+    info_source = None  # how the last info() was answered, where a backend has a choice
+    spawns_processes = False  # True if each text request runs a pdftotext process
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+
+    def text(self, strategy, first_page=None, last_page=None, timeout=30):
+        """Return the text for a PDFTOTEXT_STRATEGIES name, or '' on failure."""
+        raise NotImplementedError
+
+    def stream(self, strategy, first_page=None, last_page=None, timeout=30):
+        """Yield the text for a strategy in chunks as it is produced.
+
+        Closing the generator early stops any work still in progress. Raises
+        if the conversion fails part-way.
+        """
+        text = self.text(strategy, first_page=first_page, last_page=last_page, timeout=timeout)
+        if text:
+            yield text
+
+    def info(self, timeout=10):
+        """Return pdfinfo-style metadata fields (Title, Author, Producer, Pages, ...)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SubprocessDocument(PDFDocument):
+    """A PDF served by one pdftotext process per request; metadata without one where possible."""
+
+    spawns_processes = True
+
+    def _pdftotext_command(self, strategy, first_page, last_page):
+        cmd = ['pdftotext', *dict(PDFTOTEXT_STRATEGIES)[strategy]]
+        if first_page:
+            cmd += ['-f', str(first_page)]
+        if last_page:
+            cmd += ['-l', str(last_page)]
+        return cmd + [self.pdf_path, '-']
+
+    def text(self, strategy, first_page=None, last_page=None, timeout=30):
+        cmd = self._pdftotext_command(strategy, first_page, last_page)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return result.stdout if result.returncode == 0 else ''
+
+    def stream(self, strategy, first_page=None, last_page=None, timeout=30):
+        cmd = self._pdftotext_command(strategy, first_page, last_page)
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        # A stalled pdftotext blocks read(), so the timeout is enforced by a timer
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            while True:
+                chunk = process.stdout.read(STREAM_CHUNK_CHARS)
+                if not chunk:
+                    break
+                yield chunk
+            if process.wait() != 0:
+                if not timer.is_alive():
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+                raise subprocess.CalledProcessError(process.returncode, cmd)
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()  # consumer stopped early
+            process.stdout.close()
+            process.wait()
+
+    def info(self, timeout=10):
+        """Metadata read in-process (see pdf_metadata), or from pdfinfo if that fails."""
+        try:
+            info = read_pdf_info(self.pdf_path)
+        except (PDFMetadataError, OSError):
+            self.info_source = 'pdfinfo'
+            return self.pdfinfo(timeout)
+        self.info_source = 'native'
+        return info
+
+    def pdfinfo(self, timeout=10):
+        """The fields pdfinfo reports."""
+        result = subprocess.run(
+            ['pdfinfo', '-raw', self.pdf_path],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        info = {}
+        if result.returncode == 0:
+            for line in result.stdout.split('\n'):
+                key, sep, value = line.partition(':')
+                if sep and key not in info:
+                    info[key] = value.strip()
+        return info
+
+class PyMuPDFDocument(PDFDocument):
+    """A PDF parsed once in-process by PyMuPDF.
+
+    Strategies map onto two extraction modes: '-raw' strategies return text in
+    content-stream order, the rest in reading order. Encoding options do not
+    apply (text is already Unicode), so strategies sharing a mode and page
+    range are served from a cache. Timeouts are ignored.
+    """
+
+    def __init__(self, pdf_path):
+        super().__init__(pdf_path)
+        try:
+            self._doc = pymupdf.open(pdf_path)
+        except Exception as e:  # FileDataError for damaged PDFs, OSError for unreadable files
+            raise PDFOpenError(f"{pdf_path}: {e}") from e
+        self._cache = {}
+
+    def _mode_and_pages(self, strategy, first_page, last_page):
+        raw = '-raw' in dict(PDFTOTEXT_STRATEGIES)[strategy]
+        first = max(first_page or 1, 1)
+        last = min(last_page or self._doc.page_count, self._doc.page_count)
+        return raw, first, last
+
+    def _pages(self, raw, first, last):
+        for number in range(first - 1, last):
+            # pdftotext ends every page with a form feed
+            yield self._doc[number].get_text('text', sort=not raw) + '\f'
+
+    def text(self, strategy, first_page=None, last_page=None, timeout=None):
+        key = self._mode_and_pages(strategy, first_page, last_page)
+        if key not in self._cache:
+            self._cache[key] = ''.join(self._pages(*key))
+        return self._cache[key]
+
+    def stream(self, strategy, first_page=None, last_page=None, timeout=None):
+        key = self._mode_and_pages(strategy, first_page, last_page)
+        if key in self._cache:
+            yield self._cache[key]
+        else:
+            yield from self._pages(*key)
+
+    def info(self, timeout=None):
+        metadata = self._doc.metadata or {}
+        info = {
+            'Title': metadata.get('title') or '',
+            'Author': metadata.get('author') or '',
+            'Creator': metadata.get('creator') or '',
+            'Producer': metadata.get('producer') or '',
+            'CreationDate': metadata.get('creationDate') or '',
+            'Pages': str(self._doc.page_count),
+        }
+        return {key: value.strip() for key, value in info.items() if value}
+
+    def close(self):
+        self._doc.close()
+
+BACKENDS = {
+    'subprocess': SubprocessDocument,
+    'pymupdf': PyMuPDFDocument,
+}
+
+def available_backends():
+    """Names of the backends usable in this environment."""
+    return [name for name in BACKENDS if name != 'pymupdf' or pymupdf is not None]
+
+def open_document(pdf_path, backend='subprocess'):
+    """Open pdf_path with the named backend; use as a context manager."""
+    if backend == 'pymupdf' and pymupdf is None:
+        raise RuntimeError("The pymupdf backend needs PyMuPDF (pip install pymupdf)")
+    return BACKENDS[backend](pdf_path)
+
+def benchmark(pdf_paths, backends, repeat=3):
+    """Time the full per-PDF extraction (text strategies + metadata) per backend.
+
+    Returns {backend: [median seconds per PDF, ...]} in pdf_paths order.
+    """
+    from extract_paper_info import extract_paper_record
+
+    results = {}
+    for backend in backends:
+        latencies = []
+        for pdf_path in pdf_paths:
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                extract_paper_record(pdf_path, backend=backend)
+                samples.append(time.perf_counter() - start)
+            latencies.append(statistics.median(samples))
+        results[backend] = latencies
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-PDF latency of the PDF backends.')
+    parser.add_argument('pdfs', nargs='+', help='PDF files to extract')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per PDF (median is reported)')
+    parser.add_argument('--backend', action='append', choices=sorted(BACKENDS),
+                        help='backend to time (default: all available)')
+    args = parser.parse_args()
+
+    backends = args.backend or available_backends()
+    results = benchmark(args.pdfs, backends, repeat=args.repeat)
+
+    print(f"{'PDF':50} " + ' '.join(f"{name:>12}" for name in backends))
+    for i, pdf_path in enumerate(args.pdfs):
+        label = pdf_path if len(pdf_path) <= 50 else '...' + pdf_path[-47:]
+        print(f"{label:50} " + ' '.join(f"{results[name][i] * 1000:10.1f}ms" for name in backends))
+    print()
+    for name in backends:
+        latencies = results[name]
+        print(f"{name:12} median {statistics.median(latencies) * 1000:8.1f}ms  "
+              f"mean {statistics.mean(latencies) * 1000:8.1f}ms  total {sum(latencies):7.2f}s")
+
+if __name__ == '__main__':
+    main()
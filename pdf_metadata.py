@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+"""
+Read PDF metadata in-process, without launching pdfinfo.
+
+The file is memory-mapped and only the bytes that lead to the metadata are
+parsed: the last startxref, the cross-reference sections it chains to
+(classic tables, read lazily, and cross-reference streams, with the /Prev
+and hybrid /XRefStm links of incrementally updated files), then the
+/Info dictionary, the page tree's /Count and the catalog's XMP /Metadata
+stream. Objects stored in object streams are found through the
+cross-reference stream. When the cross-reference data is damaged, the
+object offsets are rebuilt by scanning for 'N G obj' headers, as viewers
+do.
+
+Info strings are decoded as UTF-16BE (with a byte order mark), UTF-8 (PDF
+2.0, with a BOM) or PDFDocEncoding. Fields missing from /Info are taken
+from the XMP packet (dc:title, dc:creator, pdf:Producer, xmp:CreatorTool,
+xmp:CreateDate). Dates are given in ISO 8601.
+
+read_pdf_info raises PDFMetadataError for anything it cannot handle
+(encrypted files, unsupported filters, broken structure); callers fall back
+to pdfinfo (see pdf_backends.SubprocessDocument.info).
+
+Show the metadata of PDFs, or time the reader against pdfinfo:
+    python pdf_metadata.py PDF [PDF ...]
+    python pdf_metadata.py --benchmark [--repeat N] PDF [PDF ...]
+"""
+
+import argparse
+import mmap
+import re
+import statistics
+import time
+import zlib
+from collections import namedtuple
+from xml.etree import ElementTree
+
+# Bytes after startxref searched for the keyword (the spec allows 1024)
+STARTXREF_WINDOW = 4096
+MAX_DEPTH = 64  # nesting of arrays/dictionaries and chains of references
+MAX_SECTIONS = 256  # cross-reference sections followed through /Prev
+
+class PDFMetadataError(ValueError):
+    """The PDF's metadata cannot be read without a full PDF library."""
+
+Ref = namedtuple('Ref', 'num gen')
+Stream = namedtuple('Stream', 'dict start end')
+
+# PDFDocEncoding differs from Latin-1 in 0x18-0x1F and 0x80-0xA0 (ISO 32000-1, Annex D)
+_PDFDOC_DIFFERENCES = {
+    0x18: '˘', 0x19: 'ˇ', 0x1a: 'ˆ', 0x1b: '˙',
+    0x1c: '˝', 0x1d: '˛', 0x1e: '˚', 0x1f: '˜',
+    0x80: '•', 0x81: '†', 0x82: '‡', 0x83: '…',
+    0x84: '—', 0x85: '–', 0x86: 'ƒ', 0x87: '⁄',
+    0x88: '‹', 0x89: '›', 0x8a: '−', 0x8b: '‰',
+    0x8c: '„', 0x8d: '“', 0x8e: '”', 0x8f: '‘',
+    0x90: '’', 0x91: '‚', 0x92: '™', 0x93: 'ﬁ',
+    0x94: 'ﬂ', 0x95: 'Ł', 0x96: 'Œ', 0x97: 'Š',
+    0x98: 'Ÿ', 0x99: 'Ž', 0x9a: 'ı', 0x9b: 'ł',
+    0x9c: 'œ', 0x9d: 'š', 0x9e: 'ž', 0xa0: '€',
+}
+
+_WHITESPACE = rb'\x00\t\n\x0c\r '
+_DELIMITERS = rb'()<>\[\]{}/%'
+_SKIP_RE = re.compile(rb'(?:[' + _WHITESPACE + rb']+|%[^\r\n]*)*')
+_REF_RE = re.compile(rb'(\d+)[' + _WHITESPACE + rb']+(\d+)[' + _WHITESPACE + rb']+R(?![^' + _WHITESPACE
+                     + _DELIMITERS + rb'])')
+_NUMBER_RE = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_NAME_RE = re.compile(rb'/([^' + _WHITESPACE + _DELIMITERS + rb']*)')
+_NAME_ESCAPE_RE = re.compile(rb'#([0-9A-Fa-f]{2})')
+_HEX_STRING_RE = re.compile(rb'<([0-9A-Fa-f' + _WHITESPACE + rb']*)>')
+_KEYWORD_RE = re.compile(rb'[A-Za-z]+')
+_STRING_PART_RE = re.compile(rb'[^()\\\r]+|\\([0-7]{1,3}|\r\n|.)|[()]|\r\n?', re.DOTALL)
+_STRING_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+                   b'\r\n': b'', b'\r': b'', b'\n': b''}
+_OBJECT_RE = re.compile(rb'[' + _WHITESPACE + rb']*(\d+)[' + _WHITESPACE + rb']+(\d+)[' + _WHITESPACE
+                        + rb']+obj')
+_ANY_OBJECT_RE = re.compile(rb'(?<![0-9])(\d+)[' + _WHITESPACE + rb']+(\d+)[' + _WHITESPACE + rb']+obj\b')
+_STREAM_RE = re.compile(rb'[' + _WHITESPACE + rb']*stream(?:\r\n|\n|\r)')
+_ENDSTREAM_RE = re.compile(rb'(?:\r\n|\n|\r)?endstream')
+_STARTXREF_RE = re.compile(rb'startxref[' + _WHITESPACE + rb']+(\d+)')
+_XREF_SUBSECTION_RE = re.compile(rb'(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\n|\r)')
+_XREF_ENTRY_RE = re.compile(rb'(\d{10}) (\d{5}) ([nf])')
+_XREF_LINE_RE = re.compile(rb'\d{10} \d{5} [nf](?: \r| \n|\r\n|\r|\n)?')
+_DATE_RE = re.compile(r"(?:D:)?(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?"
+                      r"(?:([Zz+-])(?:(\d{2})'?(\d{2})?'?)?)?")
+
+def decode_pdf_string(data):
+    """A PDF text string as str: UTF-16BE or UTF-8 with a byte order mark, else PDFDocEncoding."""
+    if data[:2] == b'\xfe\xff':
+        return data[2:].decode('utf-16-be', errors='replace')
+    if data[:3] == b'\xef\xbb\xbf':
+        return data[3:].decode('utf-8', errors='replace')
+    return data.decode('latin-1').translate(_PDFDOC_DIFFERENCES)
+
+def pdf_date(text):
+    """A PDF date (D:YYYYMMDDHHmmSSOHH'mm') in ISO 8601; other text is returned unchanged."""
+    match = _DATE_RE.fullmatch(text.strip())
+    if not match:
+        return text
+    year, month, day, hour, minute, second, zone, zone_hours, zone_minutes = match.groups()
+    iso = f"{year}-{month or '01'}-{day or '01'}T{hour or '00'}:{minute or '00'}:{second or '00'}"
+    if zone in ('Z', 'z'):
+        return iso + 'Z'
+    if zone:
+        return iso + f"{zone}{zone_hours or '00'}:{zone_minutes or '00'}"
+    return iso
+
+def _png_unpredict(data, columns):
+    """Undo the PNG row predictors (/Predictor 10-15) of a cross-reference stream."""
+    width = columns + 1
+    previous = bytearray(columns)
+    rows = []
+    for start in range(0, len(data) - columns, width):
+        kind, row = data[start], bytearray(data[start + 1:start + width])
+        if kind == 1:  # Sub (bytes per pixel is 1 here)
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xff
+        elif kind == 2:  # Up
+            row = bytearray((a + b) & 0xff for a, b in zip(row, previous))
+        elif kind == 3:  # Average
+            for i in range(columns):
+                row[i] = (row[i] + ((row[i - 1] if i else 0) + previous[i]) // 2) & 0xff
+        elif kind == 4:  # Paeth
+            for i in range(columns):
+                left, up, corner = (row[i - 1] if i else 0), previous[i], (previous[i - 1] if i else 0)
+                estimate = left + up - corner
+                distances = abs(estimate - left), abs(estimate - up), abs(estimate - corner)
+                row[i] = (row[i] + (left, up, corner)[distances.index(min(distances))]) & 0xff
+        elif kind != 0:
+            raise PDFMetadataError(f'unknown PNG predictor {kind}')
+        rows.append(bytes(row))
+        previous = row
+    return b''.join(rows)
+
+class _XRefTable:
+    """A classic cross-reference section; entries are parsed only when looked up."""
+
+    def __init__(self, data, subsections):
+        self.data = data
+        self.subsections = subsections  # (first object number, count, offset of first entry, line length)
+
+    def lookup(self, num):
+        for first, count, offset, stride in self.subsections:
+            if first <= num < first + count:
+                match = _XREF_ENTRY_RE.match(self.data, offset + (num - first) * stride)
+                if not match:
+                    raise PDFMetadataError(f'bad xref entry for object {num}')
+                if match.group(3) == b'f':
+                    return None
+                return ('offset', int(match.group(1)), int(match.group(2)))
+        return None
+
+class _XRefStream:
+    """A cross-reference stream section (PDF 1.5), decoded in full."""
+
+    def __init__(self, rows, widths, index):
+        self.rows = rows
+        self.widths = widths
+        self.width = sum(widths)
+        self.index = index  # (first object number, count, first row)
+
+    def lookup(self, num):
+        for first, count, row in self.index:
+            if first <= num < first + count:
+                start = (row + num - first) * self.width
+                fields = []
+                for width in self.widths:
+                    fields.append(int.from_bytes(self.rows[start:start + width], 'big'))
+                    start += width
+                kind = fields[0] if self.widths[0] else 1
+                if kind == 1:
+                    return ('offset', fields[1], fields[2])
+                if kind == 2:
+                    return ('compressed', fields[1], fields[2])
+                return None
+        return None
+
+class _ObjectIndex:
+    """Object offsets found by scanning the file, for damaged cross-reference data."""
+
+    def __init__(self, offsets):
+        self.offsets = offsets
+
+    def lookup(self, num):
+        return ('offset', self.offsets[num], 0) if num in self.offsets else None
+
+class PDFMetadataReader:
+    """Metadata of a PDF held in a buffer (typically an mmap); see read_pdf_info."""
+
+    def __init__(self, data):
+        self.data = data
+        self.sections = []
+        self.trailer = {}
+        self._objects = {}
+        self._object_streams = {}
+        self.rebuilt = False
+        try:
+            self._read_xref()
+        except (PDFMetadataError, ValueError, IndexError, KeyError, TypeError, zlib.error):
+            self.rebuild_xref()
+
+    # Objects
+
+    def parse(self, pos, depth=0):
+        """(value, end offset) of the object at pos."""
+        data = self.data
+        pos = _SKIP_RE.match(data, pos).end()
+        if depth > MAX_DEPTH:
+            raise PDFMetadataError('nesting too deep')
+        head = data[pos:pos + 1]
+        if head == b'/':
+            match = _NAME_RE.match(data, pos)
+            return self._name(match.group(1)), match.end()
+        if head == b'<':
+            if data[pos + 1:pos + 2] == b'<':
+                return self._dictionary(pos + 2, depth)
+            match = _HEX_STRING_RE.match(data, pos)
+            if not match:
+                raise PDFMetadataError(f'bad hex string at {pos}')
+            digits = re.sub(rb'[^0-9A-Fa-f]', b'', match.group(1))
+            return bytes.fromhex((digits + b'0' * (len(digits) % 2)).decode('ascii')), match.end()
+        if head == b'(':
+            return self._literal_string(pos + 1)
+        if head == b'[':
+            items = []
+            pos += 1
+            while True:
+                pos = _SKIP_RE.match(data, pos).end()
+                if data[pos:pos + 1] == b']':
+                    return items, pos + 1
+                if not data[pos:pos + 1]:
+                    raise PDFMetadataError('unterminated array')
+                value, pos = self.parse(pos, depth + 1)
+                items.append(value)
+        if head and head in b'+-.0123456789':
+            match = _REF_RE.match(data, pos)
+            if match:
+                return Ref(int(match.group(1)), int(match.group(2))), match.end()
+            match = _NUMBER_RE.match(data, pos)
+            if match:
+                text = match.group()
+                return (float(text) if b'.' in text else int(text)), match.end()
+        match = _KEYWORD_RE.match(data, pos)
+        if match and match.group() in (b'true', b'false', b'null'):
+            return {b'true': True, b'false': False, b'null': None}[match.group()], match.end()
+        raise PDFMetadataError(f'unexpected {bytes(data[pos:pos + 10])!r} at {pos}')
+
+    def _name(self, raw):
+        return _NAME_ESCAPE_RE.sub(lambda m: bytes.fromhex(m.group(1).decode('ascii')), raw).decode('latin-1')
+
+    def _dictionary(self, pos, depth):
+        data = self.data
+        entries = {}
+        while True:
+            pos = _SKIP_RE.match(data, pos).end()
+            if data[pos:pos + 2] == b'>>':
+                return entries, pos + 2
+            match = _NAME_RE.match(data, pos)
+            if not match:
+                raise PDFMetadataError(f'bad dictionary key at {pos}')
+            key = self._name(match.group(1))
+            value, pos = self.parse(match.end(), depth + 1)
+            entries.setdefault(key, value)
+
+    def _literal_string(self, pos):
+        data = self.data
+        parts = []
+        nesting = 1
+        while True:
+            match = _STRING_PART_RE.match(data, pos)
+            if not match:
+                raise PDFMetadataError('unterminated string')
+            pos = match.end()
+            part = match.group()
+            if part == b'(':
+                nesting += 1
+            elif part == b')':
+                nesting -= 1
+                if not nesting:
+                    return b''.join(parts), pos
+            elif match.group(1) is not None:
+                escaped = match.group(1)
+                if escaped[:1].isdigit():
+                    part = bytes([int(escaped, 8) & 0xff])
+                else:
+                    part = _STRING_ESCAPES.get(escaped, escaped)
+            elif part[:1] == b'\r':
+                part = b'\n'  # an unescaped end of line is a line feed
+            parts.append(part)
+
+    def object(self, num):
+        """The value of indirect object num (a Stream for streams), or None if it does not exist."""
+        if num in self._objects:
+            return self._objects[num]
+        self._objects[num] = None  # a reference cycle reads as null
+        entry = None
+        for section in self.sections:
+            entry = section.lookup(num)
+            if entry:
+                break
+        value = None
+        if entry and entry[0] == 'offset':
+            value = self._object_at(entry[1], num)
+        elif entry:
+            value = self._compressed_object(entry[1], entry[2], num)
+        self._objects[num] = value
+        return value
+
+    def _object_at(self, offset, num=None):
+        match = _OBJECT_RE.match(self.data, offset)
+        if not match or (num is not None and int(match.group(1)) != num):
+            raise PDFMetadataError(f'object {num} not at offset {offset}')
+        value, pos = self.parse(match.end())
+        if isinstance(value, dict):
+            match = _STREAM_RE.match(self.data, pos)
+            if match:
+                start = match.end()
+                length = self.resolve(value.get('Length'))
+                end = start + length if isinstance(length, int) else -1
+                if not 0 <= end <= len(self.data) or not _ENDSTREAM_RE.match(self.data, end):
+                    end = self.data.find(b'endstream', start)  # /Length is wrong or missing
+                    if end < 0:
+                        raise PDFMetadataError('unterminated stream')
+                    while end > start and self.data[end - 1:end] in (b'\r', b'\n'):
+                        end -= 1
+                return Stream(value, start, end)
+        return value
+
+    def _compressed_object(self, stream_num, index, num):
+        if stream_num not in self._object_streams:
+            stream = self.object(stream_num)
+            if not isinstance(stream, Stream):
+                raise PDFMetadataError(f'object stream {stream_num} missing')
+            content = self.stream_data(stream)
+            count, first = stream.dict.get('N', 0), stream.dict.get('First', 0)
+            header = content[:first].split()
+            offsets = {int(header[i]): first + int(header[i + 1]) for i in range(0, 2 * count, 2)}
+            self._object_streams[stream_num] = (content, offsets)
+        content, offsets = self._object_streams[stream_num]
+        if num not in offsets:
+            return None
+        data = self.data
+        self.data = content  # parse within the decompressed object stream
+        try:
+            return self.parse(offsets[num])[0]
+        finally:
+            self.data = data
+
+    def resolve(self, value, depth=0):
+        """value with indirect references followed."""
+        while isinstance(value, Ref):
+            depth += 1
+            if depth > MAX_DEPTH:
+                raise PDFMetadataError('reference chain too long')
+            value = self.object(value.num)
+        return value
+
+    def stream_data(self, stream):
+        """The decoded bytes of a Stream (no filter, or FlateDecode)."""
+        filters = self.resolve(stream.dict.get('Filter'))
+        filters = [self.resolve(f) for f in (filters if isinstance(filters, list) else [filters] if filters else [])]
+        params = self.resolve(stream.dict.get('DecodeParms'))
+        params = params[0] if isinstance(params, list) and params else params
+        content = self.data[stream.start:stream.end]
+        for name in filters:
+            if name not in ('FlateDecode', 'Fl'):
+                raise PDFMetadataError(f'unsupported filter {name}')
+            content = zlib.decompressobj().decompress(content)  # tolerates a truncated stream
+        if isinstance(params, dict) and self.resolve(params.get('Predictor', 1)) >= 10:
+            content = _png_unpredict(content, self.resolve(params.get('Columns', 1)))
+        return content
+
+    # Cross-reference data
+
+    def _read_xref(self):
+        data = self.data
+        start = data.rfind(b'startxref', max(0, len(data) - STARTXREF_WINDOW))
+        match = _STARTXREF_RE.match(data, start) if start >= 0 else None
+        if not match:
+            raise PDFMetadataError('no startxref')
+        offset = int(match.group(1))
+        seen = set()
+        while offset is not None:
+            if offset in seen or len(seen) >= MAX_SECTIONS:
+                break
+            seen.add(offset)
+            trailer = self._read_section(offset)
+            hybrid = trailer.get('XRefStm')
+            if isinstance(hybrid, int) and hybrid not in seen:
+                seen.add(hybrid)
+                self._read_section(hybrid)  # compressed objects of a hybrid file
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            offset = trailer.get('Prev')
+            offset = offset if isinstance(offset, int) else None
+        if not isinstance(self.trailer.get('Root'), Ref):
+            raise PDFMetadataError('no /Root in trailer')
+
+    def _read_section(self, offset):
+        """Add the cross-reference section at offset to self.sections; returns its trailer."""
+        data = self.data
+        pos = _SKIP_RE.match(data, offset).end()
+        if data[pos:pos + 4] != b'xref':
+            stream = self._object_at(pos)
+            if not isinstance(stream, Stream) or stream.dict.get('Type') != 'XRef':
+                raise PDFMetadataError(f'no cross-reference section at {offset}')
+            widths = stream.dict['W']
+            size = stream.dict.get('Size', 0)
+            pairs = stream.dict.get('Index', [0, size])
+            index, row = [], 0
+            for first, count in zip(pairs[::2], pairs[1::2]):
+                index.append((first, count, row))
+                row += count
+            self.sections.append(_XRefStream(self.stream_data(stream), widths, index))
+            return stream.dict
+
+        pos += 4
+        subsections = []
+        while True:
+            pos = _SKIP_RE.match(data, pos).end()
+            match = _XREF_SUBSECTION_RE.match(data, pos)
+            if not match:
+                break
+            first, count = int(match.group(1)), int(match.group(2))
+            pos = _SKIP_RE.match(data, match.end()).end()
+            stride = 20
+            if count:
+                line = _XREF_LINE_RE.match(data, pos)
+                if not line:
+                    raise PDFMetadataError(f'bad xref table at {pos}')
+                stride = line.end() - pos  # 20 bytes, but some writers use 19
+            subsections.append((first, count, pos, stride))
+            pos += count * stride
+        if data[pos:pos + 7] != b'trailer':
+            raise PDFMetadataError(f'no trailer after xref table at {offset}')
+        trailer, _ = self.parse(pos + 7)
+        if not isinstance(trailer, dict):
+            raise PDFMetadataError('bad trailer')
+        self.sections.append(_XRefTable(data, subsections))
+        return trailer
+
+    def rebuild_xref(self):
+        """Index every 'N G obj' header (the last copy of an object wins) and use the last trailer."""
+        offsets = {}
+        for match in _ANY_OBJECT_RE.finditer(self.data):
+            offsets[int(match.group(1))] = match.start()
+        self.rebuilt = True
+        self.sections = [_ObjectIndex(offsets)]
+        self._objects = {}
+        self._object_streams = {}
+        self.trailer = {}
+        position = self.data.rfind(b'trailer')
+        while position >= 0 and not self.trailer:
+            try:
+                trailer, _ = self.parse(position + 7)
+            except PDFMetadataError:
+                trailer = None
+            if isinstance(trailer, dict) and isinstance(trailer.get('Root'), Ref):
+                self.trailer = trailer
+            position = self.data.rfind(b'trailer', 0, position)
+        if not self.trailer:
+            for num in sorted(offsets, reverse=True):  # a cross-reference stream's dictionary
+                try:
+                    value = self.object(num)
+                except PDFMetadataError:
+                    continue
+                if isinstance(value, Stream) and value.dict.get('Type') == 'XRef' and 'Root' in value.dict:
+                    self.trailer = value.dict
+                    break
+        if not isinstance(self.trailer.get('Root'), Ref):
+            raise PDFMetadataError('no trailer')
+
+    # Metadata
+
+    def info(self):
+        """pdfinfo-style fields: Title, Author, Creator, Producer, CreationDate, Pages (non-empty ones)."""
+        if 'Encrypt' in self.trailer:
+            raise PDFMetadataError('encrypted')
+        fields = {}
+        info = self.resolve(self.trailer.get('Info'))
+        if isinstance(info, dict):
+            for key in ('Title', 'Author', 'Creator', 'Producer', 'CreationDate'):
+                value = self.resolve(info.get(key))
+                if isinstance(value, bytes):
+                    fields[key] = decode_pdf_string(value).strip()
+        root = self.resolve(self.trailer.get('Root'))
+        if not isinstance(root, dict):
+            raise PDFMetadataError('no document catalog')
+        for key, value in self.xmp(root).items():
+            if not fields.get(key):
+                fields[key] = value
+        pages = self.resolve(root.get('Pages'))
+        count = self.resolve(pages.get('Count')) if isinstance(pages, dict) else None
+        if not isinstance(count, int):
+            raise PDFMetadataError('no page count')
+        fields['Pages'] = str(count)
+        if fields.get('CreationDate'):
+            fields['CreationDate'] = pdf_date(fields['CreationDate'])
+        return {key: value for key, value in fields.items() if value}
+
+    def xmp(self, root):
+        """Title, Author, Creator, Producer and CreationDate from the catalog's XMP packet."""
+        stream = self.resolve(root.get('Metadata'))
+        if not isinstance(stream, Stream):
+            return {}
+        try:
+            return parse_xmp(self.stream_data(stream))
+        except (PDFMetadataError, zlib.error):
+            return {}
+
+_XMP_NAMESPACES = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'pdf': 'http://ns.adobe.com/pdf/1.3/',
+    'xmp': 'http://ns.adobe.com/xap/1.0/',
+}
+# Info key -> XMP property, as {namespace}name
+_XMP_FIELDS = {
+    'Title': '{%s}title' % _XMP_NAMESPACES['dc'],
+    'Author': '{%s}creator' % _XMP_NAMESPACES['dc'],
+    'Creator': '{%s}CreatorTool' % _XMP_NAMESPACES['xmp'],
+    'Producer': '{%s}Producer' % _XMP_NAMESPACES['pdf'],
+    'CreationDate': '{%s}CreateDate' % _XMP_NAMESPACES['xmp'],
+}
+
+def parse_xmp(packet):
+    """Info-style fields from an XMP packet (bytes); {} when it is not well-formed XML."""
+    for opening, closing in ((b'<x:xmpmeta', b'</x:xmpmeta>'), (b'<rdf:RDF', b'</rdf:RDF>')):
+        start, end = packet.find(opening), packet.rfind(closing)
+        if 0 <= start < end:
+            break
+    else:
+        return {}
+    try:
+        tree = ElementTree.fromstring(packet[start:end + len(closing)])
+    except ElementTree.ParseError:
+        return {}
+    fields = {}
+    description = '{%s}Description' % _XMP_NAMESPACES['rdf']
+    item = '{%s}li' % _XMP_NAMESPACES['rdf']
+    for element in tree.iter(description):
+        for key, name in _XMP_FIELDS.items():
+            if key in fields:
+                continue
+            if element.get(name):  # simple properties may be attributes
+                fields[key] = element.get(name).strip()
+                continue
+            prop = element.find(name)
+            if prop is None:
+                continue
+            items = [li.text.strip() for li in prop.iter(item) if li.text and li.text.strip()]
+            if key == 'Title':
+                default = [li.text.strip() for li in prop.iter(item)
+                           if li.text and li.get('{http://www.w3.org/XML/1998/namespace}lang') == 'x-default']
+                items = default[:1] or items[:1]
+            value = ', '.join(items) if items else (prop.text or '').strip()
+            if value:
+                fields[key] = value
+    return fields
+
+def read_pdf_info(pdf_path):
+    """pdfinfo-style metadata fields of a PDF, read from a memory map of the file.
+
+    Raises PDFMetadataError (or OSError) when the file cannot be read this way.
+    """
+    with open(pdf_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise PDFMetadataError('empty file') from None
+    with data:
+        try:
+            reader = PDFMetadataReader(data)
+            try:
+                return reader.info()
+            except PDFMetadataError:
+                if reader.rebuilt or 'Encrypt' in reader.trailer:
+                    raise
+                reader.rebuild_xref()  # offsets in the cross-reference data may be wrong
+                return reader.info()
+        except PDFMetadataError:
+            raise
+        except (ValueError, IndexError, KeyError, TypeError, RecursionError, zlib.error) as e:
+            raise PDFMetadataError(f'{type(e).__name__}: {e}') from e
+
+def benchmark(pdf_paths, repeat=3, timeout=10):
+    """Time read_pdf_info against pdfinfo per PDF.
+
+    Returns a list of (path, native seconds or None if it failed, pdfinfo
+    seconds, fields that differ); times are medians over repeat runs.
+    """
+    from pdf_backends import SubprocessDocument
+
+    rows = []
+    for pdf_path in pdf_paths:
+        native, subprocess_times = [], []
+        info = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                info = read_pdf_info(pdf_path)
+            except (PDFMetadataError, OSError):
+                info = None
+            native.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            with SubprocessDocument(pdf_path) as document:
+                reference = document.pdfinfo(timeout)
+            subprocess_times.append(time.perf_counter() - start)
+        differing = []
+        if info is not None:
+            differing = [key for key in ('Title', 'Author', 'Pages')
+                         if info.get(key, '') != reference.get(key, '')]
+        rows.append((pdf_path, statistics.median(native) if info is not None else None,
+                     statistics.median(subprocess_times), differing))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Read PDF metadata without pdfinfo.')
+    parser.add_argument('pdfs', nargs='+', help='PDF files')
+    parser.add_argument('--benchmark', action='store_true', help='time the reader against pdfinfo')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per PDF when benchmarking (median is reported)')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        for pdf_path in args.pdfs:
+            try:
+                info = read_pdf_info(pdf_path)
+            except (PDFMetadataError, OSError) as e:
+                print(f"{pdf_path}: not readable natively ({e})")
+                continue
+            print(pdf_path)
+            for key, value in info.items():
+                print(f"  {key}: {value}")
+        return
+
+    rows = benchmark(args.pdfs, args.repeat)
+    print(f"{'PDF':50} {'native':>10} {'pdfinfo':>10}  differs")
+    for pdf_path, native, pdfinfo, differing in rows:
+        label = pdf_path if len(pdf_path) <= 50 else '...' + pdf_path[-47:]
+        shown = f"{native * 1000:8.2f}ms" if native is not None else f"{'failed':>10}"
+        print(f"{label:50} {shown} {pdfinfo * 1000:8.2f}ms  {', '.join(differing)}")
+    native = [row[1] for row in rows if row[1] is not None]
+    pdfinfo = [row[2] for row in rows]
+    print(f"\nnative reads: {len(native)} of {len(rows)}, "
+          f"fields differing from pdfinfo: {sum(bool(row[3]) for row in rows)}")
+    if native:
+        print(f"native  median {statistics.median(native) * 1000:8.3f}ms  total {sum(native):7.3f}s")
+    print(f"pdfinfo median {statistics.median(pdfinfo) * 1000:8.3f}ms  total {sum(pdfinfo):7.3f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Run the whole paper pipeline with one command, redoing only what changed.
+
+Stages and what they depend on:
+
+    extract       referenced papers/        -> paper_inventory.csv, review texts, manifest
+    classify      review texts              -> clean_papers.txt, garbled_papers.txt, garble_scores.csv
+    analyze       inventory, garbled list   -> garbled papers by category (report)
+    bibliography  inventory                 -> BIBLIOGRAPHY_AUTO_GENERATED.md (incremental)
+    next          clean list, scores, COMPREHENSIVE_BIBLIOGRAPHY.md -> next papers (report)
+
+Each stage's fingerprint covers its input files, the source files that
+implement it and its options. PDFs and review texts are fingerprinted by
+path, size and mtime; everything else by content. A stage runs only when
+its fingerprint differs from the last successful run (kept in
+.pipeline_state.json) or one of its outputs is missing or was changed, so a
+run with nothing new finishes in well under a second. Reports from skipped
+stages are replayed from the state file.
+
+Results stay in memory between stages of one run (the inventory rows, the
+classification and scores); files are read only for stages whose producer
+was skipped.
+
+    python pipeline.py [--jobs N] [--force all|STAGE ...] [--dry-run] [--review-store [PATH]]
+"""
+
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = '.pipeline_state.json'
+STATE_VERSION = 1
+
+ROOT_DIR = 'referenced papers'
+INVENTORY_CSV = 'paper_inventory.csv'
+REVIEWS_DIR = 'paper_reviews'
+MANIFEST = 'paper_manifest.json'
+CLEAN_LIST = 'clean_papers.txt'
+GARBLED_LIST = 'garbled_papers.txt'
+SCORES_CSV = 'garble_scores.csv'
+BIBLIOGRAPHY = 'BIBLIOGRAPHY_AUTO_GENERATED.md'
+REVIEWED_BIBLIOGRAPHY = 'COMPREHENSIVE_BIBLIOGRAPHY.md'
+
+def file_fingerprint(path):
+    """SHA-1 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def tree_fingerprint(root, suffix):
+    """SHA-1 over the relative path, size and mtime of every file under root ending in suffix."""
+    digest = hashlib.sha1()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(suffix):
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                digest.update(f"{os.path.relpath(path, root)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def output_fingerprint(path):
+    """file_fingerprint of a file; tree_fingerprint of everything in a directory."""
+    if os.path.isdir(path):
+        return tree_fingerprint(path, '')
+    return file_fingerprint(path)
+
+def source_fingerprint(*names):
+    return {name: file_fingerprint(os.path.join(HERE, name)) for name in names}
+
+class Run:
+    """Options and the in-memory results shared by the stages of one run."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rows = None
+        self.clean = None
+        self.garbled = None
+        self.scores = None
+
+    def reviews_fingerprint(self):
+        if self.args.review_store:
+            return file_fingerprint(os.path.join(self.args.review_store, 'index.json'))
+        return tree_fingerprint(REVIEWS_DIR, '_review.txt')
+
+    def inventory(self):
+        if self.rows is None:
+            with open(INVENTORY_CSV, 'r', encoding='utf-8') as f:
+                self.rows = list(csv.DictReader(f))
+        return self.rows
+
+    def classification(self):
+        if self.clean is None:
+            from paper_store import read_paper_list
+            self.clean = read_paper_list(CLEAN_LIST)
+            self.garbled = read_paper_list(GARBLED_LIST)
+        return self.clean, self.garbled
+
+    def quality(self):
+        """{stem: garble score}, from this run's classification or garble_scores.csv."""
+        if self.scores is not None:
+            return {stem: breakdown['score'] for stem, breakdown in self.scores.items()}
+        from find_next_paper import read_quality
+        return read_quality(SCORES_CSV) if os.path.exists(SCORES_CSV) else {}
+
+# Stages: inputs(run) -> JSON-able fingerprint material, outputs(run) -> file or directory paths, run(run)
+
+def extract_inputs(run):
+    args = run.args
+    return {'pdfs': tree_fingerprint(ROOT_DIR, '.pdf'),
+            'source': source_fingerprint('extract_paper_info.py', 'front_matter.py', 'pdf_backends.py',
+                                         'multi_pattern.py', 'near_duplicates.py', 'garbled_fixes.csv',
+                                         'cipher_decoder.py', 'cipher_reference.txt', 'pdf_metadata.py',
+                                         'paper_store.py', 'review_store.py', 'timeout_scheduler.py',
+                                         'pipeline_metrics.py'),
+            'options': [args.backend, args.header_pages, args.stream, args.review_store, args.adaptive_order]}
+
+def extract_outputs(run):
+    return [INVENTORY_CSV, MANIFEST, run.args.review_store or REVIEWS_DIR]
+
+def extract_run(run):
+    from extract_paper_info import process_papers
+    args = run.args
+    run.rows, _ = process_papers(ROOT_DIR, INVENTORY_CSV, REVIEWS_DIR, jobs=args.jobs, manifest_path=MANIFEST,
+                                 strategy_stats_path='strategy_stats.json' if args.adaptive_order else None,
+                                 header_pages=args.header_pages,
+                                 backend=args.backend, stream=args.stream,
+                                 review_store_path=args.review_store)
+
+def classify_inputs(run):
+    return {'reviews': run.reviews_fingerprint(),
+            'source': source_fingerprint('classify_papers.py'),
+            'options': [run.args.threshold, run.args.max_chars]}
+
+def classify_outputs(run):
+    return [CLEAN_LIST, GARBLED_LIST, SCORES_CSV]
+
+def classify_run(run):
+    from classify_papers import analyze_reviews, write_scores
+    from paper_store import write_paper_list
+    from review_store import ReviewStore
+
+    args = run.args
+    max_chars = args.max_chars or None
+    run.scores = {}
+    if args.review_store:
+        with ReviewStore(args.review_store) as review_store:
+            run.clean, run.garbled, total = analyze_reviews(REVIEWS_DIR, args.threshold, max_chars,
+                                                            run.scores, review_store=review_store, batch=True)
+    else:
+        run.clean, run.garbled, total = analyze_reviews(REVIEWS_DIR, args.threshold, max_chars, run.scores,
+                                                        batch=True)
+    write_paper_list(CLEAN_LIST, "Clean Papers (readable text)", run.clean)
+    write_paper_list(GARBLED_LIST, "Garbled Papers (font encoding issues)", run.garbled)
+    write_scores(run.scores, SCORES_CSV)
+    print(f"Classified {total} papers: {len(run.clean)} clean, {len(run.garbled)} garbled")
+
+def analyze_inputs(run):
+    return {'inventory': file_fingerprint(INVENTORY_CSV), 'garbled': file_fingerprint(GARBLED_LIST),
+            'source': source_fingerprint('analyze_garbled_categories.py')}
+
+def analyze_run(run):
+    from analyze_garbled_categories import print_categories
+    from paper_store import row_stem
+
+    garbled = set(run.classification()[1])
+    categories = defaultdict(list)
+    for row in run.inventory():
+        stem = row_stem(row)
+        if stem in garbled:
+            categories[row['category']].append(stem)
+    print_categories(categories)
+
+def bibliography_inputs(run):
+    return {'inventory': file_fingerprint(INVENTORY_CSV),
+            'source': source_fingerprint('generate_bibliography.py')}
+
+def bibliography_outputs(run):
+    return [BIBLIOGRAPHY]
+
+def bibliography_run(run):
+    from generate_bibliography import update_markdown
+
+    papers_by_category = defaultdict(list)
+    for row in run.inventory():
+        papers_by_category[row['category']].append(dict(row))
+    rendered = update_markdown(papers_by_category, BIBLIOGRAPHY)
+    print(f"Re-rendered {len(rendered)} of {len(papers_by_category)} sections of {BIBLIOGRAPHY}")
+
+def next_inputs(run):
+    return {'clean': file_fingerprint(CLEAN_LIST), 'scores': file_fingerprint(SCORES_CSV),
+            'reviewed': file_fingerprint(REVIEWED_BIBLIOGRAPHY), 'manifest': file_fingerprint(MANIFEST),
+            'inventory': file_fingerprint(INVENTORY_CSV), 'source': source_fingerprint('find_next_paper.py'),
+            'options': [run.args.count, run.args.categories]}
+
+def next_run(run):
+    from find_next_paper import (category_ranks, next_papers, read_paper_details, read_reviewed_papers,
+                                 review_queue)
+
+    args = run.args
+    reviewed = read_reviewed_papers(REVIEWED_BIBLIOGRAPHY, index_path='reviewed_index.json')
+    to_review = [stem for stem in run.classification()[0] if stem not in reviewed]
+    details = read_paper_details(MANIFEST, INVENTORY_CSV)
+    priority = [c.strip() for c in args.categories.split(',') if c.strip()]
+    ranks = category_ranks(details, reviewed, priority)
+    queue = review_queue(to_review, details, run.quality(), ranks)
+    print(f"{len(to_review)} clean papers to review; next {args.count}:")
+    for i, (_, score, _, stem, category) in enumerate(next_papers(queue, args.count)):
+        print(f"{i+1:3}. {stem}  [{category}, garble score {score:.2f}]")
+
+STAGES = {
+    # name: (dependencies, inputs, outputs, run)
+    'extract': ((), extract_inputs, extract_outputs, extract_run),
+    'classify': (('extract',), classify_inputs, classify_outputs, classify_run),
+    'analyze': (('extract', 'classify'), analyze_inputs, lambda run: [], analyze_run),
+    'bibliography': (('extract',), bibliography_inputs, bibliography_outputs, bibliography_run),
+    'next': (('classify',), next_inputs, lambda run: [], next_run),
+}
+
+def stage_order():
+    """Stage names in dependency order."""
+    order = []
+
+    def visit(name):
+        if name not in order:
+            for dependency in STAGES[name][0]:
+                visit(dependency)
+            order.append(name)
+
+    for name in STAGES:
+        visit(name)
+    return order
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get('version') == STATE_VERSION else {}
+
+def save_state(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+def run_pipeline(args, state_path=STATE_FILE):
+    """Run the stages that are out of date; returns {stage: 'ran' | 'skipped' | 'stale'}."""
+    state = load_state(state_path)
+    stages = state.setdefault('stages', {})
+    state['version'] = STATE_VERSION
+    force = set(stage_order()) if 'all' in args.force else set(args.force)
+    run = Run(args)
+    outcome = {}
+    for name in stage_order():
+        dependencies, inputs, outputs, execute = STAGES[name]
+        # Upstream stages must have run at least once before their files can be fingerprinted
+        waiting = [dependency for dependency in dependencies if outcome.get(dependency) == 'stale']
+        if waiting:
+            outcome[name] = 'stale'
+            print(f"[{name}] waits for {', '.join(waiting)}")
+            continue
+        start = time.perf_counter()
+        fingerprint = hashlib.sha1(json.dumps(inputs(run), sort_keys=True).encode()).hexdigest()
+        previous = stages.get(name, {})
+        current_outputs = {path: output_fingerprint(path) for path in outputs(run)}
+        up_to_date = (previous.get('fingerprint') == fingerprint
+                      and previous.get('outputs') == current_outputs
+                      and None not in current_outputs.values())
+        if up_to_date and name not in force:
+            outcome[name] = 'skipped'
+            print(f"[{name}] up to date ({(time.perf_counter() - start) * 1000:.0f}ms)")
+            if previous.get('report'):
+                print(previous['report'], end='')
+            continue
+        if args.dry_run:
+            outcome[name] = 'stale'
+            print(f"[{name}] would run")
+            continue
+
+        print(f"[{name}] running")
+        report = io.StringIO()
+        if name in ('analyze', 'next'):
+            with contextlib.redirect_stdout(report):
+                execute(run)
+            print(report.getvalue(), end='')
+        else:
+            execute(run)
+        # Inputs are fingerprinted again: a stage may have rewritten its own inputs (the manifest)
+        stages[name] = {
+            'fingerprint': hashlib.sha1(json.dumps(inputs(run), sort_keys=True).encode()).hexdigest(),
+            'outputs': {path: output_fingerprint(path) for path in outputs(run)},
+            'report': report.getvalue(),
+            'seconds': time.perf_counter() - start,
+        }
+        save_state(state_path, state)
+        outcome[name] = 'ran'
+        print(f"[{name}] done in {stages[name]['seconds']:.1f}s")
+    return outcome
+
+def main():
+    from pdf_backends import BACKENDS
+    from review_store import add_review_store_argument
+
+    parser = argparse.ArgumentParser(description='Run the paper pipeline, skipping unchanged stages.')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='worker processes for extraction')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='subprocess')
+    parser.add_argument('--header-pages', type=int, metavar='N', help='see extract_paper_info.py')
+    parser.add_argument('--stream', action='store_true', help='see extract_paper_info.py')
+    parser.add_argument('--adaptive-order', action='store_true', help='see extract_paper_info.py')
+    parser.add_argument('--threshold', type=float, default=1.0, help='garble score threshold (default 1.0)')
+    parser.add_argument('--max-chars', type=int, default=5000, help='characters of each review to score; 0 scores the whole text')
+    parser.add_argument('--count', '-n', type=int, default=20, help='next papers to list (default 20)')
+    parser.add_argument('--categories', default='', help='comma-separated categories to review first')
+    parser.add_argument('--force', nargs='+', default=[], choices=['all', *STAGES], metavar='STAGE',
+                        help=f"rerun these stages regardless ({', '.join(['all', *STAGES])})")
+    parser.add_argument('--dry-run', action='store_true', help='only report which stages would run')
+    add_review_store_argument(parser)
+    args = parser.parse_args()
+    args.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if not os.path.isdir(ROOT_DIR):
+        print(f"Directory '{ROOT_DIR}' not found.")
+        return
+    start = time.perf_counter()
+    outcome = run_pipeline(args)
+    ran = [name for name, result in outcome.items() if result == 'ran']
+    print(f"\nPipeline finished in {time.perf_counter() - start:.2f}s; "
+          f"ran {', '.join(ran) if ran else 'nothing'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Run metrics for extract_paper_info.py.
+
+With --metrics FILE, process_papers appends one JSON line per extracted PDF
+('event': 'pdf'): the time and outcome of every pdftotext strategy attempt
+(seconds, characters, readability score, error or 'timeout'), the winning
+strategy, pdfinfo, heuristic parse and signature timings, page count and
+review file bytes. A closing 'event': 'run' line has the run's totals.
+Every line carries the run's start time as 'run', so one file can collect
+many runs.
+
+Summarise the latest run (or --all of them):
+    python pipeline_metrics.py [metrics.jsonl] [--top 15] [--all]
+"""
+
+import argparse
+import json
+import statistics
+from collections import Counter, defaultdict
+
+METRICS_FILE = 'extraction_metrics.jsonl'
+STAGE_TIMINGS = ('info_seconds', 'extract_seconds', 'parse_seconds', 'signature_seconds', 'review_seconds')
+
+class MetricsLog:
+    """Appends JSON lines to a metrics file, one open per line so runs can be tailed."""
+
+    def __init__(self, path, run):
+        self.path = path
+        self.run = run
+
+    def write(self, event, **fields):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'event': event, 'run': self.run, **fields}) + '\n')
+
+def read_metrics(path, run=None):
+    """Metric lines from path; only those of run (default: the last run) unless run is 'all'."""
+    lines = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    lines.append(json.loads(line))
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+    if run == 'all' or not lines:
+        return lines
+    if run is None:
+        run = lines[-1]['run']
+    return [line for line in lines if line['run'] == run]
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def strategy_summary(pdfs):
+    """{strategy: counts and timings} over the attempts of pdf metric lines."""
+    attempts = defaultdict(list)
+    wins = Counter(pdf['strategy'] for pdf in pdfs if pdf.get('strategy'))
+    for pdf in pdfs:
+        for attempt in pdf.get('attempts', ()):
+            attempts[attempt['strategy']].append(attempt)
+    summary = {}
+    for strategy, tries in attempts.items():
+        seconds = [attempt['seconds'] for attempt in tries]
+        scores = [attempt['score'] for attempt in tries if attempt['score'] is not None]
+        summary[strategy] = {
+            'attempts': len(tries),
+            'wins': wins[strategy],
+            'timeouts': sum(attempt['error'] == 'timeout' for attempt in tries),
+            'errors': sum(bool(attempt['error']) and attempt['error'] != 'timeout' for attempt in tries),
+            'empty': sum(not attempt['error'] and not attempt['chars'] for attempt in tries),
+            'median_seconds': statistics.median(seconds),
+            'p95_seconds': _percentile(seconds, 0.95),
+            'total_seconds': sum(seconds),
+            'mean_score': statistics.mean(scores) if scores else None,
+        }
+    return summary
+
+def print_summary(lines, top=15):
+    pdfs = [line for line in lines if line['event'] == 'pdf']
+    runs = [line for line in lines if line['event'] == 'run']
+    print(f"Runs: {len({line['run'] for line in lines})}, PDFs extracted: {len(pdfs)}")
+    for run in runs:
+        print(f"  {run['run']}: {run['extracted']} extracted, {run['reused']} reused, "
+              f"{run['copied']} copied in {run['seconds']:.1f}s "
+              f"(jobs {run['jobs']}, {run['backend']}, {run['launches']} launches)")
+    if not pdfs:
+        return
+
+    total = sum(pdf['total_seconds'] for pdf in pdfs)
+    print(f"\nWorker time: {total:.1f}s, {total / len(pdfs):.2f}s per PDF")
+    for stage in STAGE_TIMINGS:
+        seconds = sum(pdf.get(stage) or 0 for pdf in pdfs)
+        if seconds:
+            print(f"  {stage[:-8]:10} {seconds:9.2f}s  {seconds / total:6.1%}")
+    timeouts = sum(pdf['timeouts'] for pdf in pdfs)
+    info_errors = Counter(pdf['info_error'] for pdf in pdfs if pdf.get('info_error'))
+    no_fields = sum(not pdf['fields'] for pdf in pdfs)
+    print(f"Timeouts: {timeouts}, pdfinfo failures: {sum(info_errors.values())}, "
+          f"PDFs without usable text: {no_fields}")
+    for error, count in info_errors.most_common(5):
+        print(f"  pdfinfo {error}: {count}")
+    sources = Counter(pdf['info_source'] for pdf in pdfs if pdf.get('info_source'))
+    if sources:
+        print(f"Metadata read in-process: {sources['native']}, by pdfinfo: {sources['pdfinfo']}")
+
+    print(f"\n{'strategy':10} {'tries':>6} {'wins':>6} {'t/o':>4} {'err':>4} {'empty':>6} "
+          f"{'median':>8} {'p95':>8} {'total':>9} {'score':>6}")
+    for strategy, row in sorted(strategy_summary(pdfs).items(), key=lambda item: -item[1]['wins']):
+        score = f"{row['mean_score']:.2f}" if row['mean_score'] is not None else '-'
+        print(f"{strategy:10} {row['attempts']:6} {row['wins']:6} {row['timeouts']:4} {row['errors']:4} "
+              f"{row['empty']:6} {row['median_seconds']:7.2f}s {row['p95_seconds']:7.2f}s "
+              f"{row['total_seconds']:8.1f}s {score:>6}")
+
+    print(f"\nSlowest {min(top, len(pdfs))} PDFs:")
+    for pdf in sorted(pdfs, key=lambda pdf: -pdf['total_seconds'])[:top]:
+        tried = ', '.join(f"{a['strategy']} {a['seconds']:.1f}s" + (f" {a['error']}" if a['error'] else '')
+                          for a in pdf.get('attempts', ()))
+        pages = pdf.get('pages') or '?'
+        print(f"  {pdf['total_seconds']:7.2f}s  {pdf['file']}  [{pages} pages, "
+              f"won by {pdf.get('strategy') or 'none'}; {tried}]")
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarise extract_paper_info.py --metrics output.')
+    parser.add_argument('metrics', nargs='?', default=METRICS_FILE,
+                        help=f'metrics file (default: {METRICS_FILE})')
+    parser.add_argument('--top', type=int, default=15, help='slowest PDFs to list (default 15)')
+    parser.add_argument('--run', help='run to summarise (its start time; default: the last run)')
+    parser.add_argument('--all', action='store_true', help='summarise every run in the file')
+    args = parser.parse_args()
+
+    print_summary(read_metrics(args.metrics, 'all' if args.all else args.run), args.top)
+
+if __name__ == '__main__':
+    main()
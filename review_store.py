@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Compressed, sharded storage for review texts.
+
+ReviewStore packs each paper's review text as one zlib stream into
+append-only shard files (shard-NNNN.z, rotated at SHARD_BYTES) and keeps an
+offset index (index.json: stem -> shard, offset, compressed bytes, text
+bytes, characters). Shards are memory-mapped for reading:
+
+- get(stem) decompresses one paper; get(stem, max_chars) feeds the stream
+  to the decompressor a few KB at a time and stops once max_chars
+  characters are decoded, so a 5000-character classification sample costs
+  a fraction of the whole text
+- items() streams the corpus in shard order, i.e. sequentially on disk
+
+Rewriting a paper appends a new copy; compact() drops superseded copies.
+ReviewFiles offers the same interface over a paper_reviews/ directory, so
+extract_paper_info.py and classify_papers.py work with either.
+
+    python review_store.py migrate [--reviews paper_reviews] [--store review_store] [--delete]
+    python review_store.py stats | compact | get STEM [--chars N] | export DIR
+"""
+
+import argparse
+import codecs
+import glob
+import json
+import mmap
+import os
+import shutil
+import zlib
+
+DEFAULT_REVIEW_STORE = 'review_store'
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+SHARD_BYTES = 64 << 20
+READ_CHUNK = 4096  # compressed bytes fed per step of a prefix read
+REVIEW_SUFFIX = '_review.txt'
+
+def review_stem(text_file):
+    """Stem of a review filename ('paper_review.txt' -> 'paper')."""
+    return text_file[:-len(REVIEW_SUFFIX)] if text_file.endswith(REVIEW_SUFFIX) else text_file
+
+class ReviewStore:
+    """Review texts in compressed shards; use as a context manager (saves the index on exit)."""
+
+    def __init__(self, path=DEFAULT_REVIEW_STORE, level=6):
+        self.path = path
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+        try:
+            with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        if index.get('version') != INDEX_VERSION:
+            index = {'version': INDEX_VERSION, 'shards': 0, 'entries': {}, 'dead_bytes': 0}
+        self.index = index
+        self.entries = index['entries']  # stem -> [shard, offset, compressed, text bytes, chars]
+        self._maps = {}
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _shard_path(self, shard):
+        return os.path.join(self.path, f"shard-{shard:04d}.z")
+
+    def _map(self, shard):
+        if shard not in self._maps:
+            with open(self._shard_path(shard), 'rb') as f:
+                self._maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[shard]
+
+    def _unmap(self, shard):
+        if shard in self._maps:
+            self._maps.pop(shard).close()
+
+    def __contains__(self, stem):
+        return stem in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stems(self):
+        return set(self.entries)
+
+    def size(self, stem):
+        """UTF-8 size of a paper's text (as a review file would have), or None."""
+        entry = self.entries.get(stem)
+        return entry[3] if entry else None
+
+    def put(self, stem, text):
+        """Store text for stem, replacing any earlier copy; returns its UTF-8 size."""
+        data = text.encode('utf-8')
+        packed = zlib.compress(data, self.level)
+        shard = max(self.index['shards'] - 1, 0)
+        path = self._shard_path(shard)
+        if os.path.exists(path) and os.path.getsize(path) and os.path.getsize(path) + len(packed) > SHARD_BYTES:
+            shard += 1
+            path = self._shard_path(shard)
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(packed)
+        self._unmap(shard)  # the mapping does not cover the appended bytes
+        self.index['shards'] = max(self.index['shards'], shard + 1)
+        if stem in self.entries:
+            self.index['dead_bytes'] += self.entries[stem][2]
+        self.entries[stem] = [shard, offset, len(packed), len(data), len(text)]
+        self._dirty = True
+        return len(data)
+
+    def delete(self, stem):
+        entry = self.entries.pop(stem, None)
+        if entry:
+            self.index['dead_bytes'] += entry[2]
+            self._dirty = True
+
+    def get(self, stem, max_chars=None):
+        """The text for stem (its first max_chars characters), or None."""
+        entry = self.entries.get(stem)
+        if entry is None:
+            return None
+        shard, offset, length, _, chars = entry
+        data = self._map(shard)
+        if not max_chars or max_chars >= chars:
+            return zlib.decompress(data[offset:offset + length]).decode('utf-8')
+
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        count = 0
+        end = offset + length
+        while offset < end and count < max_chars:
+            step = min(READ_CHUNK, end - offset)
+            part = decoder.decode(decompressor.decompress(data[offset:offset + step]))
+            offset += step
+            parts.append(part)
+            count += len(part)
+        return ''.join(parts)[:max_chars]
+
+    def items(self, max_chars=None):
+        """Yield (stem, text) for every paper in on-disk order."""
+        for stem in sorted(self.entries, key=lambda stem: self.entries[stem][:2]):
+            yield stem, self.get(stem, max_chars)
+
+    def import_file(self, stem, path):
+        """Move a text file into the store; returns the text's UTF-8 size."""
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            size = self.put(stem, f.read())
+        os.remove(path)
+        return size
+
+    def copy(self, source, stem):
+        self.put(stem, self.get(source))
+
+    def stats(self):
+        """Papers, text bytes, compressed bytes, superseded bytes and shards."""
+        return {
+            'papers': len(self.entries),
+            'text_bytes': sum(entry[3] for entry in self.entries.values()),
+            'stored_bytes': sum(entry[2] for entry in self.entries.values()),
+            'dead_bytes': self.index['dead_bytes'],
+            'shards': self.index['shards'],
+        }
+
+    def compact(self):
+        """Rewrite the live texts into fresh shards, dropping superseded copies."""
+        texts = ((stem, self.get(stem)) for stem in sorted(self.entries))
+        staging = self.path + '.compact'
+        shutil.rmtree(staging, ignore_errors=True)
+        with ReviewStore(staging, self.level) as fresh:
+            for stem, text in texts:
+                fresh.put(stem, text)
+        self.close()
+        for shard in range(self.index['shards']):
+            os.remove(self._shard_path(shard))
+        for name in os.listdir(staging):
+            os.replace(os.path.join(staging, name), os.path.join(self.path, name))
+        os.rmdir(staging)
+        self.__init__(self.path, self.level)
+
+    def flush(self):
+        if self._dirty:
+            tmp_path = os.path.join(self.path, INDEX_FILE + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+            self._dirty = False
+
+    def close(self):
+        self.flush()
+        for shard in list(self._maps):
+            self._unmap(shard)
+
+class ReviewFiles:
+    """One *_review.txt file per paper in a directory, with ReviewStore's interface."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def _path(self, stem):
+        return os.path.join(self.path, stem + REVIEW_SUFFIX)
+
+    def __contains__(self, stem):
+        return os.path.exists(self._path(stem))
+
+    def stems(self):
+        return {review_stem(os.path.basename(path))
+                for path in glob.glob(os.path.join(self.path, '*' + REVIEW_SUFFIX))}
+
+    def size(self, stem):
+        try:
+            return os.path.getsize(self._path(stem))
+        except OSError:
+            return None
+
+    def put(self, stem, text):
+        with open(self._path(stem), 'w', encoding='utf-8') as f:
+            f.write(text)
+        return os.path.getsize(self._path(stem))
+
+    def delete(self, stem):
+        if stem in self:
+            os.remove(self._path(stem))
+
+    def get(self, stem, max_chars=None):
+        try:
+            with open(self._path(stem), 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(max_chars) if max_chars else f.read()
+        except OSError:
+            return None
+
+    def items(self, max_chars=None):
+        for stem in sorted(self.stems()):
+            yield stem, self.get(stem, max_chars)
+
+    def import_file(self, stem, path):
+        os.replace(path, self._path(stem))
+        return os.path.getsize(self._path(stem))
+
+    def copy(self, source, stem):
+        shutil.copyfile(self._path(source), self._path(stem))
+
+    def close(self):
+        pass
+
+def open_reviews(reviews_dir, review_store=None):
+    """A ReviewStore at review_store if given, else ReviewFiles over reviews_dir."""
+    return ReviewStore(review_store) if review_store else ReviewFiles(reviews_dir)
+
+def add_review_store_argument(parser):
+    """Add the shared --review-store [PATH] option to a script's argument parser."""
+    parser.add_argument('--review-store', nargs='?', const=DEFAULT_REVIEW_STORE, metavar='PATH',
+                        help=f'keep review texts in a compressed review store (default path: {DEFAULT_REVIEW_STORE})')
+
+def migrate(reviews_dir, store, delete=False):
+    """Pack every *_review.txt in reviews_dir into store; returns the number of files."""
+    files = ReviewFiles(reviews_dir)
+    count = 0
+    for stem, text in files.items():
+        store.put(stem, text)
+        count += 1
+    if delete:
+        for stem in files.stems():
+            files.delete(stem)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Compressed review-text store.')
+    parser.add_argument('--store', default=DEFAULT_REVIEW_STORE,
+                        help=f'store directory (default: {DEFAULT_REVIEW_STORE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    move = commands.add_parser('migrate', help='pack a paper_reviews/ directory into the store')
+    move.add_argument('--reviews', default='paper_reviews')
+    move.add_argument('--delete', action='store_true', help='remove the review files once packed')
+    commands.add_parser('stats', help='show sizes and compression')
+    commands.add_parser('compact', help='drop superseded copies')
+    show = commands.add_parser('get', help='print one paper\'s text')
+    show.add_argument('stem')
+    show.add_argument('--chars', type=int, help='print only the first N characters')
+    unpack = commands.add_parser('export', help='write the texts back out as review files')
+    unpack.add_argument('directory')
+    args = parser.parse_args()
+
+    with ReviewStore(args.store) as store:
+        if args.command == 'migrate':
+            count = migrate(args.reviews, store, args.delete)
+            print(f"Packed {count} review files from {args.reviews} into {args.store}")
+        elif args.command == 'compact':
+            store.compact()
+        elif args.command == 'get':
+            text = store.get(args.stem, args.chars)
+            if text is None:
+                parser.exit(1, f"No review text for {args.stem}\n")
+            print(text)
+            return
+        elif args.command == 'export':
+            files = ReviewFiles(args.directory)
+            for stem, text in store.items():
+                files.put(stem, text)
+            print(f"Wrote {len(store)} review files to {args.directory}")
+        stats = store.stats()
+        ratio = stats['stored_bytes'] / stats['text_bytes'] if stats['text_bytes'] else 0
+        print(f"{stats['papers']} papers, {stats['text_bytes'] / 1e6:.1f} MB of text in "
+              f"{stats['stored_bytes'] / 1e6:.1f} MB ({ratio:.0%}) across {stats['shards']} shards; "
+              f"{stats['dead_bytes'] / 1e6:.1f} MB superseded")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the extracted papers and the converted thesis texts.
+
+An on-disk inverted index in search_index/, ranked with BM25:
+
+- Documents are paper_reviews/*_review.txt, the .txt files under
+  04-core-models/ and 07-publications/, and the files named in
+  converted_files.txt.
+- The index is a list of immutable segments. Each holds a sorted term list
+  and a postings file of uint32 arrays (document ids, term frequencies,
+  token positions), both memory-mapped at query time; a term is found by
+  binary search, so a query reads only the postings it needs.
+- update indexes new and changed documents into a new segment and
+  tombstones the old versions of changed or removed ones; once there are
+  more than MAX_SEGMENTS segments they are merged into one, dropping
+  tombstoned postings.
+- Queries are words (ranked by BM25) and "quoted phrases" (required, and
+  matched on consecutive token positions).
+
+    python search_index.py update
+    python search_index.py search 'adaptation "user capability"' [-n 10]
+    python search_index.py bench [--sizes 100,1000,10000]
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import math
+import mmap
+import os
+import random
+import re
+import statistics
+import struct
+import tempfile
+import time
+from array import array
+from collections import defaultdict
+
+INDEX_DIR = 'search_index'
+INDEX_VERSION = 1
+SOURCE_DIRS = ['04-core-models', '07-publications']
+REVIEWS_DIR = 'paper_reviews'
+CONVERTED_LIST = 'converted_files.txt'
+
+SEGMENT_DOCS = 500  # documents per segment written by one update
+MAX_SEGMENTS = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r'\w+')
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+_ENTRY = struct.Struct('=4I')
+
+def tokenize(text):
+    """Lower-cased word tokens of text."""
+    return _TOKEN_RE.findall(text.lower())
+
+def parse_query(query):
+    """Split a query into (words, phrases); each phrase is a list of tokens."""
+    words, phrases = [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        tokens = tokenize(phrase if phrase else word)
+        if phrase and len(tokens) > 1:
+            phrases.append(tokens)
+        else:
+            words.extend(tokens)
+    return words, phrases
+
+def find_sources(root='.'):
+    """Relative paths of every document to index, sorted."""
+    paths = set(glob.glob(os.path.join(root, REVIEWS_DIR, '*_review.txt')))
+    for directory in SOURCE_DIRS:
+        paths.update(glob.glob(os.path.join(root, directory, '**', '*.txt'), recursive=True))
+    converted_list = os.path.join(root, CONVERTED_LIST)
+    if os.path.exists(converted_list):
+        with open(converted_list, 'r', encoding='utf-8') as f:
+            names = {line.strip() for line in f if line.strip()}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != REVIEWS_DIR]
+            paths.update(os.path.join(dirpath, name) for name in filenames if name in names)
+    return sorted(os.path.relpath(path, root) for path in paths)
+
+class Segment:
+    """One immutable, memory-mapped segment of the index.
+
+    <name>.terms  the segment's terms, sorted, each followed by '\\n'
+    <name>.table  uint32 quadruples per term: offset in .terms, offset in
+                  .post (in uint32 units), document frequency, positions
+    <name>.post   per term: doc ids[df], term frequencies[df], positions
+    """
+
+    def __init__(self, index_dir, name):
+        self.name = name
+        self._files = []
+        self._maps = []
+        self._terms = self._map(os.path.join(index_dir, name + '.terms'))
+        self._table = self._map(os.path.join(index_dir, name + '.table'))
+        self._post = self._map(os.path.join(index_dir, name + '.post'))
+        self.count = len(self._table) // _ENTRY.size
+
+    def _map(self, path):
+        f = open(path, 'rb')
+        self._files.append(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def close(self):
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+
+    def _entry(self, i):
+        """(offset in .terms, postings offset, df, positions) of term i."""
+        return _ENTRY.unpack_from(self._table, i * _ENTRY.size)
+
+    def _term(self, i):
+        start = self._entry(i)[0]
+        end = self._entry(i + 1)[0] - 1 if i + 1 < self.count else len(self._terms) - 1
+        return self._terms[start:end]
+
+    def lookup(self, term):
+        """(postings offset, df, positions) for term, or None."""
+        key = term.encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._term(lo) == key:
+            return self._entry(lo)[1:]
+        return None
+
+    def postings(self, term, deleted=()):
+        """Yield (doc id, tf, positions) for term, skipping deleted doc ids."""
+        entry = self.lookup(term)
+        if entry is None:
+            return
+        yield from self._read(*entry, deleted=deleted)
+
+    def _read(self, offset, df, npos, deleted=()):
+        # Copies just this term's postings out of the mapping
+        block = array('I')
+        block.frombytes(self._post[offset * 4:(offset + 2 * df + npos) * 4])
+        pos = 2 * df
+        for doc, tf in zip(block[:df], block[df:2 * df]):
+            if doc not in deleted:
+                yield doc, tf, block[pos:pos + tf]
+            pos += tf
+
+    def terms(self):
+        """Yield (term, postings offset, df, positions) in term order."""
+        for i in range(self.count):
+            yield (self._term(i).decode('utf-8'), *self._entry(i)[1:])
+
+def write_segment(index_dir, name, postings):
+    """Write {term: [(doc id, [positions]), ...]} (doc ids ascending) as a segment."""
+    terms = bytearray()
+    table = array('I')
+    post = array('I')
+    for term in sorted(postings):
+        entries = postings[term]
+        table.extend((len(terms), len(post), len(entries), sum(len(p) for _, p in entries)))
+        terms += term.encode('utf-8') + b'\n'
+        post.extend(doc for doc, _ in entries)
+        post.extend(len(positions) for _, positions in entries)
+        for _, positions in entries:
+            post.extend(positions)
+    with open(os.path.join(index_dir, name + '.terms'), 'wb') as f:
+        f.write(terms)
+    with open(os.path.join(index_dir, name + '.table'), 'wb') as f:
+        table.tofile(f)
+    with open(os.path.join(index_dir, name + '.post'), 'wb') as f:
+        post.tofile(f)
+
+def remove_segment(index_dir, name):
+    for suffix in ('.terms', '.table', '.post'):
+        path = os.path.join(index_dir, name + suffix)
+        if os.path.exists(path):
+            os.remove(path)
+
+def _tagged_terms(segment, n):
+    """segment.terms() as (term, n, (offset, df, positions)) for merging."""
+    for term, *entry in segment.terms():
+        yield term, n, entry
+
+class SearchIndex:
+    """The search index in index_dir; use as a context manager."""
+
+    def __init__(self, index_dir=INDEX_DIR, root='.'):
+        self.index_dir = index_dir
+        self.root = root
+        os.makedirs(index_dir, exist_ok=True)
+        self._meta_path = os.path.join(index_dir, 'index.json')
+        meta = {}
+        try:
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if meta.get('version') != INDEX_VERSION:
+            meta = {'version': INDEX_VERSION, 'next_doc': 0, 'next_segment': 0,
+                    'segments': [], 'docs': {}, 'deleted': []}
+        self.meta = meta
+        self.deleted = set(meta['deleted'])
+        self._load_docs()
+        self.segments = [Segment(index_dir, name) for name in meta['segments']]
+
+    def _load_docs(self):
+        docs = self.meta['docs']
+        self.paths = {doc['id']: path for path, doc in docs.items()}
+        self.lengths = {doc['id']: doc['length'] for doc in docs.values()}
+        self.avg_length = sum(self.lengths.values()) / len(self.lengths) if self.lengths else 0.0
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _save(self):
+        self.meta['deleted'] = sorted(self.deleted)
+        self.meta['segments'] = [segment.name for segment in self.segments]
+        tmp_path = self._meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def update(self, paths=None):
+        """Bring the index up to date with paths (default: find_sources()).
+
+        Returns (documents indexed, documents removed).
+        """
+        if paths is None:
+            paths = find_sources(self.root)
+        docs = self.meta['docs']
+        current = {}
+        for path in paths:
+            stat = os.stat(os.path.join(self.root, path))
+            current[path] = (stat.st_size, stat.st_mtime_ns)
+
+        stale = [path for path in docs
+                 if path not in current or (docs[path]['size'], docs[path]['mtime_ns']) != current[path]]
+        for path in stale:
+            self.deleted.add(docs.pop(path)['id'])
+        pending = [path for path in paths if path not in docs]
+
+        for start in range(0, len(pending), SEGMENT_DOCS):
+            self._add_segment(pending[start:start + SEGMENT_DOCS], current)
+        removed = sum(1 for path in stale if path not in current)
+        if len(self.segments) > MAX_SEGMENTS:
+            self.merge()
+        self._load_docs()
+        self._save()
+        return len(pending), removed
+
+    def _add_segment(self, paths, current):
+        postings = defaultdict(list)
+        for path in paths:
+            with open(os.path.join(self.root, path), 'r', encoding='utf-8', errors='ignore') as f:
+                tokens = tokenize(f.read())
+            doc_id = self.meta['next_doc']
+            self.meta['next_doc'] += 1
+            size, mtime_ns = current[path]
+            self.meta['docs'][path] = {'id': doc_id, 'size': size, 'mtime_ns': mtime_ns,
+                                       'length': len(tokens)}
+            positions = defaultdict(list)
+            for position, token in enumerate(tokens):
+                positions[token].append(position)
+            for token, token_positions in positions.items():
+                postings[token].append((doc_id, token_positions))
+        if not postings:
+            return
+        name = f"seg-{self.meta['next_segment']}"
+        self.meta['next_segment'] += 1
+        write_segment(self.index_dir, name, postings)
+        self.segments.append(Segment(self.index_dir, name))
+
+    def merge(self):
+        """Merge every segment into one, dropping tombstoned postings."""
+        if not self.segments:
+            return
+        postings = defaultdict(list)
+        streams = [_tagged_terms(segment, n) for n, segment in enumerate(self.segments)]
+        for term, n, entry in heapq.merge(*streams):
+            for doc, _, positions in self.segments[n]._read(*entry, deleted=self.deleted):
+                postings[term].append((doc, list(positions)))
+        for entries in postings.values():
+            entries.sort()
+        name = f"seg-{self.meta['next_segment']}"
+        self.meta['next_segment'] += 1
+        if postings:
+            write_segment(self.index_dir, name, postings)
+        old = self.segments
+        self.close()
+        for segment in old:
+            remove_segment(self.index_dir, segment.name)
+        self.segments = [Segment(self.index_dir, name)] if postings else []
+        self.deleted = set()
+        self._save()
+
+    def _postings(self, term):
+        """{doc id: (tf, positions)} for term over every segment."""
+        result = {}
+        for segment in self.segments:
+            for doc, tf, positions in segment.postings(term, self.deleted):
+                result[doc] = (tf, positions)
+        return result
+
+    def search(self, query, limit=10):
+        """Return [(score, path)] for the best limit documents matching query."""
+        words, phrases = parse_query(query)
+        terms = list(dict.fromkeys(words + [token for phrase in phrases for token in phrase]))
+        if not terms:
+            return []
+        postings = {term: self._postings(term) for term in terms}
+        total = len(self.lengths)
+
+        scores = defaultdict(float)
+        for term in terms:
+            matches = postings[term]
+            if not matches:
+                continue
+            idf = math.log(1 + (total - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc, (tf, _) in matches.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / (self.avg_length or 1))
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        for phrase in phrases:
+            scores = {doc: score for doc, score in scores.items()
+                      if self._phrase_matches(doc, phrase, postings)}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, self.paths[doc]) for doc, score in best]
+
+    def _phrase_matches(self, doc, phrase, postings):
+        starts = None
+        for offset, token in enumerate(phrase):
+            entry = postings[token].get(doc)
+            if entry is None:
+                return False
+            shifted = {position - offset for position in entry[1]}
+            starts = shifted if starts is None else starts & shifted
+            if not starts:
+                return False
+        return True
+
+def snippet(path, query, root='.', width=160):
+    """A short excerpt of path around the first query word, for display."""
+    words, phrases = parse_query(query)
+    with open(os.path.join(root, path), 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    needles = [' '.join(phrase) for phrase in phrases] + words
+    lowered = text.lower()
+    at = min((i for i in (lowered.find(needle) for needle in needles) if i >= 0), default=0)
+    start = max(0, at - width // 3)
+    return re.sub(r'\s+', ' ', text[start:start + width]).strip()
+
+def _bench_vocabulary(root, size=5000):
+    """Word frequencies to draw synthetic documents from (real sources if any)."""
+    counts = defaultdict(int)
+    for path in find_sources(root)[:200]:
+        with open(os.path.join(root, path), 'r', encoding='utf-8', errors='ignore') as f:
+            for token in tokenize(f.read(200000)):
+                counts[token] += 1
+    if len(counts) < 100:
+        # Zipf-distributed made-up vocabulary
+        counts = {f"w{i}": int(100000 / (i + 1)) + 1 for i in range(size)}
+    top = sorted(counts.items(), key=lambda item: -item[1])[:size]
+    return [word for word, _ in top], [count for _, count in top]
+
+def bench(sizes, root='.', doc_words=2000, queries=50, seed=0):
+    """Build synthetic indexes of each size and time queries.
+
+    Returns a list of dicts: docs, build seconds, and median milliseconds
+    for one-word, three-word and two-word phrase queries.
+    """
+    rng = random.Random(seed)
+    vocabulary, weights = _bench_vocabulary(root)
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = os.path.join(tmp, 'corpus')
+            os.makedirs(corpus)
+            paths = []
+            for i in range(size):
+                path = f"doc{i:06d}.txt"
+                with open(os.path.join(corpus, path), 'w', encoding='utf-8') as f:
+                    f.write(' '.join(rng.choices(vocabulary, weights, k=doc_words)))
+                paths.append(path)
+
+            start = time.perf_counter()
+            with SearchIndex(os.path.join(tmp, 'index'), root=corpus) as index:
+                index.update(paths)
+            build = time.perf_counter() - start
+
+            mid = vocabulary[10:500]
+            query_sets = {
+                'word': [rng.choice(mid) for _ in range(queries)],
+                'three words': [' '.join(rng.sample(mid, 3)) for _ in range(queries)],
+                'phrase': [f'"{rng.choice(vocabulary[:50])} {rng.choice(vocabulary[:50])}"'
+                           for _ in range(queries)],
+            }
+            row = {'docs': size, 'build_s': build}
+            with SearchIndex(os.path.join(tmp, 'index'), root=corpus) as index:
+                for label, texts in query_sets.items():
+                    timings = []
+                    for query in texts:
+                        start = time.perf_counter()
+                        index.search(query)
+                        timings.append(time.perf_counter() - start)
+                    row[label] = statistics.median(timings) * 1000
+            results.append(row)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text search over papers and thesis texts.')
+    parser.add_argument('--index', default=INDEX_DIR, help=f'index directory (default: {INDEX_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('update', help='index new and changed documents')
+    commands.add_parser('merge', help='merge all segments into one')
+    find = commands.add_parser('search', help='search the index')
+    find.add_argument('query', help='words and "quoted phrases"')
+    find.add_argument('-n', type=int, default=10, help='results to show (default 10)')
+    timing = commands.add_parser('bench', help='time queries over synthetic corpora')
+    timing.add_argument('--sizes', default='100,1000,5000', help='comma-separated corpus sizes')
+    timing.add_argument('--doc-words', type=int, default=2000, help='words per synthetic document')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        sizes = [int(size) for size in args.sizes.split(',')]
+        print(f"{'docs':>8} {'build':>9} {'word':>9} {'3 words':>9} {'phrase':>9}")
+        for row in bench(sizes, doc_words=args.doc_words):
+            print(f"{row['docs']:8} {row['build_s']:8.2f}s {row['word']:7.2f}ms "
+                  f"{row['three words']:7.2f}ms {row['phrase']:7.2f}ms")
+        return
+
+    with SearchIndex(args.index) as index:
+        if args.command == 'update':
+            start = time.perf_counter()
+            added, removed = index.update()
+            print(f"Indexed {added} documents, removed {removed} "
+                  f"({len(index.lengths)} documents, {len(index.segments)} segments) "
+                  f"in {time.perf_counter() - start:.2f}s")
+        elif args.command == 'merge':
+            index.merge()
+            print(f"Merged into {len(index.segments)} segment(s)")
+        else:
+            start = time.perf_counter()
+            results = index.search(args.query, limit=args.n)
+            elapsed = (time.perf_counter() - start) * 1000
+            for rank, (score, path) in enumerate(results, 1):
+                print(f"{rank:3}. {score:7.3f}  {path}")
+                print(f"     {snippet(path, args.query)}")
+            print(f"{len(results)} results in {elapsed:.1f}ms")
+
+if __name__ == '__main__':
+    main()
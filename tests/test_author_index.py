@@ -0,0 +1,36 @@
+"""Author names are told apart from affiliations, addresses and title text."""
+
+import pytest
+
+from author_index import split_authors
+from generate_bibliography import cite_indexed_authors, format_citation
+
+@pytest.mark.parametrize('field, names', [
+    ('CHRISTOPHER BAILEY, WENDY HALL, DAVID E. MILLARD, and; MARK J. WEAL; perspective. We also show',
+     ['Christopher Bailey', 'Wendy Hall', 'David E. Millard', 'Mark J. Weal']),
+    # Surnames that are also places or street words
+    ('John Maynard Keynes; Isaiah Berlin', ['John Maynard Keynes', 'Isaiah Berlin']),
+    ('Jane Street and Tom Rule; Jimmy Wales', ['Jane Street', 'Tom Rule', 'Jimmy Wales']),
+    # Affiliations and the address after them
+    ('A. Smith, Department of Computing, Lancaster University, Bailrigg, Lancaster', ['A. Smith']),
+    ('Open University, Walton Hall, Milton Keynes, UK', []),
+    ('Milton Keynes, U.K.; n.nanas', []),
+    ('Dan FASS; Las Cruces,; USA.', ['Dan Fass']),
+    ('Jutta Treviranus, Canada, Liddy Nevile, Australia, and Andy Heath, UK',
+     ['Jutta Treviranus', 'Liddy Nevile', 'Andy Heath']),
+    ('Benoît Encelle Nadine Baptiste-Jessel; Toulouse, France Toulouse, France',
+     ['Benoît Encelle', 'Nadine Baptiste-Jessel']),
+    # Title text from this corpus (author_title_words.txt)
+    ('Adaptive Hypermedia Systems; Motor Vision', []),
+])
+def test_split_authors(field, names):
+    assert split_authors(field) == names
+
+def test_unrecognised_authors_field_is_kept():
+    papers = {'root': [
+        {'filename': 'a.pdf', 'title': 'A', 'authors': 'ANNA SMITH and BOB JONES', 'year': ''},
+        {'filename': 'b.pdf', 'title': 'B', 'authors': 'xyz consortium', 'year': ''},
+    ]}
+    cite_indexed_authors(papers)
+    assert [row['authors'] for row in papers['root']] == ['Anna Smith, Bob Jones', 'xyz consortium']
+    assert 'Unknown Authors' not in format_citation(papers['root'][1])
@@ -0,0 +1,48 @@
+"""The garbled-text repairs must leave clean text alone."""
+
+import glob
+import os
+import string
+
+import pytest
+
+from cipher_decoder import decode_text, looks_garbled
+from extract_paper_info import fix_garbled_text, garbled_fixes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEAN_TEXTS = sorted(glob.glob(os.path.join(ROOT, '0*', '**', '*.txt'), recursive=True))
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def word_table_only(text):
+    """fix_garbled_text without the decoder: the known word fixes behind the 2% gate."""
+    suspicious = '#%+3615?m248@>;='
+    if sum(text.count(c) for c in suspicious) / len(text) >= 0.02:
+        return garbled_fixes().apply(text)
+    return text
+
+@pytest.mark.parametrize('path', CLEAN_TEXTS, ids=lambda path: os.path.relpath(path, ROOT))
+def test_clean_text_is_not_decoded(path):
+    text = read(path)
+    assert not looks_garbled(text)
+    report = {}
+    assert fix_garbled_text(text, report) == word_table_only(text)
+    assert 'cipher' not in report
+
+@pytest.mark.parametrize('path', CLEAN_TEXTS, ids=lambda path: os.path.relpath(path, ROOT))
+def test_decoder_keeps_punctuation_of_clean_text(path):
+    text = read(path)
+    decoded = decode_text(text)
+    assert len(decoded) == len(text)
+    assert all(a == b or a in string.ascii_letters for a, b in zip(text, decoded))
+
+def test_enciphered_text_is_decoded():
+    text = read(os.path.join(ROOT, '03-methodology', 'Preference Modelling.txt'))
+    garbled = text.translate(str.maketrans({'u': '+', 'c': '6', 'g': '1', 'b': '3', 'w': '%', 'k': '>'}))
+    assert looks_garbled(garbled)
+    assert decode_text(garbled) == text
+    report = {}
+    fix_garbled_text(garbled, report)
+    assert 'cipher' in report
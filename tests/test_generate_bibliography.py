@@ -0,0 +1,30 @@
+"""Incremental bibliography updates over a file written by a full run."""
+
+from generate_bibliography import generate_markdown, update_markdown
+
+def paper(filename, title, year='2001'):
+    return {'filename': filename, 'title': title, 'authors': 'A. Author', 'abstract_preview': '',
+            'year': year, 'cross_references': ''}
+
+def papers_by_category():
+    return {
+        'hypermedia': [paper('hypermedia/a.pdf', 'Anchors'), paper('hypermedia/b.pdf', 'Links')],
+        'dexter_model': [paper('dexter_model/c.pdf', 'Dexter')],
+    }
+
+def test_current_legacy_sections_are_adopted(tmp_path):
+    output = tmp_path / 'bibliography.md'
+    generate_markdown(papers_by_category(), output)
+    assert update_markdown(papers_by_category(), output) == []
+
+def test_stale_legacy_section_is_rerendered(tmp_path):
+    output = tmp_path / 'bibliography.md'
+    generate_markdown(papers_by_category(), output)
+    changed = papers_by_category()
+    changed['hypermedia'][1] = paper('hypermedia/b.pdf', 'Typed Links', year='2003')
+
+    assert update_markdown(changed, output) == ['hypermedia']
+    text = output.read_text(encoding='utf-8')
+    assert 'Typed Links' in text and '(2003)' in text
+    # Now marked with the current hash, so a second update keeps everything
+    assert update_markdown(changed, output) == []
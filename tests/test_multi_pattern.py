@@ -0,0 +1,57 @@
+"""ReplacementTable must give the same text as the old row-by-row replace loop."""
+
+import csv
+import os
+
+import pytest
+
+from multi_pattern import load_replacement_table, sample_texts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXES_CSV = os.path.join(ROOT, 'garbled_fixes.csv')
+SPACING_FIXES = ['t he ', 'T he ', 'w orld', 'p opulation']
+
+def baseline_fix(text):
+    """The replace loops fix_garbled_text ran before ReplacementTable, fed from garbled_fixes.csv."""
+    with open(FIXES_CSV, 'r', newline='', encoding='utf-8') as f:
+        rows = [(row['garbled'], row['fixed']) for row in csv.DictReader(f)]
+    pattern_fixes = [(old, new) for old, new in rows if old not in SPACING_FIXES]
+    spacing_fixes = [(old, new) for old, new in rows if old in SPACING_FIXES]
+
+    result = text
+    for old, new in pattern_fixes:
+        if old in result:
+            result = result.replace(old, new)
+    for old, new in spacing_fixes:
+        result = result.replace(old, new)
+    return result
+
+@pytest.fixture(scope='module')
+def table():
+    return load_replacement_table(FIXES_CSV)
+
+def test_spacing_fixes_come_last(table):
+    olds = [old for old, _ in table.rows]
+    assert olds[-len(SPACING_FIXES):] == SPACING_FIXES
+
+@pytest.mark.parametrize('text', [
+    '%orld',  # '%o' is ranked before '%orld' and claims it
+    't#e #e t#et#e',  # 't#e' contains the earlier '#e'
+    '%#o %#e',
+    's+6#e s+6# S+66essf+l s+66essf+l',
+    '9in6l+sive in6l+sive pop+lation pop+sers +sers',
+    're=+ires Honse=+ently Honse=+ires',
+    '%o%o%orld #e#e#e 6apa3ility3alan6e',
+    'in6rease8 eval+ation8 e56l+sion8 e5perien6in1',
+    'lsk12Jeng.cam.ac.uk, pjc10Jeng.cam.ac.uk',
+    't he w orld of t he p opulation; T he  w orld',
+    'wt he  %o rld p opulation+sers',
+    '',
+    'clean text with no keys at all',
+])
+def test_apply_matches_baseline(table, text):
+    assert table.apply(text) == baseline_fix(text)
+
+def test_apply_matches_baseline_on_mixed_texts(table):
+    for text in sample_texts(table, count=500):
+        assert table.apply(text) == baseline_fix(text), text
@@ -0,0 +1,42 @@
+"""MinHash signatures estimate Jaccard similarity, and clusters join only near-duplicates."""
+
+import random
+
+import pytest
+
+from near_duplicates import SIGNATURE_BINS, find_clusters, minhash, shingles, similarity
+
+def random_words(rng, count):
+    return [f'word{rng.randrange(5000)}' for _ in range(count)]
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+@pytest.mark.parametrize('changed', [0, 20, 100, 300])
+def test_similarity_estimates_jaccard(changed):
+    rng = random.Random(changed)
+    words = random_words(rng, 2000)
+    edited = list(words)
+    for i in rng.sample(range(len(words)), changed):
+        edited[i] = 'edited'
+    a, b = ' '.join(words), ' '.join(edited)
+    assert similarity(minhash(a), minhash(b)) == pytest.approx(jaccard(a, b), abs=0.12)
+
+def test_short_and_empty_texts():
+    assert minhash('') is None
+    assert minhash('...') is None
+    signature = minhash('two words')  # one shingle: densification fills every bin
+    assert len(signature) == SIGNATURE_BINS and -1 not in signature
+    assert similarity(signature, minhash('Two  words')) == 1.0
+
+def test_clusters():
+    rng = random.Random(1)
+    base = random_words(rng, 1000)
+    near = base[:500] + ['edited'] + base[501:]
+    nearer = base[:900] + ['edited'] + base[901:]
+    texts = {'a': base, 'b': near, 'c': nearer, 'd': random_words(rng, 1000), 'e': random_words(rng, 1000)}
+    signatures = {key: minhash(' '.join(words)) for key, words in texts.items()}
+    signatures['f'] = None  # PDFs without text have no signature
+    assert find_clusters(signatures) == [['a', 'b', 'c']]
+    assert find_clusters(signatures, threshold=1.01) == []
@@ -0,0 +1,120 @@
+"""read_pdf_info must agree with PyMuPDF on the layouts PDF writers produce."""
+
+import re
+import zlib
+
+import pytest
+
+from pdf_backends import SubprocessDocument
+from pdf_metadata import PDFMetadataError, read_pdf_info
+
+pymupdf = pytest.importorskip('pymupdf')
+
+METADATA = {'title': 'Adaptive hypermedia', 'author': 'A. N. Author', 'creator': 'Writer',
+            'producer': 'Producer 1.0', 'creationDate': "D:20240102030405+01'00'"}
+
+def write_pdf(path, pages=3, metadata=None, **save_options):
+    document = pymupdf.open()
+    for i in range(pages):
+        document.new_page().insert_text((72, 72), f"Page {i + 1}")
+    document.set_metadata(dict(METADATA, **(metadata or {})))
+    document.save(str(path), **save_options)
+    document.close()
+    return path
+
+def pymupdf_info(path):
+    """PyMuPDF's view of the fields read_pdf_info returns."""
+    with pymupdf.open(str(path)) as document:
+        metadata = document.metadata
+        info = {key: metadata[name] for key, name in (('Title', 'title'), ('Author', 'author'),
+                                                      ('Creator', 'creator'), ('Producer', 'producer'))}
+        info['Pages'] = str(document.page_count)
+    return info
+
+def assert_matches_pymupdf(path):
+    info = read_pdf_info(str(path))
+    assert {key: info.get(key, '') for key in ('Title', 'Author', 'Creator', 'Producer', 'Pages')} \
+        == pymupdf_info(path)
+    assert info['CreationDate'] == '2024-01-02T03:04:05+01:00'
+    return info
+
+def test_plain_xref_table(tmp_path):
+    path = write_pdf(tmp_path / 'plain.pdf')
+    assert b'\nxref\n' in path.read_bytes()
+    assert_matches_pymupdf(path)
+
+def test_object_streams(tmp_path):
+    path = write_pdf(tmp_path / 'objstm.pdf', pages=5, use_objstms=1, garbage=3, deflate=True)
+    data = path.read_bytes()
+    assert b'/Type/ObjStm' in data and b'/Type/XRef' in data
+    assert_matches_pymupdf(path)
+
+def test_incremental_update(tmp_path):
+    path = write_pdf(tmp_path / 'incremental.pdf')
+    with pymupdf.open(str(path)) as document:
+        document.set_metadata(dict(METADATA, title='Updated title'))
+        document.saveIncr()
+    assert path.read_bytes().count(b'startxref') == 2
+    assert assert_matches_pymupdf(path)['Title'] == 'Updated title'
+
+def test_utf16_title(tmp_path):
+    title = 'Адаптивные системы — ハイパーメディア'
+    path = write_pdf(tmp_path / 'utf16.pdf', metadata={'title': title})
+    assert b'/Title<FEFF' in path.read_bytes()
+    assert assert_matches_pymupdf(path)['Title'] == title
+
+@pytest.mark.parametrize('damage', ['startxref', 'shifted'])
+def test_damaged_xref_is_rebuilt(tmp_path, damage):
+    path = write_pdf(tmp_path / 'damaged.pdf')
+    data = path.read_bytes()
+    if damage == 'startxref':
+        data = re.sub(rb'startxref\s+\d+', b'startxref\n12345', data)
+    else:  # every offset in the xref table is now wrong
+        header_end = data.index(b'\n') + 1
+        data = data[:header_end] + b'%' + b'x' * 100 + b'\n' + data[header_end:]
+    path.write_bytes(data)
+    assert_matches_pymupdf(path)
+
+def test_xref_stream_with_png_predictor(tmp_path):
+    # PyMuPDF does not write predictors, so the file is built by hand
+    objects = [b'<</Type/Catalog/Pages 2 0 R>>',
+               b'<</Type/Pages/Kids[3 0 R]/Count 1>>',
+               b'<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>',
+               b'<</Title(Predicted)/Producer(Hand)>>']
+    data = bytearray(b'%PDF-1.5\n')
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n%s\nendobj\n' % (num, body)
+    offsets.append(len(data))  # the xref stream itself is object 5
+    rows = [bytes([0, 0, 0, 0, 255])] + [bytes([1]) + offset.to_bytes(3, 'big') + b'\0' for offset in offsets]
+    previous = bytes(5)
+    encoded = b''
+    for row in rows:  # PNG 'Up' predictor: each byte minus the byte above it
+        encoded += b'\x02' + bytes((a - b) % 256 for a, b in zip(row, previous))
+        previous = row
+    stream = zlib.compress(encoded)
+    data += (b'5 0 obj\n<</Type/XRef/Size 6/W[1 3 1]/Root 1 0 R/Info 4 0 R/Filter/FlateDecode'
+             b'/DecodeParms<</Predictor 12/Columns 5>>/Length %d>>\nstream\n' % len(stream)
+             + stream + b'\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n' % offsets[-1])
+    path = tmp_path / 'predictor.pdf'
+    path.write_bytes(bytes(data))
+    assert read_pdf_info(str(path)) == {'Title': 'Predicted', 'Producer': 'Hand', 'Pages': '1'}
+    assert pymupdf_info(path)['Title'] == 'Predicted'
+
+@pytest.mark.parametrize('damage', [False, True])
+def test_encrypted_file_raises(tmp_path, damage):
+    path = write_pdf(tmp_path / 'encrypted.pdf', encryption=pymupdf.PDF_ENCRYPT_AES_256,
+                     owner_pw='owner', user_pw='user')
+    if damage:  # the rebuilt cross-reference data must not get past the encryption check either
+        path.write_bytes(re.sub(rb'startxref\s+\d+', b'startxref\n12345', path.read_bytes()))
+    with pytest.raises(PDFMetadataError):
+        read_pdf_info(str(path))
+
+def test_encrypted_file_falls_back_to_pdfinfo(tmp_path, monkeypatch):
+    path = write_pdf(tmp_path / 'encrypted.pdf', encryption=pymupdf.PDF_ENCRYPT_AES_256,
+                     owner_pw='owner', user_pw='user')
+    monkeypatch.setattr(SubprocessDocument, 'pdfinfo', lambda self, timeout=10: {'Pages': '3'})
+    with SubprocessDocument(str(path)) as document:
+        assert document.info() == {'Pages': '3'}
+        assert document.info_source == 'pdfinfo'
@@ -0,0 +1,77 @@
+"""ReviewStore and ReviewFiles behave alike, and the store survives rewrites, reopening and compaction."""
+
+import os
+import random
+
+import pytest
+
+import review_store
+from review_store import ReviewFiles, ReviewStore, migrate
+
+def large_text(seed=0, chars=50000):
+    """Text that compresses poorly, with multi-byte characters, so prefix reads span many chunks."""
+    rng = random.Random(seed)
+    return ''.join(rng.choice('abcdefghij klmnopé→日本語\n') for _ in range(chars))
+
+@pytest.fixture(params=['store', 'files'])
+def reviews(request, tmp_path):
+    if request.param == 'store':
+        with ReviewStore(str(tmp_path / 'store')) as store:
+            yield store
+    else:
+        yield ReviewFiles(str(tmp_path / 'paper_reviews'))
+
+def test_interface(reviews):
+    text = large_text()
+    assert reviews.put('paper', text) == len(text.encode('utf-8'))
+    reviews.put('other', 'short text')
+    assert 'paper' in reviews and 'missing' not in reviews
+    assert reviews.stems() == {'paper', 'other'}
+    assert reviews.size('paper') == len(text.encode('utf-8'))
+    assert reviews.get('paper') == text
+    for max_chars in (1, 5000, 12345, len(text), len(text) + 10):
+        assert reviews.get('paper', max_chars) == text[:max_chars]
+    assert dict(reviews.items()) == {'paper': text, 'other': 'short text'}
+    assert dict(reviews.items(max_chars=5)) == {'paper': text[:5], 'other': 'short'}
+
+    reviews.copy('other', 'copied')
+    reviews.put('other', 'replaced')
+    reviews.delete('paper')
+    assert reviews.get('paper') is None and reviews.size('paper') is None
+    assert reviews.get('other') == 'replaced'
+    assert reviews.get('copied') == 'short text'
+
+def test_store_persists_and_compacts(tmp_path):
+    path = str(tmp_path / 'store')
+    with ReviewStore(path) as store:
+        for i in range(5):
+            store.put(f'paper{i}', large_text(i, 2000))
+        store.put('paper0', 'rewritten')
+        store.delete('paper1')
+    with ReviewStore(path) as store:
+        assert store.stats()['dead_bytes'] > 0
+        store.compact()
+        assert store.stats()['dead_bytes'] == 0
+    with ReviewStore(path) as store:
+        assert len(store) == 4
+        assert store.get('paper0') == 'rewritten'
+        assert store.get('paper4') == large_text(4, 2000)
+    assert not os.path.exists(path + '.compact')
+
+def test_shards_rotate(tmp_path, monkeypatch):
+    monkeypatch.setattr(review_store, 'SHARD_BYTES', 4000)
+    with ReviewStore(str(tmp_path / 'store')) as store:
+        for i in range(5):
+            store.put(f'paper{i}', large_text(i, 2000))
+        assert store.stats()['shards'] > 1
+        assert [stem for stem, _ in store.items()] == [f'paper{i}' for i in range(5)]
+        assert all(store.get(f'paper{i}') == large_text(i, 2000) for i in range(5))
+
+def test_migrate(tmp_path):
+    files = ReviewFiles(str(tmp_path / 'paper_reviews'))
+    files.put('a', 'text a')
+    files.put('b', large_text())
+    with ReviewStore(str(tmp_path / 'store')) as store:
+        assert migrate(str(tmp_path / 'paper_reviews'), store, delete=True) == 2
+        assert dict(store.items()) == {'a': 'text a', 'b': large_text()}
+    assert files.stems() == set()
@@ -0,0 +1,96 @@
+"""Incremental updates must leave the same index as a fresh build."""
+
+import os
+import random
+
+import pytest
+
+import search_index
+from search_index import SearchIndex, parse_query
+
+QUERIES = ['adaptation', 'user capability', '"user capability"', 'hypermedia "adaptive systems" model',
+           'missing']
+
+def write_review(root, stem, text):
+    path = os.path.join(root, 'paper_reviews', f'{stem}_review.txt')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def random_text(rng, words=200):
+    vocabulary = ['adaptation', 'user', 'capability', 'hypermedia', 'adaptive', 'systems', 'model',
+                  'link', 'node', 'profile', 'context', 'device'] + [f'w{i}' for i in range(200)]
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+def results(index_dir, root):
+    # Sorted, since equal scores are ordered by document id, which depends on the update history
+    with SearchIndex(index_dir, root) as index:
+        return {query: sorted((round(score, 9), path) for score, path in index.search(query, limit=50))
+                for query in QUERIES}
+
+def test_parse_query():
+    assert parse_query('Adaptive "user capability" x "one"') == (['adaptive', 'x', 'one'], [['user', 'capability']])
+
+def test_phrases_need_consecutive_tokens(tmp_path):
+    root = str(tmp_path)
+    write_review(root, 'together', 'the user capability model')
+    write_review(root, 'apart', 'the capability of a user')
+    with SearchIndex(str(tmp_path / 'index'), root) as index:
+        index.update()
+        assert len(index.search('user capability')) == 2
+        assert [path for _, path in index.search('"user capability"')] == [
+            os.path.join('paper_reviews', 'together_review.txt')]
+
+def test_more_occurrences_rank_higher(tmp_path):
+    root = str(tmp_path)
+    write_review(root, 'once', 'adaptation ' + 'filler ' * 20)
+    write_review(root, 'often', 'adaptation ' * 5 + 'filler ' * 16)
+    write_review(root, 'never', 'filler ' * 21)
+    with SearchIndex(str(tmp_path / 'index'), root) as index:
+        index.update()
+        assert [path for _, path in index.search('adaptation')] == [
+            os.path.join('paper_reviews', 'often_review.txt'), os.path.join('paper_reviews', 'once_review.txt')]
+
+def test_incremental_updates_match_fresh_build(tmp_path, monkeypatch):
+    # Small segments and a low segment limit, so updates also merge
+    monkeypatch.setattr(search_index, 'SEGMENT_DOCS', 2)
+    monkeypatch.setattr(search_index, 'MAX_SEGMENTS', 3)
+    rng = random.Random(0)
+    root = str(tmp_path / 'root')
+    incremental = str(tmp_path / 'incremental')
+    for i in range(6):
+        write_review(root, f'paper{i}', random_text(rng))
+    with SearchIndex(incremental, root) as index:
+        assert index.update() == (6, 0)
+
+    for step in range(4):
+        write_review(root, f'paper{step}', random_text(rng))  # changed; a distinct mtime marks it
+        write_review(root, f'added{step}', random_text(rng))
+        os.remove(os.path.join(root, 'paper_reviews', f'paper{5 - step}_review.txt'))
+        os.utime(os.path.join(root, 'paper_reviews', f'paper{step}_review.txt'), ns=(step, step))
+        with SearchIndex(incremental, root) as index:
+            assert index.update() == (2, 1)
+            assert len(index.segments) <= 3
+
+    fresh = str(tmp_path / 'fresh')
+    with SearchIndex(fresh, root) as index:
+        index.update()
+    assert results(incremental, root) == results(fresh, root)
+    assert results(fresh, root)['adaptation']
+
+def test_unchanged_sources_are_not_reindexed(tmp_path):
+    root = str(tmp_path)
+    write_review(root, 'paper', 'adaptation')
+    with SearchIndex(str(tmp_path / 'index'), root) as index:
+        assert index.update() == (1, 0)
+    with SearchIndex(str(tmp_path / 'index'), root) as index:
+        assert index.update() == (0, 0)
+        assert len(index.search('adaptation')) == 1
+
+@pytest.mark.parametrize('query', ['', '""', '"  "'])
+def test_empty_queries(tmp_path, query):
+    root = str(tmp_path)
+    write_review(root, 'paper', 'adaptation')
+    with SearchIndex(str(tmp_path / 'index'), root) as index:
+        index.update()
+        assert index.search(query) == []
@@ -0,0 +1,61 @@
+"""Adaptive strategy order puts past winners first without dropping the others, and counts real launches."""
+
+from extract_paper_info import extract_text_from_pdf, order_strategies, record_strategy_result
+from pdf_backends import PDFDocument, PDFTOTEXT_STRATEGIES
+
+DEFAULT_ORDER = [name for name, _ in PDFTOTEXT_STRATEGIES]
+READABLE = 'Readable text about adaptive hypermedia. ' * 50
+UNREADABLE = '\x0c\x01\x02\x03 ' * 500
+
+class FakeDocument(PDFDocument):
+    """Returns canned text per strategy and records which strategies ran."""
+
+    def __init__(self, texts):
+        super().__init__('fake.pdf')
+        self.texts = texts
+        self.tried = []
+
+    def text(self, strategy, first_page=None, last_page=None, timeout=30):
+        self.tried.append(strategy)
+        return self.texts.get(strategy, '')
+
+def stats(wins, files=50):
+    return {'producers': {'producer': {'files': files, 'wins': wins}}, 'files': files, 'launches': files}
+
+def test_unknown_producer_gets_default_order():
+    assert order_strategies(stats({}), 'other') == DEFAULT_ORDER
+
+def test_winner_first_and_nothing_dropped():
+    winner = DEFAULT_ORDER[-1]
+    order = order_strategies(stats({winner: 50}), 'producer')
+    assert order[0] == winner
+    assert sorted(order) == sorted(DEFAULT_ORDER)
+
+def test_garbled_winner_falls_back_to_the_other_strategies():
+    winner, fallback = DEFAULT_ORDER[-1], DEFAULT_ORDER[0]
+    document = FakeDocument({winner: UNREADABLE, fallback: READABLE})
+    report = {}
+    text = extract_text_from_pdf('fake.pdf', order_strategies(stats({winner: 50}), 'producer'), report,
+                                 document=document)
+    assert text == READABLE
+    assert report['strategy'] == fallback
+    assert document.tried[:2] == [winner, fallback]
+
+def test_in_process_backends_launch_nothing():
+    report = {}
+    extract_text_from_pdf('fake.pdf', DEFAULT_ORDER, report, document=FakeDocument({}))
+    assert report['launches'] == 0
+
+    class FakeSubprocessDocument(FakeDocument):
+        spawns_processes = True
+
+    extract_text_from_pdf('fake.pdf', DEFAULT_ORDER, report, document=FakeSubprocessDocument({}))
+    assert report['launches'] == len(DEFAULT_ORDER)
+
+def test_in_process_results_stay_out_of_the_launch_baseline():
+    strategy_stats = stats({})
+    record_strategy_result(strategy_stats, 'producer', DEFAULT_ORDER[0], 3, adaptive=False)
+    assert record_strategy_result(strategy_stats, 'producer', DEFAULT_ORDER[0], None, adaptive=False) == 0.0
+    history = strategy_stats['producers']['producer']
+    assert (history['files'], history['baseline_files'], history['baseline_launches']) == (52, 1, 3)
+    assert strategy_stats['launches'] == 50 + 3
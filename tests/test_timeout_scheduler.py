@@ -0,0 +1,38 @@
+"""Only real pdfinfo and whole-document pdftotext runs feed the adaptive timeouts."""
+
+import pytest
+
+from timeout_scheduler import INFO_KEY, load_timeout_stats, record_timings, save_timeout_stats
+
+@pytest.mark.parametrize('info_source, recorded', [
+    ('pdfinfo', True),
+    ('native', False),
+    (None, False),  # PyMuPDF reads its metadata in-process and leaves no source
+])
+def test_info_rate_recorded_only_for_pdfinfo(tmp_path, info_source, recorded):
+    stats = load_timeout_stats(str(tmp_path / 'missing.json'))
+    metrics = {'pages': 4, 'info_seconds': 0.0004, 'attempts': []}
+    if info_source:
+        metrics['info_source'] = info_source
+    record_timings(stats, metrics, 2_000_000)
+    assert (INFO_KEY in stats['rates']) == recorded
+
+@pytest.mark.parametrize('subprocess, first_pages, recorded', [
+    (True, None, True),
+    (False, None, False),  # PyMuPDF answers later strategies from one parse
+    (True, 2, False),  # --header-pages converts only the first pages
+])
+def test_strategy_rates_only_for_whole_pdftotext_runs(tmp_path, subprocess, first_pages, recorded):
+    stats = load_timeout_stats(str(tmp_path / 'missing.json'))
+    attempt = {'strategy': 'layout', 'seconds': 0.001, 'error': None}
+    metrics = {'pages': 40, 'subprocess': subprocess, 'first_pages': first_pages, 'attempts': [attempt]}
+    record_timings(stats, metrics, 2_000_000)
+    assert ('layout' in stats['rates']) == recorded
+
+def test_rates_from_older_stats_are_dropped(tmp_path):
+    path = str(tmp_path / 'timeout_stats.json')
+    save_timeout_stats(path, {'rates': {'layout': {'per_page': [0.0], 'per_mb': [0.0]}},
+                              'quarantine': {'a.pdf': {'sha256': 'x', 'timeouts': 1, 'last': ''}}})
+    stats = load_timeout_stats(path)
+    assert stats['rates'] == {}
+    assert list(stats['quarantine']) == ['a.pdf']
@@ -0,0 +1,71 @@
+"""update_papers must leave the same inventory as a full process_papers run."""
+
+import csv
+import os
+
+import pytest
+
+from extract_paper_info import process_papers, update_papers
+
+pymupdf = pytest.importorskip('pymupdf')
+
+def write_pdf(path, title):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    document = pymupdf.open()
+    page = document.new_page()
+    page.insert_text((72, 72), f"{title}\nA. N. Author\nAbstract\n" + f"Body text of {title}. " * 40)
+    document.save(path)
+    document.close()
+
+def read_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return {row['filename']: row for row in csv.DictReader(f)}
+
+def test_update_matches_full_run(tmp_path):
+    root = str(tmp_path / 'referenced papers')
+    reviews = str(tmp_path / 'paper_reviews')
+    manifest = str(tmp_path / 'paper_manifest.json')
+    inventory = str(tmp_path / 'paper_inventory.csv')
+    for name in ('keep', 'change', 'remove'):
+        write_pdf(os.path.join(root, 'hypermedia', f'{name}.pdf'), f'Paper {name}')
+    process_papers(root, inventory, reviews, manifest_path=manifest, backend='pymupdf')
+
+    write_pdf(os.path.join(root, 'hypermedia', 'change.pdf'), 'Paper changed')
+    write_pdf(os.path.join(root, 'nested', 'dir', 'added.pdf'), 'Paper added')
+    os.remove(os.path.join(root, 'hypermedia', 'remove.pdf'))
+    changed = {os.path.join(root, 'hypermedia', 'change.pdf'), os.path.join(root, 'hypermedia', 'remove.pdf'),
+               os.path.join(root, 'nested')}
+    rows, rewritten = update_papers(root, changed, inventory, reviews, manifest, backend='pymupdf')
+
+    assert sorted(row['filename'] for row in rows) == [
+        'hypermedia/change.pdf', 'hypermedia/keep.pdf', 'nested/dir/added.pdf']
+    assert rewritten == {'change', 'added'}
+    assert read_rows(inventory)['hypermedia/change.pdf']['title'] == 'Paper changed'
+
+    full = str(tmp_path / 'full.csv')
+    process_papers(root, full, reviews, manifest_path=manifest, backend='pymupdf')
+    assert read_rows(inventory) == read_rows(full)
+
+def test_namesakes_get_their_own_review_files(tmp_path, capsys):
+    root = str(tmp_path / 'referenced papers')
+    reviews = tmp_path / 'paper_reviews'
+    manifest = str(tmp_path / 'paper_manifest.json')
+    inventory = str(tmp_path / 'paper_inventory.csv')
+    write_pdf(os.path.join(root, 'mobile', 'paper1.pdf'), 'Paper on mobile')
+    write_pdf(os.path.join(root, 'hypermedia', 'paper1.pdf'), 'Paper on hypermedia')
+    write_pdf(os.path.join(root, 'hypermedia', 'paper2.pdf'), 'Paper two')
+    process_papers(root, inventory, str(reviews), manifest_path=manifest, backend='pymupdf')
+    process_papers(root, inventory, str(reviews), manifest_path=manifest, backend='pymupdf')
+    assert 'Reusing 3 unchanged PDFs, extracting 0' in capsys.readouterr().out
+
+    rows = read_rows(inventory)
+    assert rows['mobile/paper1.pdf']['text_file'] == 'mobile__paper1_review.txt'
+    assert rows['hypermedia/paper1.pdf']['text_file'] == 'hypermedia__paper1_review.txt'
+    assert 'Paper on mobile' in (reviews / 'mobile__paper1_review.txt').read_text(encoding='utf-8')
+
+    # Once its namesake is gone, a PDF's review goes back to the plain name
+    os.remove(os.path.join(root, 'mobile', 'paper1.pdf'))
+    update_papers(root, {os.path.join(root, 'mobile', 'paper1.pdf')}, inventory, str(reviews), manifest,
+                  backend='pymupdf')
+    assert read_rows(inventory)['hypermedia/paper1.pdf']['text_file'] == 'paper1_review.txt'
+    assert sorted(os.listdir(reviews)) == ['paper1_review.txt', 'paper2_review.txt']
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Adaptive pdftotext/pdfinfo timeouts for extract_paper_info.py.
+
+Every successful whole-document pdftotext run records how long the
+conversion took per page and per megabyte of PDF. In-process backends and
+--header-pages conversions are not timed: they say nothing about how long
+pdftotext needs for a whole PDF. Once a strategy has TIMEOUT_MIN_SAMPLES
+observations, its timeout for a PDF is the 95th-percentile rate times the
+PDF's pages (or size, whichever predicts longer), times TIMEOUT_SAFETY, plus
+TIMEOUT_OVERHEAD seconds, clamped to [MIN_TIMEOUT, the fixed default]. A PDF
+that needs far longer than its peers is cut off early instead of costing the
+full 30s per strategy.
+
+With adaptive timeouts, extraction also stops trying strategies after the
+first timeout on a file. Such files go to a retry queue that is processed
+at the end of the run with the fixed default timeouts. Files that time out
+are kept in a quarantine list (by content hash), so later runs defer them
+to the retry queue straight away; a clean retry releases them.
+
+The statistics live in timeout_stats.json. To see the current limits:
+    python timeout_scheduler.py [--stats timeout_stats.json] [--pages 12] [--megabytes 2]
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+TIMEOUT_STATS_FILE = 'timeout_stats.json'
+TIMEOUT_STATS_VERSION = 2
+DEFAULT_TIMEOUT = 30  # per strategy, as before adaptive timeouts
+DEFAULT_INFO_TIMEOUT = 10
+MIN_TIMEOUT = 5
+TIMEOUT_MIN_SAMPLES = 20
+TIMEOUT_SAFETY = 4.0
+TIMEOUT_OVERHEAD = 2.0
+RATE_SAMPLES = 200  # most recent rates kept per strategy
+INFO_KEY = 'pdfinfo'
+
+def load_timeout_stats(stats_path):
+    """Load observed conversion rates and the quarantine list, or empty stats."""
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {}
+    if stats.get('version') != TIMEOUT_STATS_VERSION:
+        # Older rates include in-process and first-pages conversions; the quarantine still holds
+        stats = {'version': TIMEOUT_STATS_VERSION, 'rates': {}, 'quarantine': stats.get('quarantine', {})}
+    return stats
+
+def save_timeout_stats(stats_path, stats):
+    """Atomically write timeout statistics."""
+    tmp_path = stats_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, stats_path)
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+def timeout_for(stats, key, pages, size_bytes, default=DEFAULT_TIMEOUT):
+    """Timeout in seconds for one conversion of a PDF with pages pages and size_bytes bytes."""
+    rates = stats['rates'].get(key)
+    if not rates or len(rates['per_mb']) < TIMEOUT_MIN_SAMPLES:
+        return default
+    expected = _p95(rates['per_mb']) * size_bytes / 1e6
+    if pages and rates['per_page']:
+        expected = max(expected, _p95(rates['per_page']) * pages)
+    return min(default, max(MIN_TIMEOUT, TIMEOUT_OVERHEAD + TIMEOUT_SAFETY * expected))
+
+def strategy_timeouts(stats, strategies, pages, size_bytes):
+    """{strategy: timeout} for the strategies to be tried on one PDF."""
+    return {name: timeout_for(stats, name, pages, size_bytes) for name in strategies}
+
+def info_timeout(stats, size_bytes):
+    """pdfinfo timeout for a PDF of size_bytes bytes."""
+    return timeout_for(stats, INFO_KEY, None, size_bytes, DEFAULT_INFO_TIMEOUT)
+
+def _add_rate(stats, key, seconds, pages, size_bytes):
+    rates = stats['rates'].setdefault(key, {'per_page': [], 'per_mb': []})
+    if pages:
+        rates['per_page'] = (rates['per_page'] + [seconds / pages])[-RATE_SAMPLES:]
+    if size_bytes:
+        rates['per_mb'] = (rates['per_mb'] + [seconds / (size_bytes / 1e6)])[-RATE_SAMPLES:]
+
+def record_timings(stats, metrics, size_bytes):
+    """Add the rates of one PDF's completed attempts (extract_paper_record metrics)."""
+    pages = metrics.get('pages')
+    # Only pdfinfo runs show how long pdfinfo takes; in-process reads (native
+    # metadata, PyMuPDF) are far quicker
+    if not metrics.get('info_error') and 'info_seconds' in metrics and metrics.get('info_source') == 'pdfinfo':
+        _add_rate(stats, INFO_KEY, metrics['info_seconds'], None, size_bytes)
+    if not metrics.get('subprocess') or metrics.get('first_pages'):
+        return  # no whole-document pdftotext runs to time
+    for attempt in metrics.get('attempts', ()):
+        # Failed and cut-short attempts do not show how long a full conversion takes
+        if not attempt['error'] and not attempt.get('stopped'):
+            _add_rate(stats, attempt['strategy'], attempt['seconds'], pages, size_bytes)
+
+def timed_out(metrics):
+    """True if any conversion or pdfinfo call for the PDF hit its timeout."""
+    return (metrics.get('info_error') == 'timeout'
+            or any(attempt['error'] == 'timeout' for attempt in metrics.get('attempts', ())))
+
+def is_quarantined(stats, relative_path, sha256):
+    entry = stats['quarantine'].get(relative_path)
+    return bool(entry) and entry.get('sha256') == sha256
+
+def quarantine(stats, relative_path, sha256):
+    """Record a timeout for a PDF; later runs defer it to the retry queue."""
+    entry = stats['quarantine'].get(relative_path)
+    if not entry or entry.get('sha256') != sha256:
+        entry = {'sha256': sha256, 'timeouts': 0}
+    entry['timeouts'] += 1
+    entry['last'] = datetime.now().isoformat(timespec='seconds')
+    stats['quarantine'][relative_path] = entry
+
+def release(stats, relative_path):
+    """Drop a PDF from quarantine after a retry without timeouts."""
+    stats['quarantine'].pop(relative_path, None)
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the adaptive timeouts and the quarantine list.')
+    parser.add_argument('--stats', default=TIMEOUT_STATS_FILE,
+                        help=f'timeout statistics (default: {TIMEOUT_STATS_FILE})')
+    parser.add_argument('--pages', type=int, default=10, help='example page count (default 10)')
+    parser.add_argument('--megabytes', type=float, default=1.0, help='example PDF size (default 1 MB)')
+    args = parser.parse_args()
+
+    stats = load_timeout_stats(args.stats)
+    size_bytes = args.megabytes * 1e6
+    print(f"Timeouts for a {args.pages}-page, {args.megabytes:g} MB PDF:")
+    for key, rates in sorted(stats['rates'].items()):
+        default = DEFAULT_INFO_TIMEOUT if key == INFO_KEY else DEFAULT_TIMEOUT
+        limit = timeout_for(stats, key, None if key == INFO_KEY else args.pages, size_bytes, default)
+        print(f"  {key:12} {limit:6.1f}s  ({len(rates['per_mb'])} samples)")
+    print(f"\nQuarantined PDFs: {len(stats['quarantine'])}")
+    for path, entry in sorted(stats['quarantine'].items(), key=lambda item: -item[1]['timeouts']):
+        print(f"  {entry['timeouts']:3} timeouts, last {entry['last']}  {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Keep the inventory, classification lists and bibliography up to date while
+PDFs are added to, changed in or removed from 'referenced papers/'.
+
+Changes are picked up with Linux inotify (through ctypes, watching every
+subdirectory); elsewhere, or with --poll, the tree is rescanned every
+--interval seconds. A burst of changes is collected until the tree has been
+quiet for QUIET_SECONDS (at most MAX_BATCH_SECONDS), then handled as one
+batch:
+
+- extract_paper_info.update_papers extracts just the changed PDFs and
+  merges their rows into the inventory CSV and manifest, dropping removed
+  ones (the start-up batch runs process_papers over the whole tree, which
+  the manifest still limits to new and changed PDFs)
+- only the rewritten (and newly seen) reviews are scored with
+  classify_papers.garble_score, updating clean_papers.txt/garbled_papers.txt
+  (the lists follow the inventory, so papers whose PDF was removed drop out)
+- generate_bibliography.update_markdown re-renders only the category
+  sections whose papers changed
+
+One batch also runs at start-up to catch up with changes made while the
+watcher was not running.
+    python watch_papers.py [--jobs N] [--backend NAME] [--poll] [--once] [--store [PATH]]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from classify_papers import garble_score
+from extract_paper_info import process_papers, update_papers
+from generate_bibliography import read_csv, update_markdown
+from paper_store import PaperStore, add_store_argument, read_paper_list, row_stem, write_paper_list
+from pdf_backends import BACKENDS
+from review_store import add_review_store_argument, open_reviews
+
+ROOT_DIR = 'referenced papers'
+INVENTORY_CSV = 'paper_inventory.csv'
+REVIEWS_DIR = 'paper_reviews'
+MANIFEST = 'paper_manifest.json'
+BIBLIOGRAPHY = 'BIBLIOGRAPHY_AUTO_GENERATED.md'
+CLEAN_LIST = 'clean_papers.txt'
+GARBLED_LIST = 'garbled_papers.txt'
+
+QUIET_SECONDS = 0.5
+MAX_BATCH_SECONDS = 3.0
+POLL_INTERVAL = 2.0
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+class InotifyWatcher:
+    """Reports changed PDF paths under root using inotify on every directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = {}  # watch descriptor -> directory
+        self._watch_tree(root)
+
+    def _watch_tree(self, top):
+        """Watch top and its subdirectories; return the PDFs already in them."""
+        pdfs = set()
+        for dirpath, _, filenames in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {dirpath}')
+            self.dirs[wd] = dirpath
+            pdfs.update(os.path.join(dirpath, name) for name in filenames if name.lower().endswith('.pdf'))
+        return pdfs
+
+    def wait(self, timeout=None):
+        """Changed PDF paths (a set, possibly empty) once events arrive, or None after timeout.
+
+        A queue overflow is reported as the root directory itself.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return None
+        changed = set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0'))
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(self.root)  # events were lost; the batch rescans anyway
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]  # directory removed or moved away
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path):
+                    # Files can land in a new directory before it is watched
+                    changed.update(self._watch_tree(path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changed.add(path)
+            elif name.lower().endswith('.pdf') and not mask & IN_CREATE:
+                changed.add(path)  # written and closed, moved in or out, or deleted
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Reports changed PDF paths under root by comparing size/mtime snapshots."""
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.lower().endswith('.pdf'):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue  # removed while scanning
+                    snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Like InotifyWatcher.wait; changes show up at the next poll."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            pause = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if pause > 0:
+                time.sleep(pause)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+    def close(self):
+        pass
+
+def open_watcher(root, poll=False, interval=POLL_INTERVAL):
+    """An InotifyWatcher where inotify works, else a PollingWatcher."""
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:  # no inotify in this libc or kernel, or out of watches
+            print(f"inotify unavailable ({e}); polling every {interval:g}s")
+    return PollingWatcher(root, interval)
+
+def next_batch(watcher):
+    """Block until changes arrive, then collect the burst; returns (changed paths, first event time)."""
+    changed = watcher.wait()
+    while changed is not None and not changed:
+        changed = watcher.wait()
+    first = time.monotonic()
+    while time.monotonic() - first < MAX_BATCH_SECONDS:
+        more = watcher.wait(QUIET_SECONDS)
+        if more is None:
+            break
+        changed |= more
+    return changed, first
+
+def update_classification(reviews, rows, rewritten, threshold=1.0, max_chars=5000, store=None):
+    """Score only new and rewritten reviews and rewrite the clean/garbled lists.
+
+    reviews is a review_store ReviewFiles directory or ReviewStore. Returns
+    the number of papers scored.
+    """
+    known = {}
+    for path, garbled in ((CLEAN_LIST, False), (GARBLED_LIST, True)):
+        if os.path.exists(path):
+            known.update((stem, garbled) for stem in read_paper_list(path))
+
+    current = {row_stem(row) for row in rows if row['text_file']}
+    classification = {stem: known[stem] for stem in current if stem in known and stem not in rewritten}
+    scored = 0
+    for stem in sorted(current - classification.keys()):
+        text = reviews.get(stem, max_chars)
+        if text is None:
+            print(f"Error reading review for {stem}: no review text")
+            classification[stem] = True
+            continue
+        breakdown = garble_score(text)
+        classification[stem] = breakdown['score'] > threshold
+        if store is not None:
+            store.set_classification(stem, classification[stem], breakdown)
+        scored += 1
+
+    if classification != known or not os.path.exists(CLEAN_LIST):
+        write_paper_list(CLEAN_LIST, "Clean Papers (readable text)",
+                         sorted(stem for stem, garbled in classification.items() if not garbled),
+                         generator='watch_papers.py')
+        write_paper_list(GARBLED_LIST, "Garbled Papers (font encoding issues)",
+                         sorted(stem for stem, garbled in classification.items() if garbled),
+                         generator='watch_papers.py')
+    return scored
+
+def run_batch(args, changed=None):
+    """Bring every output up to date; returns (PDFs re-extracted, reviews scored, sections rendered).
+
+    changed is the set of paths the watcher reported; without it the whole
+    tree is checked.
+    """
+    options = dict(jobs=args.jobs, strategy_stats_path='strategy_stats.json' if args.adaptive_order else None,
+                   backend=args.backend, stream=args.stream, store_path=args.store,
+                   review_store_path=args.review_store)
+    if changed is None:
+        rows, rewritten = process_papers(ROOT_DIR, INVENTORY_CSV, REVIEWS_DIR, manifest_path=MANIFEST, **options)
+    else:
+        rows, rewritten = update_papers(ROOT_DIR, changed, INVENTORY_CSV, REVIEWS_DIR, MANIFEST, **options)
+    with open_reviews(REVIEWS_DIR, args.review_store) as reviews:
+        if args.store:
+            with PaperStore(args.store) as store:
+                scored = update_classification(reviews, rows, rewritten, args.threshold, store=store)
+        else:
+            scored = update_classification(reviews, rows, rewritten, args.threshold)
+    rendered = update_markdown(read_csv(INVENTORY_CSV), BIBLIOGRAPHY)
+    return len(rewritten), scored, len(rendered)
+
+def main():
+    parser = argparse.ArgumentParser(description='Update the inventory, classification and bibliography '
+                                                 'as papers change.')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='worker processes for extraction')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='subprocess',
+                        help='PDF text/metadata backend (see extract_paper_info.py)')
+    parser.add_argument('--stream', action='store_true', help='stream review text (see extract_paper_info.py)')
+    parser.add_argument('--adaptive-order', action='store_true',
+                        help='order pdftotext strategies by past wins (see extract_paper_info.py)')
+    parser.add_argument('--threshold', type=float, default=1.0, help='garble score threshold (default 1.0)')
+    parser.add_argument('--poll', action='store_true', help='poll instead of using inotify')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help=f'seconds between polls (default {POLL_INTERVAL:g})')
+    parser.add_argument('--once', action='store_true', help='run the catch-up batch and exit')
+    add_store_argument(parser)
+    add_review_store_argument(parser)
+    args = parser.parse_args()
+    args.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if not os.path.isdir(ROOT_DIR):
+        print(f"Directory '{ROOT_DIR}' not found.")
+        return
+
+    # Watch before catching up, so nothing changed during the first batch is missed
+    watcher = None if args.once else open_watcher(ROOT_DIR, args.poll, args.interval)
+    start = time.monotonic()
+    extracted, scored, rendered = run_batch(args)
+    print(f"Up to date in {time.monotonic() - start:.1f}s: {extracted} PDFs extracted, "
+          f"{scored} reviews scored, {rendered} sections rendered")
+    if args.once:
+        return
+
+    print(f"Watching '{ROOT_DIR}' ({type(watcher).__name__}); Ctrl-C to stop")
+    try:
+        while True:
+            changed, first = next_batch(watcher)
+            print(f"\n{len(changed)} changed: {', '.join(sorted(os.path.relpath(p, ROOT_DIR) for p in changed)[:5])}"
+                  + (' ...' if len(changed) > 5 else ''))
+            extracted, scored, rendered = run_batch(args, changed)
+            print(f"Updated {time.monotonic() - first:.1f}s after the first change: {extracted} PDFs "
+                  f"extracted, {scored} reviews scored, {rendered} sections rendered")
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        watcher.close()
+
+if __name__ == '__main__':
+    main()